@@ -1,24 +1,33 @@
-import asyncio
-from typing import Optional, Dict
+from typing import Any, Dict, Optional
+from invites import InviteScheduler
+from runtime import get_runtime
 
 
 class ActionController:
-    def __init__(self, observer_manager, api_client_calls):
+    def __init__(self, observer_manager, api_client_calls, runtime=None):
         self.observer_manager = observer_manager
         self.api_client_calls = api_client_calls
+        self.runtime = runtime or get_runtime()
+        # Invites from quick successive clicks go out as one batched, rate limited request
+        self.invites = InviteScheduler(send=api_client_calls.invite_friends, on_result=self.respond_invite)
 
     def handle_calls(self, action_type: str, data: Dict[str, str], index: Optional[int] = None):
+        """Called from the GUI thread, the work is handed to the runtime loop."""
         if action_type == 'invite_friend':
             friend_id = data.get('friend_id')
             if friend_id:
-                asyncio.create_task(self.invite_friend(friend_id, index))
+                self.runtime.loop.call_soon_threadsafe(self._submit_invite, friend_id, index)
+        elif action_type == 'open_match_history':
+            # Loaded on the panel's first opening, announced through data_ready like the startup data
+            self.runtime.submit(self.api_client_calls.load('summoner_match_window'))
 
-    async def invite_friend(self, friend_id: str, index: Optional[int] = None):
+    def _submit_invite(self, friend_id: str, index: Optional[int]):
+        # On the loop thread, the InviteScheduler's state is only touched from there
         try:
-            response = await self.api_client_calls.invite_friend(friend_id=friend_id, index=index)
-            self.observer_manager.notify(key="update_ui", function='respond_message_friends', value=response,
-                                         index=index)
-        except Exception as e:
-            print(f"Error inviting friend: {e}")
-            self.observer_manager.notify(key="update_ui", function='respond_message_friends',
-                                         value={'status': 'error', 'message': str(e), 'index': index})
+            self.invites.submit(friend_id, index)
+        except ValueError:
+            self.respond_invite({'status': 'error', 'message': f"Invalid friend id: {friend_id}", 'index': index})
+
+    def respond_invite(self, response: Dict[str, Any]):
+        self.observer_manager.notify(key="update_ui", function='respond_message_friends', value=response,
+                                     index=response.get('index'))
@@ -0,0 +1,388 @@
+import asyncio
+import hashlib
+import json
+import logging
+import os
+import threading
+import time
+from collections import OrderedDict
+from typing import TYPE_CHECKING, Any, Awaitable, Callable, Dict, Iterable, List, Optional, Tuple
+
+from fetch_scheduler import PrioritySlots
+from friends_store import DELETED
+from metrics import ASSET_LOADS
+from paths import APP_DATA_DIR
+
+if TYPE_CHECKING:
+    import aiohttp  # Imported where a download is made, so importing this module stays cheap
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_ASSET_DIR = os.path.join(APP_DATA_DIR, "assets")
+INDEX_FILE = "index.json"
+MEMORY_BUDGET = 32 * 1024 * 1024  # Bytes of decoded images kept in memory
+MAX_DOWNLOADS = 6
+DOWNLOAD_TIMEOUT = 15
+RETRY_FAILED_AFTER = 60.0  # Seconds before an asset that failed to download is tried again
+INDEX_FLUSH_DELAY = 2.0  # Seconds of downloads batched into one write of the disk index
+VISIBLE, PREFETCH = 0, 1  # Download priorities: assets on screen go before predicted ones
+# Ranked emblems are not part of Data Dragon, they come from the Community Dragon mirror of the client files
+RANK_EMBLEM_URL = ("https://raw.communitydragon.org/latest/plugins/rcp-fe-lol-static-assets/global/default/"
+                   "images/ranked-emblem/emblem-{tier}.png")
+
+Decoder = Callable[[bytes], Tuple[Any, int]]  # Content -> (image, bytes it occupies in memory)
+
+
+def raw_decoder(content: bytes) -> Tuple[bytes, int]:
+    return content, len(content)
+
+
+def qt_image_decoder() -> Decoder:
+    """Decoder producing QImages, which unlike QPixmaps may be created off the GUI thread."""
+    from PyQt5.QtGui import QImage  # Imported lazily, the back end runs without Qt
+
+    def decode(content: bytes) -> Tuple[Any, int]:
+        image = QImage.fromData(content)
+        if image.isNull():
+            raise ValueError("Unsupported or corrupt image data")
+        return image, image.sizeInBytes()
+
+    return decode
+
+
+class ByteLRU:
+    """LRU map bounded by the summed size of its values rather than their number, safe to use from any thread."""
+
+    def __init__(self, budget: int):
+        self.budget = budget
+        self.bytes = 0
+        self.hits = self.misses = self.evictions = 0
+        self._entries: 'OrderedDict[str, Tuple[Any, int]]' = OrderedDict()
+        self._lock = threading.Lock()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def __contains__(self, key: str) -> bool:
+        return key in self._entries
+
+    def get(self, key: str) -> Optional[Any]:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return entry[0]
+
+    def put(self, key: str, value: Any, size: int) -> bool:
+        """Store `value` as most recently used, evicting the oldest entries; False if it exceeds the budget."""
+        if size > self.budget:
+            return False
+        with self._lock:
+            previous = self._entries.pop(key, None)
+            if previous is not None:
+                self.bytes -= previous[1]
+            self._entries[key] = (value, size)
+            self.bytes += size
+            while self.bytes > self.budget:
+                _, (_, evicted) = self._entries.popitem(last=False)
+                self.bytes -= evicted
+                self.evictions += 1
+        return True
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+            self.bytes = 0
+
+
+class ContentStore:
+    """
+    Content-addressed disk cache: blobs stored once under objects/<sha256>, plus an index from URL to
+    digest. Icons that do not change between patches share one blob across their versioned URLs.
+    All methods block and are meant for the default executor.
+    """
+
+    def __init__(self, root: str = DEFAULT_ASSET_DIR):
+        self.root = root
+        self._index: Optional[Dict[str, str]] = None
+        self._dirty = False
+        self._lock = threading.Lock()
+
+    def _blob_path(self, digest: str) -> str:
+        return os.path.join(self.root, 'objects', digest[:2], digest[2:])
+
+    def _load_index(self) -> Dict[str, str]:
+        if self._index is None:
+            try:
+                with open(os.path.join(self.root, INDEX_FILE), 'r', encoding='utf-8') as file:
+                    index = json.load(file)
+                self._index = index if isinstance(index, dict) else {}
+            except FileNotFoundError:
+                self._index = {}
+            except (OSError, ValueError) as e:
+                logger.warning(f"Ignoring unreadable asset index: {e}")
+                self._index = {}
+        return self._index
+
+    def read(self, url: str) -> Optional[bytes]:
+        with self._lock:
+            digest = self._load_index().get(url)
+        if digest is None:
+            return None
+        try:
+            with open(self._blob_path(digest), 'rb') as file:
+                content = file.read()
+        except OSError:
+            content = None
+        if content is None or hashlib.sha256(content).hexdigest() != digest:
+            with self._lock:  # Missing or damaged blob, forget it so the asset is downloaded again
+                self._index.pop(url, None)
+                self._dirty = True
+            return None
+        return content
+
+    def write(self, url: str, content: bytes) -> str:
+        digest = hashlib.sha256(content).hexdigest()
+        target = self._blob_path(digest)
+        if not os.path.exists(target):
+            os.makedirs(os.path.dirname(target), exist_ok=True)
+            tmp = f"{target}.{threading.get_ident()}.tmp"
+            with open(tmp, 'wb') as file:
+                file.write(content)
+            os.replace(tmp, target)  # Atomic, a crash never leaves a truncated blob behind
+        with self._lock:
+            self._load_index()[url] = digest
+            self._dirty = True
+        return digest
+
+    def flush(self) -> None:
+        with self._lock:
+            if not self._dirty:
+                return
+            content = json.dumps(self._index).encode('utf-8')
+            self._dirty = False
+        os.makedirs(self.root, exist_ok=True)
+        tmp = os.path.join(self.root, f"{INDEX_FILE}.tmp")
+        with open(tmp, 'wb') as file:
+            file.write(content)
+        os.replace(tmp, os.path.join(self.root, INDEX_FILE))
+
+
+class AssetService:
+    """
+    Profile icons, champion squares and rank emblems for the UI. get() only looks at memory and never
+    waits: on a miss it returns None, loads the image in the background (disk, else one download shared
+    by every caller) and notifies `asset_ready` with the URL once it can be drawn. Icons referenced by
+    the summoner, friends, mastery, ranked stats and match history are prefetched as those land in the
+    cache, so scrolling finds them in memory.
+    """
+
+    def __init__(self, cache, observer_manager, ddragon, session: Callable[[], Awaitable['aiohttp.ClientSession']],
+                 store: Optional[ContentStore] = None, memory_budget: int = MEMORY_BUDGET,
+                 decoder: Decoder = raw_decoder, max_downloads: int = MAX_DOWNLOADS,
+                 loop: Optional[asyncio.AbstractEventLoop] = None):
+        """
+        Args:
+            ddragon (DataDragonStore): Resolves Data Dragon URLs for the current patch.
+            session (Callable): Coroutine function returning the session for downloads
+                (LCUDataRetriever.web_session).
+            store (ContentStore): Disk cache, under DEFAULT_ASSET_DIR by default.
+            memory_budget (int): Bytes of decoded images kept in memory.
+            decoder (Callable): Turns downloaded bytes into (image, size in bytes), run in the default
+                executor. Keeps the raw bytes by default; the Qt UI passes qt_image_decoder().
+            max_downloads (int): Concurrent downloads.
+            loop (AbstractEventLoop): Loop the loads run on, get() misses from other threads are handed
+                to it. The running loop by default, so construct the service on it.
+        """
+        self.cache = cache
+        self.observer_manager = observer_manager
+        self.ddragon = ddragon
+        self.session = session
+        self.store = store or ContentStore()
+        self.memory = ByteLRU(memory_budget)
+        self.decoder = decoder
+        self._downloads = PrioritySlots(max_downloads)
+        self._inflight: Dict[str, asyncio.Task] = {}
+        self._failed: Dict[str, float] = {}  # URL -> monotonic time of the failed attempt
+        self._loop = loop or asyncio.get_running_loop()
+        self._flush_scheduled = False
+        self.observer_manager.add_observer(self)
+
+    # URLs
+    def profile_icon_url(self, icon_id: Any) -> str:
+        return self.ddragon.cdn_url(f"img/profileicon/{icon_id}.png")
+
+    def champion_square_url(self, champ_id: Any) -> Optional[str]:
+        """URL for a numeric champion key, None until champion data is loaded or for unknown keys."""
+        champion = self.cache.get_champion(champ_id)
+        if not champion or not champion.get('id'):
+            return None
+        return self.ddragon.cdn_url(f"img/champion/{champion['id']}.png")
+
+    @staticmethod
+    def rank_emblem_url(tier: str) -> str:
+        return RANK_EMBLEM_URL.format(tier=tier.lower())
+
+    # Access
+    def get(self, url: Optional[str]) -> Optional[Any]:
+        """The decoded image if it is in memory, else None while it is loaded; callable from any thread."""
+        if not url:
+            return None
+        image = self.memory.get(url)
+        if image is not None:
+            ASSET_LOADS.inc('memory')
+            return image
+        self._schedule([url], VISIBLE)
+        return None
+
+    async def fetch(self, url: str) -> Optional[Any]:
+        """Load `url` from memory, disk or network, waiting for it. None if it cannot be loaded."""
+        image = self.memory.get(url)
+        if image is not None:
+            return image
+        task = self._start(url, VISIBLE)
+        return await asyncio.shield(task) if task is not None else None
+
+    def prefetch(self, urls: Iterable[Optional[str]]) -> None:
+        """Load `urls` in the background, behind anything requested through get() or fetch()."""
+        self._schedule([url for url in urls if url], PREFETCH)
+
+    def stats(self) -> Dict[str, Any]:
+        return {'memory_bytes': self.memory.bytes, 'memory_entries': len(self.memory), 'hits': self.memory.hits,
+                'misses': self.memory.misses, 'evictions': self.memory.evictions, 'inflight': len(self._inflight),
+                'failed': len(self._failed)}
+
+    async def close(self) -> None:
+        """Wait for running loads and write the disk index."""
+        if self._inflight:
+            await asyncio.gather(*self._inflight.values(), return_exceptions=True)
+        await asyncio.get_running_loop().run_in_executor(None, self.store.flush)
+
+    # Loading
+    def _schedule(self, urls: List[str], priority: int) -> None:
+        if not urls:
+            return
+        try:
+            running = asyncio.get_running_loop()
+        except RuntimeError:
+            running = None
+        if running is self._loop:
+            self._start_all(urls, priority)
+        elif not self._loop.is_closed():  # UI thread: hand over to the loop
+            self._loop.call_soon_threadsafe(self._start_all, urls, priority)
+
+    def _start_all(self, urls: List[str], priority: int) -> None:
+        for url in urls:
+            self._start(url, priority)
+
+    def _start(self, url: str, priority: int) -> Optional[asyncio.Task]:
+        task = self._inflight.get(url)
+        if task is not None:
+            return task
+        if url in self.memory:
+            return None
+        failed_at = self._failed.get(url)
+        if failed_at is not None and time.monotonic() - failed_at < RETRY_FAILED_AFTER:
+            return None
+        task = self._inflight[url] = asyncio.ensure_future(self._load(url, priority))
+        task.add_done_callback(lambda _: self._inflight.pop(url, None))
+        return task
+
+    async def _load(self, url: str, priority: int) -> Optional[Any]:
+        loop = asyncio.get_running_loop()
+        try:
+            content = await loop.run_in_executor(None, self.store.read, url)
+            if content is not None:
+                source = 'disk'
+            else:
+                source = 'network'
+                content = await self._download(url, priority)
+                await loop.run_in_executor(None, self.store.write, url, content)
+                self._schedule_index_flush()
+            image, size = await loop.run_in_executor(None, self.decoder, content)
+        except Exception as e:
+            ASSET_LOADS.inc('failed')
+            self._failed[url] = time.monotonic()
+            logger.warning(f"Failed to load asset {url}: {e}")
+            return None
+        ASSET_LOADS.inc(source)
+        self._failed.pop(url, None)
+        self.memory.put(url, image, size)
+        self.observer_manager.notify("asset_ready", url=url)
+        return image
+
+    async def _download(self, url: str, priority: int) -> bytes:
+        import aiohttp
+        await self._downloads.acquire(priority)
+        try:
+            session = await self.session()
+            timeout = aiohttp.ClientTimeout(total=DOWNLOAD_TIMEOUT)
+            async with session.get(url, timeout=timeout) as response:
+                if response.status != 200:
+                    raise ValueError(f"Unexpected response status: {response.status}")
+                return await response.read()
+        finally:
+            self._downloads.release()
+
+    def _schedule_index_flush(self) -> None:
+        if self._flush_scheduled:
+            return
+        self._flush_scheduled = True
+        asyncio.get_running_loop().call_later(INDEX_FLUSH_DELAY, self._flush_index)
+
+    def _flush_index(self) -> None:
+        self._flush_scheduled = False
+        future = asyncio.get_running_loop().run_in_executor(None, self.store.flush)
+        future.add_done_callback(self._log_flush_error)
+
+    @staticmethod
+    def _log_flush_error(future: asyncio.Future) -> None:
+        if not future.cancelled() and future.exception() is not None:
+            logger.error(f"Failed to write the asset index: {future.exception()}")
+
+    # Prefetch, driven by observer notifications
+    def data_ready(self, name: str) -> None:
+        self._prefetch_key(name, self.cache.get(name))
+
+    def snapshot_restored(self, keys: List[str], saved_at: float) -> None:
+        for key in keys:
+            self._prefetch_key(key, self.cache.get(key))
+
+    def update_ui(self, function: str, value: Any = None, **_: Any) -> None:
+        if function in ('current_summoner', 'current_ranked_stats', 'summoner_mastery', 'summoner_friends'):
+            self._prefetch_key(function, value)
+
+    def update_friend(self, op: str, friend: Dict[str, Any], **_: Any) -> None:
+        if op != DELETED and friend.get('icon'):
+            self.prefetch([self.profile_icon_url(friend['icon'])])
+
+    def _prefetch_key(self, key: str, value: Any) -> None:
+        if not value:
+            return
+        try:
+            self.prefetch(self._referenced_urls(key, value))
+        except Exception as e:
+            logger.error(f"Failed to prefetch assets for {key}: {e}", exc_info=True)
+
+    def _referenced_urls(self, key: str, value: Any) -> List[Optional[str]]:
+        if key == 'current_summoner':
+            return [value.get('profileIconUrl')]
+        if key == 'summoner_friends':
+            # Already in display order, so the rows at the top of the list load first
+            return [self.profile_icon_url(friend['icon']) for friend in value if friend.get('icon')]
+        if key == 'current_ranked_stats':
+            tier = value.get('highestTier') if isinstance(value, dict) else None
+            return [self.rank_emblem_url(tier)] if isinstance(tier, str) and tier else []
+        if key == 'summoner_mastery':
+            return [self.champion_square_url(entry.get('championId')) for entry in value]
+        if key in ('summoner_match_data', 'summoner_match_window'):
+            return [self.champion_square_url(participant.get('championId'))
+                    for game in value for participant in game.get('participants', ())]
+        if key == 'champs_data':
+            # Champion squares could not be resolved before the champion index existed
+            return [url for dependent in ('summoner_mastery', 'summoner_match_data')
+                    for url in self._referenced_urls(dependent, self.cache.get(dependent) or [])]
+        return []
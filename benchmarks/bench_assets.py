@@ -0,0 +1,145 @@
+"""
+Benchmark for the image asset pipeline against the mock Data Dragon (benchmarks/mock_lcu.py).
+
+    python benchmarks/bench_assets.py [--friends 500] [--image-delay-ms 20] [--budget-kb 1024]
+                                      [--max-scroll-p99-us 100]
+
+Prefetches the profile icons of a friends list cold (network) and warm (disk), then "scrolls" the list
+by calling AssetService.get for every row as a UI paint would, and repeats that with a memory budget
+too small for the whole list. Exits non-zero when the scroll p99 exceeds --max-scroll-p99-us, i.e.
+when painting a row waited on anything but memory.
+"""
+import argparse
+import asyncio
+import logging
+import shutil
+import sys
+import tempfile
+import time
+from typing import Any, Dict, List
+
+from mock_lcu import MockLCU
+from assets import AssetService, ContentStore
+from cache import Cache
+from ddragon import DataDragonStore
+from observer import ObserverManager
+
+
+class _ReadyCounter:
+    def __init__(self):
+        self.ready = 0
+
+    def asset_ready(self, url: str) -> None:
+        self.ready += 1
+
+
+class _Session:
+    """Hands out one shared aiohttp session, like LCUDataRetriever.web_session."""
+
+    def __init__(self):
+        self._session = None
+
+    async def __call__(self):
+        import aiohttp
+        if self._session is None:
+            self._session = aiohttp.ClientSession()
+        return self._session
+
+    async def close(self) -> None:
+        if self._session is not None:
+            await self._session.close()
+
+
+def _service(mock: MockLCU, workdir: str, budget: int, session: _Session) -> AssetService:
+    observer = ObserverManager()
+    observer.add_observer(_ReadyCounter())
+    ddragon = DataDragonStore(cache_dir=f"{workdir}/ddragon", base_url=mock.ddragon_url)
+    return AssetService(cache=Cache(observer), observer_manager=observer, ddragon=ddragon, session=session,
+                        store=ContentStore(f"{workdir}/assets"), memory_budget=budget)
+
+
+def _image_requests(mock: MockLCU) -> int:
+    return sum(count for path, count in mock.requests.items() if '/img/' in path)
+
+
+async def _prefetch_all(service: AssetService, urls: List[str]) -> float:
+    started = time.perf_counter()
+    service.prefetch(urls)
+    await asyncio.gather(*(service.fetch(url) for url in urls))
+    return time.perf_counter() - started
+
+
+def _scroll(service: AssetService, urls: List[str]) -> Dict[str, Any]:
+    latencies, missing = [], 0
+    for url in urls:
+        started = time.perf_counter()
+        image = service.get(url)
+        latencies.append(time.perf_counter() - started)
+        missing += image is None
+    latencies.sort()
+    return {'rows': len(urls), 'missing': missing, 'p50_us': latencies[len(latencies) // 2] * 1e6,
+            'p99_us': latencies[int(len(latencies) * 0.99)] * 1e6, 'max_us': latencies[-1] * 1e6}
+
+
+async def run(args) -> Dict[str, Any]:
+    results = {}
+    workdir = tempfile.mkdtemp(prefix='bench-assets-')
+    session = _Session()
+    try:
+        with MockLCU(friends=args.friends, image_delay=args.image_delay_ms / 1000) as mock:
+            big = 64 * 1024 * 1024
+            service = _service(mock, workdir, big, session)
+            urls = [service.profile_icon_url(friend['icon']) for friend in mock.friends]
+            unique = len(set(urls))
+            results['cold_prefetch_ms'] = await _prefetch_all(service, urls) * 1000
+            results['downloads'] = _image_requests(mock)
+            results['unique_icons'] = unique
+            results['scroll_after_prefetch'] = _scroll(service, urls)
+            await service.close()
+
+            warm = _service(mock, workdir, big, session)
+            results['warm_prefetch_ms'] = await _prefetch_all(warm, urls) * 1000
+            results['downloads_after_warm'] = _image_requests(mock)
+            await warm.close()
+
+            small = _service(mock, workdir, args.budget_kb * 1024, session)
+            await _prefetch_all(small, urls)
+            results['small_budget'] = dict(_scroll(small, urls), memory_bytes=small.memory.bytes,
+                                           budget_bytes=small.memory.budget, evictions=small.memory.evictions)
+            await small.close()
+    finally:
+        await session.close()
+        shutil.rmtree(workdir, ignore_errors=True)
+    return results
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--friends', type=int, default=500)
+    parser.add_argument('--image-delay-ms', type=float, default=20.0, help='Simulated CDN latency per image')
+    parser.add_argument('--budget-kb', type=int, default=1024, help='Memory budget of the eviction case')
+    parser.add_argument('--max-scroll-p99-us', type=float, default=100.0)
+    args = parser.parse_args()
+    logging.basicConfig(level=logging.WARNING)
+
+    results = asyncio.run(run(args))
+    scroll = results['scroll_after_prefetch']
+    print(f"cold prefetch: {results['cold_prefetch_ms']:8.1f} ms, {results['downloads']} downloads "
+          f"for {scroll['rows']} rows ({results['unique_icons']} distinct icons)")
+    print(f"warm prefetch: {results['warm_prefetch_ms']:8.1f} ms from disk, "
+          f"{results['downloads_after_warm'] - results['downloads']} downloads")
+    for name in ('scroll_after_prefetch', 'small_budget'):
+        case = results[name]
+        print(f"{name:>21}: p50 {case['p50_us']:6.2f} us  p99 {case['p99_us']:6.2f} us  "
+              f"max {case['max_us']:8.2f} us  {case['missing']} of {case['rows']} rows not in memory")
+    small = results['small_budget']
+    print(f"small budget: {small['memory_bytes'] // 1024} of {small['budget_bytes'] // 1024} KiB used, "
+          f"{small['evictions']} evictions")
+    if scroll['p99_us'] > args.max_scroll_p99_us or small['p99_us'] > args.max_scroll_p99_us:
+        print(f"FAIL: scrolling p99 above {args.max_scroll_p99_us} us", file=sys.stderr)
+        return 1
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
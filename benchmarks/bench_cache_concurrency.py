@@ -0,0 +1,166 @@
+"""
+Stress benchmark for Cache reads under concurrent updates and a slow synchronous observer.
+
+    python benchmarks/bench_cache_concurrency.py [--readers 4] [--writers 2] [--duration 2] [--observer-ms 2]
+                                                 [--read-interval-us 200] [--max-p99-us 1000]
+
+Reader threads call get, get_nested and get_champion_name every --read-interval-us while writer
+threads keep updating their own keys, each update notifying an observer that blocks for --observer-ms.
+Reports reader latency and the share of reads stalled over 100 us for the previous single-lock cache
+and the copy-on-write Cache, unsharded and sharded. Exits non-zero when the copy-on-write reader p99
+exceeds --max-p99-us.
+"""
+import argparse
+import logging
+import statistics
+import sys
+import threading
+import time
+from threading import RLock
+from typing import Any, Callable, Dict, List
+
+import fixtures  # noqa: F401, puts the repository root on sys.path
+from cache import Cache, build_champion_index
+from diffing import diff
+from observer import ObserverManager
+
+READ_KEYS = ('current_summoner', 'current_ranked_stats')
+STALL = 100e-6  # Reads slower than this count as stalled
+
+
+class _LockedCache:
+    # The pre-copy-on-write implementation, kept here as the comparison baseline: every read takes the
+    # lock and observers are notified while it is held
+    def __init__(self, observer_manager):
+        self.observer_manager = observer_manager
+        self.cache = {}
+        self.cache_lock = RLock()
+        self.champion_index = build_champion_index(None)
+
+    def set(self, key, value):
+        with self.cache_lock:
+            self.cache[key] = value
+            if key == 'champs_data':
+                self.champion_index = build_champion_index(value)
+
+    def get(self, key):
+        with self.cache_lock:
+            return self.cache.get(key)
+
+    def update(self, key, new_value):
+        with self.cache_lock:
+            if diff(self.cache.get(key), new_value):
+                self.cache[key] = new_value
+                self.observer_manager.notify('update_ui', function=key, value=new_value)
+
+    def get_nested(self, *args):
+        with self.cache_lock:
+            cache = self.cache
+            for arg in args:
+                cache = cache.get(arg)
+                if cache is None:
+                    return None
+                if isinstance(cache, dict) and 'value' in cache:
+                    cache = cache['value']
+            return cache
+
+    def get_champion_name(self, champ_id):
+        champ_info = self.champion_index.by_key.get(int(champ_id))
+        return champ_info.get('name', 'Unknown') if champ_info else 'Unknown'
+
+
+class _SlowObserver:
+    def __init__(self, delay: float):
+        self.delay = delay
+
+    def update_ui(self, function, value, **_):
+        time.sleep(self.delay)  # A UI handler redrawing synchronously
+
+
+def _seed(cache) -> None:
+    cache.set('champs_data', {'Aatrox': {'id': 'Aatrox', 'key': '266', 'name': 'Aatrox'}})
+    cache.set('current_summoner', {'puuid': 'bench', 'summonerId': 1, 'displayName': 'Bench'})
+    cache.set('current_ranked_stats', {'value': {'tier': 'GOLD', 'division': 'II'}})
+
+
+def run_case(make_cache: Callable[[ObserverManager], Any], args) -> Dict[str, float]:
+    observer = ObserverManager()
+    observer.add_observer(_SlowObserver(args.observer_ms / 1000))
+    cache = make_cache(observer)
+    _seed(cache)
+    stop = threading.Event()
+    samples: List[List[float]] = []
+    writes = [0]
+
+    def reader() -> None:
+        latencies = []
+        samples.append(latencies)
+        clock, interval = time.perf_counter, args.read_interval_us / 1e6
+        while not stop.is_set():
+            for key in READ_KEYS:
+                started = clock()
+                cache.get(key)
+                cache.get_nested(key, 'tier')
+                cache.get_champion_name(266)
+                latencies.append(clock() - started)
+            time.sleep(interval)  # A UI polling the cache, not a busy loop
+
+    def writer(index: int) -> None:
+        key, counter = f"champ_select_{index}", 0
+        while not stop.is_set():
+            counter += 1
+            cache.update(key, {'timer': counter, 'phase': 'BAN_PICK'})
+            writes[0] += 1
+
+    threads = [threading.Thread(target=reader) for _ in range(args.readers)]
+    threads += [threading.Thread(target=writer, args=(index,)) for index in range(args.writers)]
+    for thread in threads:
+        thread.start()
+    time.sleep(args.duration)
+    stop.set()
+    for thread in threads:
+        thread.join()
+
+    latencies = sorted(latency for thread_samples in samples for latency in thread_samples)
+    return {
+        'reads_per_s': len(latencies) / args.duration,
+        'writes_per_s': writes[0] / args.duration,
+        'p50_us': statistics.median(latencies) * 1e6,
+        'p99_us': latencies[int(len(latencies) * 0.99)] * 1e6,
+        'stalled': sum(1 for latency in latencies if latency > STALL) / len(latencies),
+        'max_us': latencies[-1] * 1e6,
+    }
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--readers', type=int, default=4)
+    parser.add_argument('--writers', type=int, default=2)
+    parser.add_argument('--duration', type=float, default=2.0, help='Seconds per case')
+    parser.add_argument('--observer-ms', type=float, default=2.0, help='Time the observer blocks per update')
+    parser.add_argument('--read-interval-us', type=float, default=200, help='Pause between reader iterations')
+    parser.add_argument('--shards', type=int, default=4, help='Shards of the sharded case')
+    parser.add_argument('--max-p99-us', type=float, default=1000, help='Fail above this copy-on-write p99')
+    args = parser.parse_args()
+    logging.disable(logging.INFO)  # Cache.update logs every change
+
+    cases = {
+        'locked': _LockedCache,
+        'cow': Cache,
+        f"cow/{args.shards}": lambda observer: Cache(observer, shards=args.shards),
+    }
+    failed = False
+    for name, make_cache in cases.items():
+        result = run_case(make_cache, args)
+        print(f"{name:>8}: reads p50 {result['p50_us']:8.1f} us  p99 {result['p99_us']:9.1f} us  "
+              f"max {result['max_us']:9.1f} us  stalled {result['stalled']:6.1%}  "
+              f"{result['reads_per_s']:>9,.0f} reads/s  {result['writes_per_s']:>7,.0f} writes/s")
+        if name != 'locked' and result['p99_us'] > args.max_p99_us:
+            failed = True
+    if failed:
+        print(f"FAIL: copy-on-write reader p99 above {args.max_p99_us} us", file=sys.stderr)
+    return 1 if failed else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
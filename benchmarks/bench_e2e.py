@@ -0,0 +1,343 @@
+"""
+End-to-end benchmarks against the mock LCU (benchmarks/mock_lcu.py), no League client needed.
+
+    python benchmarks/bench_e2e.py [--output results.json] [--compare baseline.json] [--tolerance 0.2]
+                                   [--record traffic.rec.gz]
+
+Reports cold start (client discovery, get_client_data, and check_client_status up to the first paint
+and to all data), a start whose first current-summoner request hangs, event throughput and latency from
+the WebSocket through MessageHandler and Cache.update to an observer, and memory over repeated event
+rounds. Exits non-zero when the hung request is not retried with a new one and, with --compare, when a
+metric regressed by more than --tolerance relative to the baseline file written by an earlier --output run.
+"""
+import argparse
+import asyncio
+import gc
+import json
+import logging
+import os
+import shutil
+import statistics
+import sys
+import tempfile
+import time
+import tracemalloc
+from typing import Any, Dict, List, Optional
+
+import psutil
+
+from mock_lcu import MockLCU
+from cache import Cache
+from client_manager import ClientManager
+from client_request import LCUManager
+from ddragon import DataDragonStore
+from friends_store import FriendsStore
+from lcu_api import LCUDataRetriever
+from lcu_websocket import WebSocketManager
+from match_history import MatchHistorySync, MatchStore
+from message_handler import MessageHandler
+from observer import ObserverManager
+from recording import FrameRecorder
+from request_cache import ResponseCache
+
+CHAMP_SELECT_URI = "/lol-champ-select/v1/session"
+
+# Metric -> True when higher is better, the metrics checked by --compare
+TRACKED_METRICS = {
+    'cold_start.discovery_ms': False,
+    'cold_start.client_data_ms': False,
+    'warm_start.client_data_ms': False,
+    'check_client_status.first_paint_ms': False,
+    'throughput.events_per_s': True,
+    'latency.p50_ms': False,
+    'latency.p95_ms': False,
+    'memory.traced_growth_kb': False,
+}
+
+
+class LatencyProbe:
+    """Observer timing summoner updates whose displayName carries the perf_counter of their send."""
+
+    def __init__(self):
+        self.latencies: List[float] = []
+        self.updates = 0
+
+    def update_ui(self, function, value, **_):
+        self.updates += 1
+        name = value.get('displayName', '') if function == 'current_summoner' else ''
+        if name.startswith('probe:'):
+            self.latencies.append(time.perf_counter() - float(name.rsplit(':', 1)[1]))
+
+
+class Harness:
+    """The application wired like main.App, but pointed at the mock and at throwaway stores."""
+
+    def __init__(self, mock: MockLCU, workdir: str, recorder: Optional[FrameRecorder] = None):
+        ssl_context = mock.client_ssl_context()
+        self.observer = ObserverManager()
+        self.cache = Cache(observer_manager=self.observer)
+        self.response_cache = ResponseCache()
+        self.friends = FriendsStore(cache=self.cache, observer_manager=self.observer)
+        self.message_handler = MessageHandler(observer_manager=self.observer, cache=self.cache,
+                                              response_cache=self.response_cache, friends=self.friends)
+        self.match_store = MatchStore(os.path.join(workdir, 'matches.sqlite3'))
+        self.lcu_calls = LCUDataRetriever(cache=self.cache, ssl=ssl_context, response_cache=self.response_cache,
+                                          ddragon=DataDragonStore(cache_dir=os.path.join(workdir, 'ddragon'),
+                                                                  base_url=mock.ddragon_url),
+                                          match_sync=MatchHistorySync(self.match_store), friends=self.friends)
+        self.websocket_manager = WebSocketManager(cache=self.cache, ssl=ssl_context, lcu_calls=self.lcu_calls,
+                                                  observer_manager=self.observer,
+                                                  message_handler=self.message_handler, recorder=recorder)
+        self.client_manager = ClientManager(observer_manager=self.observer, cache=self.cache,
+                                            lcu_calls=self.lcu_calls, websocket_manager=self.websocket_manager)
+        # The mock's lockfile names this process, so accept its process name as the client's
+        self.client_manager.lcu_manager = LCUManager(cache=self.cache, install_dirs=[mock.install_dir],
+                                                     process_names=(psutil.Process().name(),))
+        # A champ-select handler of the kind the UI will need, so storms exercise Cache.update diffing
+        self.message_handler.register_route(
+            CHAMP_SELECT_URI, lambda event: self.cache.update('champ_select', event.get('data')))
+        self.probe = LatencyProbe()
+        self.observer.add_observer(self.probe)
+
+    async def close(self) -> None:
+        await self.lcu_calls.close()
+        self.match_store.close()
+
+
+def _ms(seconds: float) -> float:
+    return round(seconds * 1000, 3)
+
+
+def _percentile(values: List[float], fraction: float) -> float:
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(fraction * len(ordered)))] if ordered else 0.0
+
+
+async def _wait_for(condition, timeout: float, interval: float = 0.005) -> bool:
+    deadline = time.monotonic() + timeout
+    while not condition():
+        if time.monotonic() >= deadline:
+            return False
+        await asyncio.sleep(interval)
+    return True
+
+
+async def _drained(harness: Harness, sent: int, timeout: float = 60.0) -> bool:
+    pipeline = harness.websocket_manager.pipeline
+    return await _wait_for(lambda: pipeline.counters['received'] >= sent and pipeline.depth == 0
+                           and not pipeline._busy, timeout)
+
+
+async def bench_start(mock: MockLCU, repeat: int) -> Dict[str, Any]:
+    """Discovery and get_client_data with empty disk stores (cold) and reused ones (warm)."""
+    cold, warm, check, first_paint = [], [], [], []
+    for _ in range(repeat):
+        workdir = tempfile.mkdtemp(prefix='bench-e2e-')
+        try:
+            for run in ('cold', 'warm'):
+                harness = Harness(mock, workdir)
+                started = time.perf_counter()
+                if not await harness.client_manager.lcu_manager.fetch_credentials():
+                    raise RuntimeError("Mock client not discovered")
+                discovered = time.perf_counter()
+                await harness.lcu_calls.get_client_data()
+                finished = time.perf_counter()
+                (cold if run == 'cold' else warm).append((discovered - started, finished - discovered))
+                await harness.close()
+
+            harness = Harness(mock, workdir)
+            startup = harness.client_manager.startup
+            started = startup.elapsed()
+            await harness.client_manager.check_client_status()
+            check.append(startup.elapsed() - started)
+            first_paint.append(startup.milestones['first_paint'] - started)
+            await harness.close()
+        finally:
+            shutil.rmtree(workdir, ignore_errors=True)
+    return {
+        'cold_start': {'discovery_ms': _ms(min(d for d, _ in cold)), 'client_data_ms': _ms(min(c for _, c in cold))},
+        'warm_start': {'discovery_ms': _ms(min(d for d, _ in warm)), 'client_data_ms': _ms(min(c for _, c in warm))},
+        # Staged startup: the main menu is shown once the summoner landed, the rest follows
+        'check_client_status': {'first_paint_ms': _ms(min(first_paint)), 'total_ms': _ms(min(check))},
+    }
+
+
+async def bench_stalled_start(mock: MockLCU, timeout: float = 0.2) -> Dict[str, Any]:
+    """
+    get_client_data while the first current-summoner request hangs: the attempt times out after `timeout`
+    and the retry has to send a request of its own rather than wait on the hung one, i.e. every attempt
+    reaches the client.
+    """
+    path = '/lol-summoner/v1/current-summoner'
+    workdir = tempfile.mkdtemp(prefix='bench-e2e-')
+    try:
+        harness = Harness(mock, workdir)
+        scheduler = harness.lcu_calls.scheduler
+        scheduler.sources['current_summoner'] = scheduler.sources['current_summoner']._replace(timeout=timeout)
+        if not await harness.client_manager.lcu_manager.fetch_credentials():
+            raise RuntimeError("Mock client not discovered")
+        mock.stall(path, seconds=timeout * 10)
+        requests_before = mock.requests.get(path, 0)
+        started = time.perf_counter()
+        statuses = await harness.lcu_calls.get_client_data()
+        finished = time.perf_counter()
+        attempts = scheduler.status()['current_summoner']['attempts']
+        await harness.close()
+    finally:
+        mock.stalls.pop(path, None)
+        shutil.rmtree(workdir, ignore_errors=True)
+    return {'stalled_start': {'current_summoner': statuses['current_summoner'], 'attempts': attempts,
+                              'requests': mock.requests.get(path, 0) - requests_before,
+                              'client_data_ms': _ms(finished - started)}}
+
+
+async def _connect(mock: MockLCU, harness: Harness) -> asyncio.Task:
+    if not await harness.client_manager.lcu_manager.fetch_credentials():
+        raise RuntimeError("Mock client not discovered")
+    task = asyncio.ensure_future(harness.websocket_manager.start_websocket())
+    if not await _wait_for(lambda: mock.subscribed, timeout=10):
+        raise RuntimeError("WebSocket did not subscribe")
+    return task
+
+
+def _mixed_events(mock: MockLCU, count: int) -> List:
+    thirds = count // 3
+    storm = mock.champ_select_storm(thirds)
+    churn = mock.presence_churn(thirds)
+    probes = mock.summoner_events(count - 2 * thirds)
+    return [event for group in zip(storm, churn, probes) for event in group] + probes[thirds:]
+
+
+async def bench_events(mock: MockLCU, events: int, probes: int, rounds: int,
+                       record: Optional[str] = None) -> Dict[str, Any]:
+    workdir = tempfile.mkdtemp(prefix='bench-e2e-')
+    harness = Harness(mock, workdir, recorder=FrameRecorder(record) if record else None)
+    task = await _connect(mock, harness)
+    loop = asyncio.get_running_loop()
+    pipeline = harness.websocket_manager.pipeline
+    try:
+        # Throughput: a burst of mixed frames, timed from the first send until the pipeline drained
+        started = time.perf_counter()
+        sent = await asyncio.wrap_future(mock.push(_mixed_events(mock, events)), loop=loop)
+        drained = await _drained(harness, sent)
+        elapsed = time.perf_counter() - started
+        burst = dict(pipeline.stats())
+        throughput = {'frames': sent, 'seconds': round(elapsed, 4), 'events_per_s': round(sent / elapsed, 1),
+                      'drained': drained, 'pipeline': burst}
+
+        # Latency: probes paced a millisecond apart over a champ-select storm, so they are not coalesced
+        harness.probe.latencies.clear()
+        storm = mock.push(mock.champ_select_storm(probes * 4, delay=0.00025))
+        sent = await asyncio.wrap_future(mock.push(mock.summoner_events(probes, delay=0.001)), loop=loop)
+        sent += await asyncio.wrap_future(storm, loop=loop)
+        await _drained(harness, pipeline.counters['received'] - burst['received'] + sent)
+        await _wait_for(lambda: len(harness.probe.latencies) >= probes, timeout=2)
+        latencies = harness.probe.latencies
+        latency = {
+            'probes': probes, 'delivered': len(latencies),
+            'p50_ms': _ms(_percentile(latencies, 0.5)), 'p95_ms': _ms(_percentile(latencies, 0.95)),
+            'p99_ms': _ms(_percentile(latencies, 0.99)), 'max_ms': _ms(max(latencies, default=0.0)),
+            'mean_ms': _ms(statistics.fmean(latencies)) if latencies else 0.0,
+        }
+
+        # Memory: repeated rounds, the first one is warm-up so lazily built state does not count as growth
+        process = psutil.Process()
+        tracemalloc.start()
+        samples = []
+        try:
+            for _ in range(rounds + 1):
+                received = pipeline.counters['received']
+                sent = await asyncio.wrap_future(mock.push(_mixed_events(mock, events)), loop=loop)
+                await _drained(harness, received + sent)
+                gc.collect()
+                samples.append((tracemalloc.get_traced_memory()[0], process.memory_info().rss))
+            peak = tracemalloc.get_traced_memory()[1]
+        finally:
+            tracemalloc.stop()
+        memory = {
+            'rounds': rounds, 'events_per_round': events,
+            'traced_growth_kb': round((samples[-1][0] - samples[0][0]) / 1024, 1),
+            'traced_peak_kb': round(peak / 1024, 1),
+            'rss_start_mb': round(samples[0][1] / 2 ** 20, 1), 'rss_end_mb': round(samples[-1][1] / 2 ** 20, 1),
+        }
+        return {'throughput': throughput, 'latency': latency, 'memory': memory, 'pipeline': pipeline.stats()}
+    finally:
+        task.cancel()
+        await asyncio.gather(task, return_exceptions=True)
+        await harness.close()
+        shutil.rmtree(workdir, ignore_errors=True)
+
+
+def _flatten(results: Dict[str, Any], prefix: str = '') -> Dict[str, Any]:
+    flat = {}
+    for key, value in results.items():
+        if isinstance(value, dict):
+            flat.update(_flatten(value, f"{prefix}{key}."))
+        else:
+            flat[f"{prefix}{key}"] = value
+    return flat
+
+
+def compare(results: Dict[str, Any], baseline: Dict[str, Any], tolerance: float) -> List[str]:
+    """Descriptions of the tracked metrics that regressed by more than `tolerance` (a fraction)."""
+    current, previous = _flatten(results), _flatten(baseline)
+    regressions = []
+    for metric, higher_is_better in TRACKED_METRICS.items():
+        new, old = current.get(metric), previous.get(metric)
+        if not isinstance(new, (int, float)) or not isinstance(old, (int, float)) or old <= 0:
+            continue
+        change = (new - old) / old
+        if (-change if higher_is_better else change) > tolerance:
+            regressions.append(f"{metric}: {old} -> {new} ({change:+.0%})")
+    return regressions
+
+
+async def run(args: argparse.Namespace) -> Dict[str, Any]:
+    with MockLCU(friends=args.friends, matches=args.matches) as mock:
+        results = {'python': sys.version.split()[0]}
+        results.update(await bench_start(mock, args.repeat))
+        results.update(await bench_stalled_start(mock))
+        results.update(await bench_events(mock, args.events, args.probes, args.rounds, args.record))
+        results['mock_requests'] = dict(sorted(mock.requests.items()))
+        return results
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--repeat', type=int, default=3, help='Cold/warm start repetitions, the best is reported')
+    parser.add_argument('--events', type=int, default=3000, help='Frames per throughput burst and memory round')
+    parser.add_argument('--probes', type=int, default=200, help='Latency probes')
+    parser.add_argument('--rounds', type=int, default=10, help='Memory rounds after the warm-up round')
+    parser.add_argument('--friends', type=int, default=200)
+    parser.add_argument('--matches', type=int, default=200)
+    parser.add_argument('--output', help='Write the results as JSON, usable as a later --compare baseline')
+    parser.add_argument('--compare', help='Baseline JSON to check the tracked metrics against')
+    parser.add_argument('--tolerance', type=float, default=0.2, help='Allowed relative regression')
+    parser.add_argument('--record', help='Record the WebSocket traffic of the event benchmarks to this file')
+    parser.add_argument('--verbose', action='store_true', help='Keep the application INFO logging')
+    args = parser.parse_args()
+
+    if not args.verbose:
+        logging.disable(logging.INFO)
+    results = asyncio.run(run(args))
+    print(json.dumps(results, indent=2))
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as file:
+            json.dump(results, file, indent=2)
+
+    stalled = results['stalled_start']
+    if stalled['current_summoner'] != 'done' or stalled['requests'] != stalled['attempts']:
+        print(f"FAIL: current_summoner {stalled['current_summoner']} after a hung request, "
+              f"{stalled['attempts']} attempts sent {stalled['requests']} requests", file=sys.stderr)
+        return 1
+    if args.compare:
+        with open(args.compare, 'r', encoding='utf-8') as file:
+            regressions = compare(results, json.load(file), args.tolerance)
+        for regression in regressions:
+            print(f"Regression: {regression}", file=sys.stderr)
+        return 1 if regressions else 0
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,58 @@
+"""
+Micro-benchmark for the match transform stage.
+
+    python benchmarks/bench_match_transform.py [--games 500] [--min-speedup 1.3]
+
+Exits non-zero when annotate_matches is not at least --min-speedup times as fast as the legacy transform,
+measured in the same run so the guard holds on any machine.
+"""
+import argparse
+import copy
+import sys
+import timeit
+
+from fixtures import PLAYER_SUMMONER_ID, make_games
+from match_transform import annotate_matches
+
+
+def _legacy_transform(match_data, summoner_id):
+    # The pre-index implementation, kept here as the comparison baseline
+    for data in match_data:
+        participant_info = next((identity for identity in data['participantIdentities']
+                                 if identity['player']['summonerId'] == summoner_id), None)
+        participant_id = participant_info['participantId'] if participant_info else None
+        if participant_id:
+            participant_team = next((participant['teamId'] for participant in data['participants']
+                                     if participant['participantId'] == participant_id), None)
+            if participant_team:
+                team_win = next((team['win'] for team in data['teams'] if team['teamId'] == participant_team), 'Fail')
+                data['winLoss'] = 'Victory' if team_win == 'Win' else 'Defeat'
+    return match_data
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--games', type=int, default=500)
+    parser.add_argument('--repeat', type=int, default=5)
+    parser.add_argument('--min-speedup', type=float, default=1.3, help='Fail below this speedup over legacy')
+    args = parser.parse_args()
+
+    games = make_games(args.games)
+    cases = {
+        'legacy': lambda: _legacy_transform(copy.copy(games), PLAYER_SUMMONER_ID),
+        'annotate': lambda: sum(1 for _ in annotate_matches(games, PLAYER_SUMMONER_ID)),
+    }
+    best = {}
+    for name, case in cases.items():
+        best[name] = min(timeit.repeat(case, number=1, repeat=args.repeat))
+        print(f"{name:>9}: {best[name] * 1000:8.2f} ms for {args.games} games, {args.games / best[name]:,.0f} games/s")
+    speedup = best['legacy'] / best['annotate']
+    print(f"  speedup: {speedup:.2f}x over legacy")
+    if speedup < args.min_speedup:
+        print(f"FAIL: annotate speedup below --min-speedup {args.min_speedup}x", file=sys.stderr)
+        return 1
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
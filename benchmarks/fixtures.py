@@ -0,0 +1,61 @@
+import os
+import random
+import sys
+from typing import Any, Dict, List
+
+# Benchmarks run as scripts from a checkout, make the application modules importable
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if ROOT not in sys.path:
+    sys.path.insert(0, ROOT)
+
+LANES = [('TOP', 'SOLO'), ('JUNGLE', 'NONE'), ('MIDDLE', 'SOLO'), ('BOTTOM', 'DUO_CARRY'), ('BOTTOM', 'DUO_SUPPORT')]
+QUEUES = [420, 440, 450, 400, 430]
+PLAYER_PUUID = 'bench-puuid'
+PLAYER_SUMMONER_ID = 1001
+
+
+def make_game(game_id: int, rng: random.Random, player_slot: int = 1) -> Dict[str, Any]:
+    """Synthetic LCU match-history game shaped like /lol-match-history/v1/products/lol/{puuid}/matches."""
+    blue_wins = rng.random() < 0.5
+    participants, identities = [], []
+    for participant_id in range(1, 11):
+        team_id = 100 if participant_id <= 5 else 200
+        lane, role = LANES[(participant_id - 1) % 5]
+        is_player = participant_id == player_slot
+        participants.append({
+            'participantId': participant_id,
+            'teamId': team_id,
+            'championId': rng.randint(1, 160),
+            'stats': {
+                'win': blue_wins == (team_id == 100),
+                'kills': rng.randint(0, 15),
+                'deaths': rng.randint(0, 12),
+                'assists': rng.randint(0, 20),
+                'totalMinionsKilled': rng.randint(0, 280),
+                'neutralMinionsKilled': rng.randint(0, 60),
+            },
+            'timeline': {'lane': lane, 'role': role},
+        })
+        identities.append({
+            'participantId': participant_id,
+            'player': {
+                'summonerId': PLAYER_SUMMONER_ID if is_player else 5000 + game_id * 10 + participant_id,
+                'puuid': PLAYER_PUUID if is_player else f'puuid-{game_id}-{participant_id}',
+                'summonerName': f'Player{participant_id}',
+            },
+        })
+    return {
+        'gameId': game_id,
+        'gameCreation': 1_700_000_000_000 + game_id * 2_400_000,
+        'gameDuration': rng.randint(900, 2700),
+        'queueId': rng.choice(QUEUES),
+        'participantIdentities': identities,
+        'participants': participants,
+        'teams': [{'teamId': 100, 'win': 'Win' if blue_wins else 'Fail'},
+                  {'teamId': 200, 'win': 'Fail' if blue_wins else 'Win'}],
+    }
+
+
+def make_games(count: int, seed: int = 7) -> List[Dict[str, Any]]:
+    rng = random.Random(seed)
+    return [make_game(game_id, rng, player_slot=rng.randint(1, 10)) for game_id in range(count, 0, -1)]
@@ -0,0 +1,286 @@
+"""
+Self-contained stand-in for the League client: LCU REST endpoints and WAMP WebSocket over self-signed
+TLS, a Data Dragon stand-in over plain HTTP, and a lockfile naming the current process.
+
+    python benchmarks/mock_lcu.py  # Serve until interrupted, prints the lockfile location
+"""
+import asyncio
+import base64
+import hashlib
+import json
+import os
+import random
+import shutil
+import ssl
+import subprocess
+import tempfile
+import threading
+import time
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+from aiohttp import WSMsgType, web
+
+from fixtures import PLAYER_PUUID, PLAYER_SUMMONER_ID, make_games
+from routing import EVENT_PREFIX, event_name
+
+DDRAGON_VERSION = "14.8.1"
+AVAILABILITIES = ('chat', 'away', 'dnd', 'offline', 'mobile')
+
+
+def generate_certificate(directory: str) -> Tuple[str, str]:
+    """Self-signed certificate for 127.0.0.1 via the openssl CLI, returns (cert path, key path)."""
+    cert, key = os.path.join(directory, 'cert.pem'), os.path.join(directory, 'key.pem')
+    if shutil.which('openssl') is None:
+        raise RuntimeError("The openssl command is required to generate the mock LCU certificate")
+    subprocess.run(['openssl', 'req', '-x509', '-newkey', 'rsa:2048', '-nodes', '-keyout', key, '-out', cert,
+                    '-days', '1', '-subj', '/CN=127.0.0.1', '-addext', 'subjectAltName=IP:127.0.0.1'],
+                   check=True, capture_output=True)
+    return cert, key
+
+
+def make_friends(count: int, rng: random.Random) -> List[Dict[str, Any]]:
+    return [{
+        'id': f'friend-{index}@pvp.net',
+        'puuid': f'friend-puuid-{index}',
+        'summonerId': 9000 + index,
+        'gameName': f'Friend{index}',
+        'name': f'Friend{index}',
+        'availability': rng.choice(AVAILABILITIES),
+        'icon': rng.randint(1, 5000),
+        'lol': {'gameStatus': rng.choice(('outOfGame', 'inGame', 'championSelect'))},
+    } for index in range(count)]
+
+
+def make_champions(count: int = 170) -> Dict[str, Any]:
+    return {'type': 'champion', 'version': DDRAGON_VERSION, 'data': {
+        f'Champion{key}': {'id': f'Champion{key}', 'key': str(key), 'name': f'Champion {key}',
+                           'title': 'the Benchmark', 'tags': ['Fighter']}
+        for key in range(1, count + 1)}}
+
+
+class MockLCU:
+    """
+    Runs the stand-in servers on their own event loop thread so that the application under test keeps
+    its loop to itself. Use as a context manager or call start()/stop().
+    """
+
+    def __init__(self, friends: int = 200, matches: int = 200, password: str = 'mock-password', seed: int = 7,
+                 image_delay: float = 0.0):
+        self.password = password
+        self.image_delay = image_delay  # Seconds each Data Dragon image takes, to stand in for the CDN
+        self.rng = random.Random(seed)
+        self.summoner = {
+            'accountId': 1, 'displayName': 'MockPlayer', 'profileIconId': 29, 'puuid': PLAYER_PUUID,
+            'summonerId': PLAYER_SUMMONER_ID, 'summonerLevel': 100,
+        }
+        self.friends = make_friends(friends, self.rng)
+        self.games = make_games(matches)
+        self.champions = make_champions()
+        self.mastery = [{'championId': self.rng.randint(1, 170), 'championLevel': 7,
+                         'championPoints': 500_000 - index * 1000} for index in range(50)]
+        self.ranked = {
+            'highestRankedEntry': {'highestTier': 'GOLD', 'queueType': 'RANKED_SOLO_5x5', 'division': 'II',
+                                   'losses': 40, 'wins': 45, 'leaguePoints': 37},
+            'seasons': {'RANKED_SOLO_5x5': {'currentSeasonId': 14}},
+        }
+        self.requests: Dict[str, int] = {}  # Path -> request count, for checking caching/coalescing
+        self.stalls: Dict[str, List[float]] = {}  # Path -> delays of its next responses, see stall()
+        self.workdir = tempfile.mkdtemp(prefix='mock-lcu-')
+        self.install_dir = os.path.join(self.workdir, 'League of Legends')
+        self.port: Optional[int] = None
+        self.ddragon_url: Optional[str] = None
+        self.cert_path: Optional[str] = None
+        self.loop: Optional[asyncio.AbstractEventLoop] = None
+        self._sockets: List[Tuple[web.WebSocketResponse, set]] = []
+        self._thread: Optional[threading.Thread] = None
+        self._ready = threading.Event()
+        self._runner: Optional[web.AppRunner] = None
+
+    # Lifecycle
+    def __enter__(self) -> 'MockLCU':
+        self.start()
+        return self
+
+    def __exit__(self, *exc_info: Any) -> None:
+        self.stop()
+
+    def start(self) -> None:
+        self.cert_path, key_path = generate_certificate(self.workdir)
+        self._thread = threading.Thread(target=self._serve, args=(key_path,), daemon=True, name='mock-lcu')
+        self._thread.start()
+        if not self._ready.wait(timeout=10):
+            raise RuntimeError("Mock LCU did not start")
+        os.makedirs(self.install_dir, exist_ok=True)
+        with open(os.path.join(self.install_dir, 'lockfile'), 'w', encoding='utf-8') as file:
+            file.write(f"LeagueClient:{os.getpid()}:{self.port}:{self.password}:https")
+
+    def stop(self) -> None:
+        if self.loop is not None:
+            asyncio.run_coroutine_threadsafe(self._runner.cleanup(), self.loop).result(timeout=10)
+            self.loop.call_soon_threadsafe(self.loop.stop)
+            self._thread.join(timeout=10)
+            self.loop = None
+        shutil.rmtree(self.workdir, ignore_errors=True)
+
+    def client_ssl_context(self) -> ssl.SSLContext:
+        context = ssl.SSLContext(ssl.PROTOCOL_TLS_CLIENT)
+        context.load_verify_locations(self.cert_path)
+        return context
+
+    def _serve(self, key_path: str) -> None:
+        self.loop = asyncio.new_event_loop()
+        asyncio.set_event_loop(self.loop)
+        self.loop.run_until_complete(self._start_sites(key_path))
+        self._ready.set()
+        self.loop.run_forever()
+        self.loop.close()
+
+    async def _start_sites(self, key_path: str) -> None:
+        app = web.Application(middlewares=[self._count_requests])
+        app.add_routes([
+            web.get('/', self._websocket),
+            web.get('/lol-summoner/v1/current-summoner', self._json(lambda: self.summoner)),
+            web.get('/lol-collections/v1/inventories/{summoner_id}/champion-mastery', self._json(lambda: self.mastery)),
+            web.get('/lol-ranked/v1/current-ranked-stats', self._json(lambda: self.ranked)),
+            web.get('/lol-chat/v1/friends', self._json(lambda: self.friends)),
+            web.get('/lol-match-history/v1/products/lol/{puuid}/matches', self._match_history),
+            web.post('/lol-lobby/v2/lobby', self._json(lambda: {})),
+            web.post('/lol-lobby/matchmaking/search', self._json(lambda: {})),
+            web.post('/lol-matchmaking/v1/ready-check/accept', self._json(lambda: {})),
+            web.post('/lol-lobby/v2/lobby/invitations', self._invitations),
+            web.get('/api/versions.json', self._json(lambda: [DDRAGON_VERSION])),
+            web.get(f'/cdn/{DDRAGON_VERSION}/data/en_US/champion.json', self._json(lambda: self.champions)),
+            web.get('/cdn/{version}/img/{kind}/{name}', self._image),
+        ])
+        self._runner = web.AppRunner(app)
+        await self._runner.setup()
+        tls = ssl.create_default_context(ssl.Purpose.CLIENT_AUTH)
+        tls.load_cert_chain(self.cert_path, key_path)
+        lcu_site = web.TCPSite(self._runner, '127.0.0.1', 0, ssl_context=tls)
+        ddragon_site = web.TCPSite(self._runner, '127.0.0.1', 0)
+        await lcu_site.start()
+        await ddragon_site.start()
+        self.port = lcu_site._server.sockets[0].getsockname()[1]
+        self.ddragon_url = f"http://127.0.0.1:{ddragon_site._server.sockets[0].getsockname()[1]}"
+
+    # Handlers
+    def stall(self, path: str, seconds: float, count: int = 1) -> None:
+        """Hold the next `count` responses for `path` back by `seconds`, like a client that stopped answering."""
+        self.stalls.setdefault(path, []).extend([seconds] * count)
+
+    @web.middleware
+    async def _count_requests(self, request: web.Request, handler):
+        self.requests[request.path] = self.requests.get(request.path, 0) + 1
+        delays = self.stalls.get(request.path)
+        if delays:
+            await asyncio.sleep(delays.pop(0))
+        return await handler(request)
+
+    def _authorized(self, request: web.Request) -> bool:
+        expected = 'Basic ' + base64.b64encode(f'riot:{self.password}'.encode()).decode()
+        return request.headers.get('Authorization') == expected
+
+    def _json(self, payload):
+        async def handler(request: web.Request) -> web.Response:
+            if request.path.startswith('/lol-') and not self._authorized(request):
+                return web.json_response({'message': 'unauthorized'}, status=401)
+            return web.json_response(payload())
+
+        return handler
+
+    async def _match_history(self, request: web.Request) -> web.Response:
+        begin = int(request.query.get('begIndex', 0))
+        end = int(request.query.get('endIndex', begin + 20))
+        return web.json_response({'games': {'games': self.games[begin:end]}})
+
+    async def _image(self, request: web.Request) -> web.Response:
+        if self.image_delay:
+            await asyncio.sleep(self.image_delay)
+        # 8 KiB derived from the file name, so equal names are byte-identical across patch versions
+        seed = hashlib.sha256(f"{request.match_info['kind']}/{request.match_info['name']}".encode()).digest()
+        return web.Response(body=seed * 256, content_type='image/png')
+
+    async def _invitations(self, request: web.Request) -> web.Response:
+        invitations = await request.json()
+        return web.json_response([dict(invitation, state='Pending') for invitation in invitations])
+
+    async def _websocket(self, request: web.Request) -> web.StreamResponse:
+        if not self._authorized(request):
+            return web.Response(status=401)
+        websocket = web.WebSocketResponse(max_msg_size=0)
+        await websocket.prepare(request)
+        subscriptions = set()
+        entry = (websocket, subscriptions)
+        self._sockets.append(entry)
+        try:
+            async for message in websocket:
+                if message.type != WSMsgType.TEXT:
+                    continue
+                opcode, event = json.loads(message.data)[:2]
+                if opcode == 5:
+                    subscriptions.add(event)
+                elif opcode == 6:
+                    subscriptions.discard(event)
+        finally:
+            self._sockets.remove(entry)
+        return websocket
+
+    # Event streams
+    @property
+    def subscribed(self) -> bool:
+        return any(subscriptions for _, subscriptions in self._sockets)
+
+    async def _broadcast(self, events: Iterable[Tuple[float, str, str, Any]]) -> int:
+        sent = 0
+        for delay, uri, event_type, data in events:
+            if delay:
+                await asyncio.sleep(delay)
+            if callable(data):
+                data = data()  # Built at send time, e.g. to carry a timestamp
+            name = event_name(uri)
+            frame = json.dumps([8, EVENT_PREFIX, {'data': data, 'eventType': event_type, 'uri': uri}])
+            for websocket, subscriptions in list(self._sockets):
+                if EVENT_PREFIX in subscriptions or any(name.startswith(event) for event in subscriptions):
+                    await websocket.send_str(frame)
+                    sent += 1
+        return sent
+
+    def push(self, events: Iterable[Tuple[float, str, str, Any]]) -> 'asyncio.Future':
+        """
+        Send scripted (delay seconds, uri, eventType, data) events to the subscribed sockets from the mock's
+        loop, `data` may be a callable building the payload at send time. Returns a concurrent future
+        resolving to the number of frames sent.
+        """
+        return asyncio.run_coroutine_threadsafe(self._broadcast(list(events)), self.loop)
+
+    def summoner_events(self, count: int, delay: float = 0.0) -> List[Tuple[float, str, str, Any]]:
+        """Summoner updates carrying their send time (perf_counter) in displayName, for latency probes."""
+        return [(delay, '/lol-summoner/v1/current-summoner', 'Update',
+                 lambda index=index: dict(self.summoner, displayName=f'probe:{index}:{time.perf_counter()!r}'))
+                for index in range(count)]
+
+    def champ_select_storm(self, count: int, delay: float = 0.0) -> List[Tuple[float, str, str, Any]]:
+        """A champ-select session churning through picks, mostly unhandled by the app."""
+        session = {'myTeam': [{'cellId': cell, 'championId': 0} for cell in range(10)], 'timer': {}}
+        events = []
+        for index in range(count):
+            session['myTeam'][index % 10]['championId'] = self.rng.randint(1, 170)
+            events.append((delay, '/lol-champ-select/v1/session', 'Update', json.loads(json.dumps(session))))
+        return events
+
+    def presence_churn(self, count: int, delay: float = 0.0) -> List[Tuple[float, str, str, Any]]:
+        events = []
+        for _ in range(count):
+            friend = dict(self.rng.choice(self.friends), availability=self.rng.choice(AVAILABILITIES))
+            events.append((delay, f"/lol-chat/v1/friends/{friend['puuid']}", 'Update', friend))
+        return events
+
+
+if __name__ == '__main__':
+    with MockLCU() as mock:
+        print(f"Mock LCU on https://127.0.0.1:{mock.port}, ddragon on {mock.ddragon_url}")
+        print(f"LEAGUE_INSTALL_DIR={mock.install_dir}")
+        try:
+            threading.Event().wait()
+        except KeyboardInterrupt:
+            pass
@@ -0,0 +1,59 @@
+"""
+Replay a WebSocket recording (see recording.FrameRecorder) through MessageHandler and report per-URI cost.
+
+    python benchmarks/replay_recording.py traffic.rec.gz [--speed 1.0] [--repeat 3] [--top 20] [--json]
+
+Without --speed frames are replayed as fast as possible. Record live traffic by starting the app with
+INTEL_PANEL_RECORD=<path>, or mock traffic with bench_e2e.py --record <path>.
+"""
+import argparse
+import asyncio
+import json
+import logging
+import sys
+
+import fixtures  # noqa: F401, puts the repository root on sys.path
+from cache import Cache
+from message_handler import MessageHandler
+from observer import ObserverManager
+from recording import replay
+
+
+async def run(path: str, speed, repeat: int):
+    reports = []
+    for _ in range(repeat):
+        # Fresh state per pass, so every pass pays the same diffing and notification cost
+        observer = ObserverManager()
+        handler = MessageHandler(cache=Cache(observer_manager=observer), observer_manager=observer)
+        reports.append(await replay(path, handler.handle_message, speed=speed))
+    return min(reports, key=lambda report: report['wall_s'])
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('path')
+    parser.add_argument('--speed', type=float, help='Replay pace relative to the recording, e.g. 1.0')
+    parser.add_argument('--repeat', type=int, default=1, help='Passes, the fastest is reported')
+    parser.add_argument('--top', type=int, default=20, help='URIs to list, by total handling time')
+    parser.add_argument('--json', action='store_true', help='Print the full report as JSON')
+    parser.add_argument('--verbose', action='store_true', help='Keep the application INFO logging')
+    args = parser.parse_args()
+
+    if not args.verbose:
+        logging.disable(logging.INFO)
+    report = asyncio.run(run(args.path, args.speed, args.repeat))
+    if args.json:
+        print(json.dumps(report, indent=2))
+        return 0
+
+    handled = sum(cost['total_ms'] for cost in report['uris'].values())
+    print(f"{report['frames']} frames in {report['wall_s']:.3f}s, {handled:.1f} ms inside the handler")
+    print(f"{'total ms':>10} {'count':>7} {'mean us':>9} {'max us':>9} {'KiB':>8}  uri")
+    for uri, cost in list(report['uris'].items())[:args.top]:
+        print(f"{cost['total_ms']:10.2f} {cost['count']:7d} {cost['mean_us']:9.1f} {cost['max_us']:9.1f} "
+              f"{cost['bytes'] / 1024:8.1f}  {uri}")
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
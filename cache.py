@@ -1,85 +1,303 @@
 import logging
+import time
 from threading import RLock
+from types import MappingProxyType
+from typing import Any, Dict, Iterable, List, Mapping, NamedTuple, Optional, Set, Tuple
+from diffing import ADDED, Patch, diff
+from metrics import TimedLock
 
 
 logger = logging.getLogger(__name__)
 
 
+class ChampionIndex(NamedTuple):
+    by_key: Dict[int, Dict[str, Any]]  # Numeric champion key (e.g. 266) -> champion record
+    by_name: Dict[str, Dict[str, Any]]  # Display name (e.g. "Aatrox") -> champion record
+    by_id: Dict[str, Dict[str, Any]]  # Data Dragon id (e.g. "MonkeyKing") -> champion record
+
+
+EMPTY_CHAMPION_INDEX = ChampionIndex({}, {}, {})
+_MISSING = object()
+
+
+def build_champion_index(champs_data: Optional[Dict[str, Dict[str, Any]]]) -> ChampionIndex:
+    """Build the lookup tables for the Data Dragon champion payload in a single pass."""
+    if not champs_data:
+        return EMPTY_CHAMPION_INDEX
+    by_key, by_name, by_id = {}, {}, {}
+    for champ_id, champ_info in champs_data.items():
+        try:
+            by_key[int(champ_info['key'])] = champ_info
+        except (KeyError, TypeError, ValueError):
+            logger.debug(f"Champion {champ_id} has no numeric key, skipping key index.")
+        if 'name' in champ_info:
+            by_name[champ_info['name']] = champ_info
+        by_id[champ_info.get('id', champ_id)] = champ_info
+    return ChampionIndex(by_key, by_name, by_id)
+
+
+class _Shard:
+    """One independently locked part of the key space. `values` is replaced on every write, never mutated."""
+
+    __slots__ = ('lock', 'values')
+
+    def __init__(self, index: int):
+        self.lock = TimedLock(RLock(), labels=(str(index),))  # Wait and hold times feed the cache_lock_* metrics
+        self.values: Dict[str, Any] = {}
+
+
+def _unwrap(value):
+    return value['value'] if isinstance(value, dict) and 'value' in value else value
+
+
 class Cache:
-    def __init__(self, observer_manager):
+    """
+    Copy-on-write key/value store shared by the event loop, worker threads and the UI.
+
+    Reads take no lock: each shard publishes an immutable dict that writers replace with an updated copy,
+    so a reader always sees a complete version of every value. Writers of the same shard are serialised
+    by the shard's lock, which only covers the diff and the swap; observers are notified after it was
+    released, so a slow observer holds up neither readers nor other writers. With `shards` > 1 keys are
+    spread over that many independently locked shards, for write streams that should not wait on each other.
+    Stored values must be treated as immutable and replaced rather than changed in place.
+    """
+
+    def __init__(self, observer_manager, shards: int = 1):
         self.observer_manager = observer_manager
-        self.cache = {}
-        self.cache_lock = RLock()
+        self._shards = tuple(_Shard(index) for index in range(max(1, shards)))
+        self.versions: Dict[str, int] = {}  # key -> number of times its value changed
+        self.updated_at: Dict[str, float] = {}  # key -> epoch seconds of its last change
+        self.stale: Set[str] = set()  # Keys still holding a snapshot value, see restore()
+        self._pending: Dict[str, Any] = {}  # Restored keys not decoded yet -> their snapshot.Snapshot
         self.client_status = False
+        self.champion_index = EMPTY_CHAMPION_INDEX  # Swapped as a whole whenever champs_data changes
         self.client_credentials = {
             "port": "",
             "password": "",
         }
 
+    def _shard(self, key) -> _Shard:
+        shards = self._shards
+        return shards[0] if len(shards) == 1 else shards[hash(key) % len(shards)]
+
     # Basic cache operations
     def set(self, key, value):
-        with self.cache_lock:
-            self.cache[key] = value
+        shard = self._shard(key)
+        with shard.lock:
+            self._publish(shard, key, value)
 
     def get(self, key):
-        with self.cache_lock:
-            return self.cache.get(key)
+        value = self._shard(key).values.get(key, _MISSING)
+        if value is _MISSING:
+            return self._restored_value(key) if key in self._pending else None
+        return value
 
     def update(self, key, new_value):
-        with self.cache_lock:
-            if key not in self.cache or self.cache[key] != new_value:
-                try:
-                    self.cache[key] = new_value
-                    self.observer_manager.notify('update_ui', function=key, value=new_value)  # Notify observers of update
-                    logger.info(f"Cache updated for key: {key}")  # Log successful update
-                except Exception as e:
-                    logger.error(f"Failed to update cache for key: {key} with error: {str(e)}")
-            else:
+        """
+        Store `new_value` if it differs from the cached value and notify observers. Besides the full value
+        on `update_ui`, observers implementing `update_ui_patch` receive the new version and the
+        field-level patches (see diffing.Patch) so they can redraw only the changed widgets. Notifications
+        are sent after the write was published and the lock released; when several threads update the
+        same key, `version` tells which value is the newest.
+        """
+        shard = self._shard(key)
+        # Re-sent events mostly carry identical content: compared in C against the published value, before
+        # the lock is taken or the value walked for patches
+        if shard.values.get(key, _MISSING) == new_value:
+            logger.debug(f"No change for key: {key}, not updating.")
+            return
+        with shard.lock:
+            old_value = self._value_locked(shard, key)
+            patches = [Patch(ADDED, (), new_value)] if old_value is _MISSING else diff(old_value, new_value)
+            if not patches:
                 logger.debug(f"No change for key: {key}, not updating.")
+                return
+            version = self._publish(shard, key, new_value)
+        try:
+            self.observer_manager.notify('update_ui', function=key, value=new_value)  # Notify observers of update
+            self.observer_manager.notify('update_ui_patch', function=key, value=new_value, version=version,
+                                         patches=patches)
+            logger.info(f"Cache updated for key: {key} (version {version}, {len(patches)} patches)")
+        except Exception as e:
+            logger.error(f"Failed to update cache for key: {key} with error: {str(e)}")
+
+    def get_version(self, key) -> int:
+        return self.versions.get(key, 0)
 
     def delete(self, key):
-        with self.cache_lock:
-            self.cache.pop(key, None)
+        shard = self._shard(key)
+        with shard.lock:
+            if key in shard.values:
+                values = dict(shard.values)
+                del values[key]
+                shard.values = values
+            self._pending.pop(key, None)
+            self.stale.discard(key)
+            self._refresh_indexes(key, None)
 
     def clear(self):
-        with self.cache_lock:
-            self.cache.clear()
+        for shard in self._shards:
+            with shard.lock:
+                shard.values = {}
+        self._pending.clear()
+        self.stale.clear()
+        self.champion_index = EMPTY_CHAMPION_INDEX
+
+    def view(self) -> Mapping[str, Any]:
+        """
+        Read-only mapping of every decoded value. With a single shard it is one consistent version of the
+        whole cache; with several, each shard's part is consistent on its own.
+        """
+        if len(self._shards) == 1:
+            return MappingProxyType(self._shards[0].values)
+        merged = {}
+        for shard in self._shards:
+            merged.update(shard.values)
+        return MappingProxyType(merged)
+
+    def _publish(self, shard: _Shard, key, value) -> int:
+        # Called with the shard's lock held. The new dict is complete before it replaces the old one.
+        values = dict(shard.values)
+        values[key] = value
+        shard.values = values
+        self._pending.pop(key, None)  # A live value replaces whatever the snapshot held for the key
+        self.stale.discard(key)
+        self.updated_at[key] = time.time()
+        version = self.versions[key] = self.versions.get(key, 0) + 1
+        self._refresh_indexes(key, value)
+        return version
+
+    def _value_locked(self, shard: _Shard, key, default=_MISSING):
+        value = shard.values.get(key, _MISSING)
+        if value is _MISSING:
+            snapshot = self._pending.pop(key, None)
+            if snapshot is None:
+                return default
+            try:
+                value = snapshot.decode(key)
+            except ValueError as e:
+                logger.warning(f"Dropping undecodable snapshot value for key: {key}: {e}")
+                self.stale.discard(key)
+                return default
+            values = dict(shard.values)
+            values[key] = value
+            shard.values = values
+        return value
+
+    def _restored_value(self, key):
+        shard = self._shard(key)
+        with shard.lock:  # Decode once, concurrent readers of the same key wait for the first one
+            return self._value_locked(shard, key, None)
+
+    # Snapshots (see snapshot.CacheSnapshotter)
+    def restore(self, snapshot, keys: Iterable[str]) -> List[str]:
+        """
+        Register the snapshot's values for `keys` that hold no live value yet. They are decoded on first
+        access and stay in `stale` until a live value replaces them. Returns the restored keys.
+        """
+        restored = []
+        for key in keys:
+            entry = snapshot.entries.get(key)
+            shard = self._shard(key)
+            with shard.lock:
+                if entry is None or key in shard.values:
+                    continue
+                self._pending[key] = snapshot
+                self.stale.add(key)
+                self.versions[key] = entry.version
+                self.updated_at[key] = entry.updated_at
+            restored.append(key)
+        return restored
+
+    def export(self, keys: Iterable[str]) -> Tuple[Dict[str, Tuple[Any, int, float]], Dict[str, Any]]:
+        """
+        View of `keys` for a snapshot: key -> (value, version, updated_at) for decoded values, and
+        key -> source snapshot for restored values nobody decoded yet.
+        """
+        live, pending = {}, {}
+        for key in keys:
+            shard = self._shard(key)
+            with shard.lock:  # Value and version of one key belong together
+                if key in shard.values:
+                    live[key] = (shard.values[key], self.versions.get(key, 0), self.updated_at.get(key, 0.0))
+                elif key in self._pending:
+                    pending[key] = self._pending[key]
+        return live, pending
+
+    def is_stale(self, key) -> bool:
+        """Whether the value of `key` is the last known one from a snapshot rather than live data."""
+        return key in self.stale
 
-    # Client-specific settings
+    def drop_stale(self) -> List[str]:
+        """Remove every value still coming from a snapshot, returns the removed keys."""
+        dropped = []
+        for key in list(self.stale):
+            shard = self._shard(key)
+            with shard.lock:
+                if key not in self.stale:
+                    continue  # Replaced by a live value meanwhile
+                self.delete(key)
+            dropped.append(key)
+        return dropped
+
+    def _refresh_indexes(self, key, value):
+        # Build the new index fully before publishing it so readers never observe a partial index
+        if key == 'champs_data':
+            self.champion_index = build_champion_index(value)
+
+    # Client-specific settings, single attribute swaps that need no lock
     def set_client_credentials(self, port: str, password: str):
-        with self.cache_lock:
-            self.client_credentials['port'] = port
-            self.client_credentials['password'] = password
+        self.client_credentials = {"port": port, "password": password}
 
     def get_client_credentials(self):
-        with self.cache_lock:
-            return self.client_credentials
+        return self.client_credentials
 
     def set_client_status(self, status):
-        with self.cache_lock:
-            self.client_status = status
+        self.client_status = status
 
     def get_client_status(self):
-        with self.cache_lock:
-            return self.client_status
+        return self.client_status
 
     # Helper functions to deal with nested structures
     def get_nested(self, *args):
-        with self.cache_lock:
-            cache = self.cache
-            for arg in args:
-                cache = cache.get(arg)
-                if cache is None:
-                    return None
-                if isinstance(cache, dict) and 'value' in cache:
-                    cache = cache['value']
-            return cache
+        if not args:
+            return self.view()
+        value = _unwrap(self.get(args[0]))
+        for arg in args[1:]:
+            if value is None:
+                return None
+            value = _unwrap(value.get(arg))
+        return value
+
+    # Champion lookups, served from the prebuilt index
+    @staticmethod
+    def _champion_key(champ_id) -> Optional[int]:
+        try:
+            return int(champ_id)
+        except (TypeError, ValueError):
+            return None
+
+    def get_champion(self, champ_id) -> Optional[Dict[str, Any]]:
+        """Retrieve the champion record for a numeric champion key such as 266 or "266"."""
+        return self.champion_index.by_key.get(self._champion_key(champ_id))
+
+    def get_champion_by_name(self, name: str) -> Optional[Dict[str, Any]]:
+        return self.champion_index.by_name.get(name)
+
+    def get_champion_by_id(self, champ_id: str) -> Optional[Dict[str, Any]]:
+        """Retrieve the champion record for a Data Dragon id such as "MonkeyKing"."""
+        return self.champion_index.by_id.get(champ_id)
 
     def get_champion_name(self, champ_id):
         """Retrieve the champion's name from the cached champion data using the champion ID."""
-        with self.cache_lock:
-            champs_data = self.cache.get('champs_data', {})
-            for champ_key, champ_info in champs_data.items():
-                if champ_info.get('key') == str(champ_id):
-                    return champ_info.get('name', 'Unknown')
-            return 'Unknown'
+        champ_info = self.get_champion(champ_id)
+        return champ_info.get('name', 'Unknown') if champ_info else 'Unknown'
+
+    def get_champion_names(self, champ_ids: Iterable) -> List[str]:
+        """Resolve many champion IDs at once against a single consistent index."""
+        by_key = self.champion_index.by_key
+        names = []
+        for champ_id in champ_ids:
+            champ_info = by_key.get(self._champion_key(champ_id))
+            names.append(champ_info.get('name', 'Unknown') if champ_info else 'Unknown')
+        return names
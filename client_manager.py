@@ -1,26 +1,46 @@
 import asyncio
 import logging
 from websockets import exceptions
-from client_request import LCUManager
+from client_request import POLL_INTERVAL, LCUManager
+from startup import StartupReport
 
 logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
+logger = logging.getLogger(__name__)
 
 
 class ClientManager:
-    def __init__(self, cache, observer_manager, lcu_calls, websocket_manager):
+    def __init__(self, cache, observer_manager, lcu_calls, websocket_manager, metrics_exporter=None,
+                 startup=None, staged: bool = True, snapshots=None):
         self.cache = cache
         self.observer_manager = observer_manager
         self.observer_manager.add_observer(self)
         self.lcu_calls = lcu_calls
         self.lcu_manager = LCUManager(cache=self.cache)
         self.websocket_manager = websocket_manager
+        self.metrics_exporter = metrics_exporter  # Optional metrics.MetricsExporter, runs with the back end
+        self.startup = startup or StartupReport()
+        self.staged = staged  # Show the main menu once the summoner landed instead of after every fetch
+        self.snapshots = snapshots  # Optional snapshot.CacheSnapshotter, last known data for a warm start
+        self._back_end = None  # Task of the back end started by watch_client
 
     async def check_client_status(self) -> bool:
-        print('check_client_status')
+        logger.debug("Checking the client status")
         if not self.cache.get_client_status():
-            response = await self.lcu_manager.fetch_credentials()
+            if self.snapshots is not None and not self.snapshots.loaded:
+                with self.startup.phase('snapshot'):
+                    if await self.snapshots.load():
+                        self.startup.mark('snapshot_paint')
+            with self.startup.phase('discovery'):
+                response = await self.lcu_manager.fetch_credentials()
+            if response and self.staged:
+                await self.lcu_calls.get_client_data(on_ready=self._on_data_ready, startup=self.startup)
+                self.startup.mark('all_data')
+                self.startup.log()
+                return self.cache.get_client_status()
             if response:
                 await self.lcu_calls.get_client_data()
+                if self.snapshots is not None:
+                    self.snapshots.reconcile()
                 self.cache.set_client_status(True)
                 self.observer_manager.notify("update_loading_text")
                 await asyncio.sleep(2)  # Consider reducing sleep duration
@@ -30,19 +50,75 @@ class ClientManager:
                 return False
         return True
 
+    def _on_data_ready(self, name: str) -> None:
+        self.observer_manager.notify("data_ready", name=name)
+        if name == 'current_summoner' and not self.cache.get_client_status():
+            if self.snapshots is not None:
+                self.snapshots.reconcile()
+            self.cache.set_client_status(True)
+            self.observer_manager.notify("update_loading_text")
+            self.observer_manager.notify("update_client_phases", value="main_menu")
+            self.startup.mark('first_paint')
+
     async def start_back_end_operations(self):
         try:
+            if self.metrics_exporter is not None:
+                await self.metrics_exporter.start()
             if await self.check_client_status():
-                await self.websocket_manager.start_websocket()
+                if self.snapshots is not None:
+                    self.snapshots.start()
+                # Returns only once the supervisor stopped finding a running client
+                await self.websocket_manager.start_websocket(rediscover=self.lcu_manager.fetch_credentials)
+                self.cache.set_client_status(False)
+                self.observer_manager.notify(key="client_not_open_restart",
+                                             message="Client not open or credentials not found.")
             else:
-                print('here')
+                logger.debug("No running client found")
                 self.observer_manager.notify(key="client_not_open_restart",
                                              message="Client not open or credentials not found.")
         except exceptions.ConnectionClosed as e:
-            logging.error(f"Unexpected error: {e}")
+            logger.error(f"Unexpected error: {e}")
             self.observer_manager.notify(key="client_not_open_restart",
                                          message="Client not open or credentials not found.")
         except Exception as e:
-            logging.error(f"Unexpected error: {e}")
+            logger.error(f"Unexpected error: {e}")
+            self.observer_manager.notify(key="client_not_open_restart",
+                                         message="Client not open or credentials not found.")
+        finally:
+            await self.lcu_calls.close()  # Release pooled connections, they are recreated lazily on restart
+            if self.snapshots is not None:
+                await self.snapshots.stop()  # Final save, the next launch starts from this data
+            if self.metrics_exporter is not None:
+                await self.metrics_exporter.stop()
+
+    async def watch_client(self, interval: float = POLL_INTERVAL):
+        """
+        Run the back end whenever the client is running: started when the client appears, restarted when
+        it comes back with new credentials (a restart or an account switch) and stopped when it exits.
+        Runs until cancelled.
+
+        Args:
+            interval (float): Seconds between LCUManager.watch probes.
+        """
+        try:
+            await self.lcu_manager.watch(self._on_client_change, interval)
+        finally:
+            if self._back_end is not None:
+                self._back_end.cancel()
+                await asyncio.gather(self._back_end, return_exceptions=True)
+
+    def _on_client_change(self, running: bool):
+        self._back_end = asyncio.ensure_future(self._restart_back_end(self._back_end, running))
+
+    async def _restart_back_end(self, previous, running: bool):
+        # Chained on the previous run, so its sessions are closed and its snapshot saved before the next starts
+        stopped_here = previous is None or not previous.done()
+        if previous is not None:
+            previous.cancel()
+            await asyncio.gather(previous, return_exceptions=True)
+        self.cache.set_client_status(False)
+        if running:
+            await self.start_back_end_operations()
+        elif stopped_here:  # A back end that ended by itself has reported the client gone already
             self.observer_manager.notify(key="client_not_open_restart",
                                          message="Client not open or credentials not found.")
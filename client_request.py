@@ -1,34 +1,145 @@
+import os
 import re
+import time
 import psutil
 import asyncio
+import logging
+from typing import Any, Callable, List, NamedTuple, Optional, Tuple
+
+logger = logging.getLogger(__name__)
 
 # Precompiled regex patterns
 PORT_RE = re.compile(r'--app-port=(?P<port>[0-9]*)')
 PASSWORD_RE = re.compile(r'--remoting-auth-token=(?P<password>[\w-]*)')
+INSTALL_DIR_ARG = '--install-directory='
+
+CLIENT_PROCESS_NAMES = ('LeagueClientUx.exe', 'LeagueClientUx', 'LeagueClient.exe', 'LeagueClient')
+LOCKFILE_NAME = 'lockfile'
+DEFAULT_INSTALL_DIRS = [
+    r'C:\Riot Games\League of Legends',
+    '/Applications/League of Legends.app/Contents/LoL',
+]
+POLL_INTERVAL = 2.0  # Seconds between lockfile/liveness probes in watch mode
+SCAN_INTERVAL = 30.0  # Minimum seconds between full process scans in watch mode
+
+
+class ClientCredentials(NamedTuple):
+    pid: int
+    port: str
+    password: str
+    protocol: str = 'https'
+
+
+def parse_lockfile(content: str) -> Optional[ClientCredentials]:
+    """Parse a lockfile of the form `LeagueClient:<pid>:<port>:<password>:<protocol>`."""
+    parts = content.strip().split(':')
+    if len(parts) != 5:
+        return None
+    _, pid, port, password, protocol = parts
+    if not pid.isdigit() or not port.isdigit() or not password:
+        return None
+    return ClientCredentials(int(pid), port, password, protocol)
 
 
 class LCUManager:
-    def __init__(self, cache):
+    def __init__(self, cache, install_dirs: Optional[List[str]] = None,
+                 process_names: Tuple[str, ...] = CLIENT_PROCESS_NAMES):
         self.cache = cache
+        self.process_names = process_names
+        self.install_dirs = list(install_dirs or DEFAULT_INSTALL_DIRS)
+        env_dir = os.environ.get('LEAGUE_INSTALL_DIR')
+        if env_dir:
+            self.install_dirs.insert(0, env_dir)
+        self.credentials: Optional[ClientCredentials] = None
+        self._last_scan = 0.0
 
     async def fetch_credentials(self) -> bool:
         loop = asyncio.get_event_loop()
-        result = await loop.run_in_executor(None, self.get_process_info)
+        result = await loop.run_in_executor(None, self.discover)
 
         if result:
-            pid, port, password = result
-            self.cache.set_client_credentials(port=port, password=password)
+            self.cache.set_client_credentials(port=result.port, password=result.password)
             return True
 
         return False
 
+    def discover(self, allow_scan: bool = True) -> Optional[ClientCredentials]:
+        """
+        Locate the running client, cheapest source first: the cached PID, the lockfile,
+        and only then a full process scan.
+
+        Args:
+            allow_scan (bool): If False, never fall back to iterating every process.
+        """
+        if self.credentials and self.is_alive(self.credentials.pid):
+            return self.credentials
+
+        credentials = self.read_lockfile()
+        if credentials and self.is_alive(credentials.pid):
+            self.credentials = credentials
+            return credentials
+
+        if allow_scan:
+            self._last_scan = time.monotonic()
+            result = self.get_process_info()
+            if result:
+                pid, port, password, install_dir = result
+                if install_dir and install_dir not in self.install_dirs:
+                    self.install_dirs.insert(0, install_dir)  # Lockfile fast path works from now on
+                self.credentials = ClientCredentials(pid, port, password)
+                return self.credentials
+
+        self.credentials = None
+        return None
+
+    def read_lockfile(self) -> Optional[ClientCredentials]:
+        for install_dir in self.install_dirs:
+            try:
+                with open(os.path.join(install_dir, LOCKFILE_NAME), 'r', encoding='utf-8') as file:
+                    credentials = parse_lockfile(file.read())
+            except OSError:
+                continue
+            if credentials:
+                return credentials
+        return None
+
+    def is_alive(self, pid: int) -> bool:
+        try:
+            return psutil.Process(pid).name() in self.process_names
+        except psutil.Error:
+            return False
+
+    async def watch(self, on_change: Callable[[bool], Any], interval: float = POLL_INTERVAL) -> None:
+        """
+        Poll for the client starting, stopping or restarting with new credentials and report it through
+        `on_change(running)`. Credentials of a running client are stored in the cache before the callback.
+        """
+        loop = asyncio.get_event_loop()
+        running = None
+        known = None
+        while True:
+            allow_scan = time.monotonic() - self._last_scan >= SCAN_INTERVAL
+            credentials = await loop.run_in_executor(None, self.discover, allow_scan)
+            current = (credentials.port, credentials.password) if credentials else None
+            if (credentials is not None) != running or current != known:
+                if credentials:
+                    self.cache.set_client_credentials(port=credentials.port, password=credentials.password)
+                running, known = credentials is not None, current
+                logger.info(f"League client {'running on port ' + credentials.port if credentials else 'stopped'}.")
+                on_change(running)
+            await asyncio.sleep(interval)
+
     @staticmethod
     def get_process_info():
+        """Fallback full process scan, returns (pid, port, password, install_dir) of the client UX process."""
         for proc in psutil.process_iter(attrs=['pid', 'name', 'cmdline']):
             if proc.info['name'] in ['LeagueClientUx.exe', 'LeagueClientUx']:
-                cmd_line = ' '.join(proc.info['cmdline'])
+                cmdline = proc.info['cmdline'] or []
+                cmd_line = ' '.join(cmdline)
                 port = PORT_RE.search(cmd_line)
                 password = PASSWORD_RE.search(cmd_line)
                 if port and password:
-                    return proc.info['pid'], port.group('port'), password.group('password')
+                    install_dir = next((arg[len(INSTALL_DIR_ARG):] for arg in cmdline
+                                        if arg.startswith(INSTALL_DIR_ARG)), None)
+                    return proc.info['pid'], port.group('port'), password.group('password'), install_dir
         return None
@@ -0,0 +1,207 @@
+import asyncio
+import json
+import logging
+import os
+import shutil
+from typing import TYPE_CHECKING, Any, Callable, Dict, Optional, Tuple
+
+from paths import APP_DATA_DIR
+
+if TYPE_CHECKING:
+    import aiohttp  # Imported where a request is made, so importing this module stays cheap
+
+logger = logging.getLogger(__name__)
+
+DDRAGON_URL = "https://ddragon.leagueoflegends.com"
+DEFAULT_VERSION = "14.8.1"  # Used until a patch version was resolved online or read from disk
+DEFAULT_CACHE_DIR = os.path.join(APP_DATA_DIR, "ddragon")
+INDEX_FILE = "index.json"
+VERSION_TIMEOUT = 3  # Seconds to wait for versions.json before falling back to the stored version
+DOWNLOAD_TIMEOUT = 30
+
+
+def build_profile_icon_url(icon_id: Any, version: Optional[str] = None, base_url: str = DDRAGON_URL) -> str:
+    return f"{base_url}/cdn/{version or DEFAULT_VERSION}/img/profileicon/{icon_id}.png"
+
+
+class DataDragonStore:
+    """
+    On-disk store for static Data Dragon payloads (champion.json, items, ...) keyed by patch version.
+
+    A payload already on disk is served immediately and revalidated in the background; the network is
+    only asked for it again when versions.json reports a new patch, using the ETag/Last-Modified of the
+    stored copy so an unchanged file costs a 304 instead of a full download.
+    """
+
+    def __init__(self, cache_dir: str = DEFAULT_CACHE_DIR, base_url: str = DDRAGON_URL):
+        self.cache_dir = cache_dir
+        self.base_url = base_url.rstrip('/')
+        self._index: Optional[Dict[str, Any]] = None
+        self._latest_version: Optional[str] = None
+        self._background_tasks = set()
+
+    @property
+    def version(self) -> str:
+        """Best known patch version: resolved online, else the one stored on disk, else the default."""
+        if self._latest_version:
+            return self._latest_version
+        if self._index and self._index.get('version'):
+            return self._index['version']
+        return DEFAULT_VERSION
+
+    def cdn_url(self, path: str, version: Optional[str] = None) -> str:
+        return f"{self.base_url}/cdn/{version or self.version}/{path}"
+
+    # Disk helpers, always run in the default executor
+    def _path(self, version: str, path: str) -> str:
+        return os.path.join(self.cache_dir, version, *path.split('/'))
+
+    def _read_index(self) -> Dict[str, Any]:
+        try:
+            with open(os.path.join(self.cache_dir, INDEX_FILE), 'r', encoding='utf-8') as file:
+                index = json.load(file)
+            if isinstance(index, dict) and isinstance(index.get('files'), dict):
+                return index
+        except FileNotFoundError:
+            pass
+        except (OSError, ValueError) as e:
+            logger.warning(f"Ignoring unreadable Data Dragon index: {e}")
+        return {"version": None, "files": {}}
+
+    def _write_index(self) -> None:
+        self._write_bytes(os.path.join(self.cache_dir, INDEX_FILE), json.dumps(self._index).encode('utf-8'))
+
+    @staticmethod
+    def _write_bytes(target: str, content: bytes) -> None:
+        os.makedirs(os.path.dirname(target), exist_ok=True)
+        tmp = f"{target}.tmp"
+        with open(tmp, 'wb') as file:
+            file.write(content)
+        os.replace(tmp, target)  # Atomic, a crash never leaves a truncated payload behind
+
+    def _read_payload(self, version: str, path: str) -> Optional[Any]:
+        try:
+            with open(self._path(version, path), 'rb') as file:
+                return json.loads(file.read())
+        except FileNotFoundError:
+            return None
+        except (OSError, ValueError) as e:
+            logger.warning(f"Ignoring unreadable Data Dragon payload {version}/{path}: {e}")
+            return None
+
+    def _prune(self) -> None:
+        """Remove version directories no stored payload points to anymore."""
+        referenced = {entry['version'] for entry in self._index['files'].values()}
+        try:
+            names = os.listdir(self.cache_dir)
+        except FileNotFoundError:
+            return
+        for name in names:
+            full = os.path.join(self.cache_dir, name)
+            if os.path.isdir(full) and name not in referenced:
+                shutil.rmtree(full, ignore_errors=True)
+
+    async def _run(self, func: Callable, *args: Any) -> Any:
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(None, func, *args)
+
+    # Public API
+    async def load(self) -> None:
+        """Read the on-disk index, cheap enough to await before the first request."""
+        if self._index is None:
+            self._index = await self._run(self._read_index)
+
+    async def resolve_version(self, session: 'aiohttp.ClientSession') -> str:
+        await self.load()
+        try:
+            import aiohttp
+            timeout = aiohttp.ClientTimeout(total=VERSION_TIMEOUT)
+            async with session.get(f"{self.base_url}/api/versions.json", timeout=timeout) as response:
+                if response.status != 200:
+                    raise ValueError(f"Unexpected response status: {response.status}")
+                versions = await response.json(content_type=None)
+                if not isinstance(versions, list) or not versions:
+                    raise TypeError("Unexpected response content")
+                self._latest_version = versions[0]
+        except Exception as e:
+            logger.warning(f"Could not resolve Data Dragon version, using {self.version}: {e}")
+        return self.version
+
+    async def get_json(self, session: 'aiohttp.ClientSession', path: str,
+                       on_update: Optional[Callable[[Any], None]] = None) -> Any:
+        """
+        Return the payload for `path` (relative to /cdn/<version>/), from disk when possible.
+
+        Args:
+            session (aiohttp.ClientSession): Session used for version checks and downloads.
+            path (str): Payload path such as "data/en_US/champion.json".
+            on_update (Callable): Called with the new payload if a background revalidation found
+                a newer one than the copy returned from disk.
+        """
+        await self.load()
+        entry = self._index['files'].get(path)
+        if entry:
+            payload = await self._run(self._read_payload, entry['version'], path)
+            if payload is not None:
+                task = asyncio.create_task(self._revalidate(session, path, entry, on_update))
+                self._background_tasks.add(task)
+                task.add_done_callback(self._background_tasks.discard)
+                return payload
+
+        version = await self.resolve_version(session)
+        payload, _ = await self._download(session, version, path, None)
+        return payload
+
+    async def _revalidate(self, session: 'aiohttp.ClientSession', path: str, entry: Dict[str, Any],
+                          on_update: Optional[Callable[[Any], None]]) -> None:
+        try:
+            version = await self.resolve_version(session)
+            if version == entry['version']:
+                return  # Same patch, the stored copy is current
+            payload, changed = await self._download(session, version, path, entry)
+            if changed and on_update:
+                on_update(payload)
+        except Exception as e:
+            logger.warning(f"Background Data Dragon revalidation of {path} failed: {e}")
+
+    async def _download(self, session: 'aiohttp.ClientSession', version: str, path: str,
+                        previous: Optional[Dict[str, Any]]) -> Tuple[Any, bool]:
+        """Fetch `path` for `version`, conditionally against `previous`. Returns (payload, changed)."""
+        headers = {}
+        if previous:
+            if previous.get('etag'):
+                headers['If-None-Match'] = previous['etag']
+            if previous.get('last_modified'):
+                headers['If-Modified-Since'] = previous['last_modified']
+
+        import aiohttp
+        timeout = aiohttp.ClientTimeout(total=DOWNLOAD_TIMEOUT)
+        async with session.get(self.cdn_url(path, version), headers=headers, timeout=timeout) as response:
+            if response.status == 304 and previous:
+                # Content did not change between patches, carry the stored copy over to the new version
+                await self._run(self._carry_over, previous['version'], version, path)
+                payload = await self._run(self._read_payload, version, path)
+                self._index['files'][path] = dict(previous, version=version)
+                changed = False
+            elif response.status == 200:
+                content = await response.read()
+                payload = json.loads(content)
+                await self._run(self._write_bytes, self._path(version, path), content)
+                self._index['files'][path] = {
+                    "version": version,
+                    "etag": response.headers.get('ETag'),
+                    "last_modified": response.headers.get('Last-Modified'),
+                }
+                changed = True
+            else:
+                raise ValueError(f"Unexpected response status: {response.status}")
+
+        self._index['version'] = version
+        await self._run(self._write_index)
+        await self._run(self._prune)
+        return payload, changed
+
+    def _carry_over(self, old_version: str, new_version: str, path: str) -> None:
+        target = self._path(new_version, path)
+        os.makedirs(os.path.dirname(target), exist_ok=True)
+        shutil.copyfile(self._path(old_version, path), target)
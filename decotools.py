@@ -1,6 +1,7 @@
-from aiohttp import ClientSession
+from concurrent.futures import Future
 from functools import wraps
-import threading
+from runtime import get_runtime
+import asyncio
 import traceback
 import logging
 from typing import Callable, Any
@@ -10,59 +11,52 @@ logger = logging.getLogger(__name__)
 
 def threaded_task(daemon: bool = False) -> Callable:
     """
-    Decorator to run the decorated function in a separate thread to prevent blocking,
-    especially useful for running async tasks in a synchronous environment like Tkinter.
+    Decorator to run the decorated function off the calling thread to prevent blocking, especially
+    useful for starting work from a synchronous GUI. Coroutine functions run on the shared runtime
+    loop, plain functions on its bounded thread pool, so no thread is created per call.
 
     Args:
-        daemon (bool): If True, the thread runs as a daemon, meaning it won't block program exit.
+        daemon (bool): Kept for compatibility. Pool threads are shared and joined by Runtime.stop().
 
     Returns:
-        Callable: Decorated function that runs in a separate thread.
+        Callable: Decorated function returning a concurrent.futures.Future of the result.
     """
 
     def decorator(func: Callable) -> Callable:
         @wraps(func)
-        def wrapper(*args: Any, **kwargs: Any) -> threading.Thread:
-            def run() -> None:
-                try:
-                    func(*args, **kwargs)
-                except Exception as e:
-                    logger.error(f"An error occurred in threaded task {func.__name__}: {e}")
-                    logger.debug(traceback.format_exc())
-
-            thread = threading.Thread(target=run)
-            thread.daemon = daemon  # Set thread as daemon if specified
-            thread.start()
-            return thread  # Optionally return the thread object
+        def wrapper(*args: Any, **kwargs: Any) -> Future:
+            runtime = get_runtime()
+            if asyncio.iscoroutinefunction(func):
+                return runtime.submit(func(*args, **kwargs))
+            return runtime.run_blocking(func, *args, **kwargs)
 
         return wrapper
 
     return decorator
 
 
-def session_manager(func: Callable) -> Callable:
+def pooled_session(getter: str) -> Callable:
     """
-    Decorator to manage aiohttp ClientSession. Creates a new session if one is not provided in kwargs
-    and passes it to the decorated async function. Closes the session after the function execution
-    if it was created by the decorator.
+    Decorator to inject a long-lived aiohttp ClientSession owned by the instance of the decorated method.
+    The session is not closed after the call, so keep-alive connections are reused across requests.
+    A session passed explicitly in kwargs takes precedence.
 
     Args:
-        func (Callable): The async function to be decorated.
+        getter (str): Name of the coroutine method on the instance that returns the session to use.
     """
 
-    @wraps(func)
-    async def wrapper(*args: Any, **kwargs: Any) -> Any:
-        session_provided = kwargs.get("session", None)
-        if session_provided:
-            return await func(*args, **kwargs)
-        else:
-            async with ClientSession() as session:
-                kwargs['session'] = session
-                try:
-                    return await func(*args, **kwargs)
-                except Exception as e:
-                    logger.error(f"An error occurred in {func.__name__}: {e}")
-                    logger.debug(traceback.format_exc())
-                    raise
+    def decorator(func: Callable) -> Callable:
+        @wraps(func)
+        async def wrapper(self, *args: Any, **kwargs: Any) -> Any:
+            if kwargs.get("session") is None:
+                kwargs['session'] = await getattr(self, getter)()
+            try:
+                return await func(self, *args, **kwargs)
+            except Exception as e:
+                logger.error(f"An error occurred in {func.__name__}: {e}")
+                logger.debug(traceback.format_exc())
+                raise
+
+        return wrapper
 
-    return wrapper
+    return decorator
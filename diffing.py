@@ -0,0 +1,60 @@
+from typing import Any, List, NamedTuple, Tuple
+
+ADDED = 'added'
+REMOVED = 'removed'
+CHANGED = 'changed'
+
+MAX_PATCHES = 64  # Past this many field patches a single root replacement is cheaper for consumers
+
+
+class Patch(NamedTuple):
+    op: str  # ADDED, REMOVED or CHANGED
+    path: Tuple[Any, ...]  # Dict keys / list indices from the root of the cached value, () is the root
+    value: Any = None  # New value for ADDED and CHANGED
+
+
+class _TooManyPatches(Exception):
+    pass
+
+
+def diff(old: Any, new: Any) -> List[Patch]:
+    """
+    Return the field-level patches turning `old` into `new`, an empty list when they are equal.
+    Identical objects are skipped without being walked, so re-sent payloads that share subtrees with
+    the cached value cost only the walk of the parts that were actually rebuilt.
+    """
+    patches: List[Patch] = []
+    try:
+        _diff(old, new, (), patches)
+    except _TooManyPatches:
+        return [Patch(CHANGED, (), new)]
+    return patches
+
+
+def _emit(patches: List[Patch], patch: Patch) -> None:
+    patches.append(patch)
+    if len(patches) > MAX_PATCHES:
+        raise _TooManyPatches
+
+
+def _diff(old: Any, new: Any, path: Tuple[Any, ...], patches: List[Patch]) -> None:
+    if old is new:
+        return
+    if isinstance(old, dict) and isinstance(new, dict):
+        for key, value in new.items():
+            if key not in old:
+                _emit(patches, Patch(ADDED, path + (key,), value))
+            else:
+                _diff(old[key], value, path + (key,), patches)
+        for key in old.keys() - new.keys():
+            _emit(patches, Patch(REMOVED, path + (key,)))
+    elif isinstance(old, list) and isinstance(new, list):
+        common = min(len(old), len(new))
+        for index in range(common):
+            _diff(old[index], new[index], path + (index,), patches)
+        for index in range(common, len(new)):
+            _emit(patches, Patch(ADDED, path + (index,), new[index]))
+        for index in range(len(old) - 1, common - 1, -1):  # Highest first so indices stay valid when applied
+            _emit(patches, Patch(REMOVED, path + (index,)))
+    elif old != new:
+        _emit(patches, Patch(CHANGED, path, new))
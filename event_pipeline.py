@@ -0,0 +1,156 @@
+import asyncio
+import logging
+import time
+import zlib
+from collections import deque
+from typing import Any, Awaitable, Callable, Deque, Dict, Iterable, List, Optional
+
+from fastjson import peek_event
+from routing import RouteTable
+
+logger = logging.getLogger(__name__)
+
+DROP_OLDEST = 'drop_oldest'
+DROP_NEWEST = 'drop_newest'
+OVERFLOW_POLICIES = (DROP_OLDEST, DROP_NEWEST)
+
+# Endpoints whose events carry the full current state, so only the newest pending event per URI matters
+DEFAULT_COALESCE_PREFIXES = (
+    "/lol-summoner/v1/current-summoner",
+    "/lol-ranked/v1/current-ranked-stats",
+    "/lol-collections/v1/inventories/local-player/champion-mastery-score",
+    "/lol-chat/v1/friends",
+    "/lol-gameflow/v1/session",
+    "/lol-champ-select/v1/session",
+    "/lol-lobby/v2/lobby",
+)
+
+
+class _Entry:
+    __slots__ = ('uri', 'frame', 'enqueued_at')
+
+    def __init__(self, uri: Optional[str], frame: Any, enqueued_at: float):
+        self.uri = uri
+        self.frame = frame
+        self.enqueued_at = enqueued_at
+
+
+class _Shard:
+    __slots__ = ('queue', 'pending', 'ready')
+
+    def __init__(self):
+        self.queue: Deque[_Entry] = deque()
+        self.pending: Dict[str, _Entry] = {}  # Coalescable URI -> its queued entry
+        self.ready = asyncio.Event()
+
+
+class EventPipeline:
+    """
+    Bounded queue between the WebSocket receive loop and the frame handler. put() never blocks: frames
+    for coalescable URIs replace the pending frame of the same URI and a full queue sheds load according
+    to the overflow policy. Frames are sharded by URI over the workers, so events of one URI are always
+    handled in order.
+    """
+
+    def __init__(self, handler: Callable[[Any], Awaitable[Any]], maxsize: int = 1000, workers: int = 2,
+                 overflow: str = DROP_OLDEST, coalesce_prefixes: Iterable[str] = DEFAULT_COALESCE_PREFIXES):
+        """
+        Args:
+            handler (Callable): Coroutine function handling one raw frame (MessageHandler.handle_message).
+            maxsize (int): Maximum number of queued frames over all workers.
+            workers (int): Number of concurrent handler workers.
+            overflow (str): DROP_OLDEST or DROP_NEWEST, what to discard when a worker's queue is full.
+            coalesce_prefixes (Iterable[str]): URI prefixes eligible for per-URI coalescing.
+        """
+        if overflow not in OVERFLOW_POLICIES:
+            raise ValueError(f"Unknown overflow policy: {overflow}")
+        self.handler = handler
+        self.maxsize = maxsize
+        self.overflow = overflow
+        self._coalesce = RouteTable()
+        for prefix in coalesce_prefixes:
+            self._coalesce.add(prefix, True, prefix=True)
+        self._shards: List[_Shard] = [_Shard() for _ in range(max(1, workers))]
+        self._shard_size = max(1, maxsize // len(self._shards))
+        self._tasks: List[asyncio.Task] = []
+        self._busy = 0  # Workers currently inside the handler
+        self.counters = {'received': 0, 'processed': 0, 'dropped': 0, 'coalesced': 0, 'failed': 0}
+        self.max_lag = 0.0
+        self.avg_lag = 0.0  # Exponentially weighted, seconds
+
+    # Lifecycle
+    def start(self) -> None:
+        if not self._tasks:
+            self._tasks = [asyncio.ensure_future(self._work(shard)) for shard in self._shards]
+
+    async def stop(self, drain: bool = False) -> None:
+        """Stop the workers, after handling everything queued when `drain` is set."""
+        if drain:
+            while self._busy or any(shard.queue for shard in self._shards):
+                await asyncio.sleep(0.01)
+        for task in self._tasks:
+            task.cancel()
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+        self._tasks = []
+
+    # Producer side
+    def put(self, frame: Any) -> bool:
+        """Queue a frame without blocking, False if it was dropped."""
+        self.counters['received'] += 1
+        uri = peek_event(frame)[1] if isinstance(frame, str) else None
+        shard = self._shards[zlib.crc32(uri.encode()) % len(self._shards) if uri else 0]
+
+        if uri is not None and self._coalesce.match(uri) is not None:
+            entry = shard.pending.get(uri)
+            if entry is not None:
+                entry.frame = frame  # Keeps its queue position and the enqueue time of the oldest update
+                self.counters['coalesced'] += 1
+                return True
+        else:
+            uri = None
+
+        if len(shard.queue) >= self._shard_size:
+            self.counters['dropped'] += 1
+            if self.overflow == DROP_NEWEST:
+                return False
+            oldest = shard.queue.popleft()
+            if oldest.uri is not None:
+                shard.pending.pop(oldest.uri, None)
+
+        entry = _Entry(uri, frame, time.monotonic())
+        shard.queue.append(entry)
+        if uri is not None:
+            shard.pending[uri] = entry
+        shard.ready.set()
+        return True
+
+    # Consumer side
+    async def _work(self, shard: _Shard) -> None:
+        while True:
+            while not shard.queue:
+                shard.ready.clear()
+                await shard.ready.wait()
+            entry = shard.queue.popleft()
+            if entry.uri is not None and shard.pending.get(entry.uri) is entry:
+                del shard.pending[entry.uri]
+            lag = time.monotonic() - entry.enqueued_at
+            self.max_lag = max(self.max_lag, lag)
+            self.avg_lag += (lag - self.avg_lag) * 0.1
+            self._busy += 1
+            try:
+                await self.handler(entry.frame)
+                self.counters['processed'] += 1
+            except Exception as e:
+                self.counters['failed'] += 1
+                logger.error(f"Event handler failed: {e}", exc_info=True)
+            finally:
+                self._busy -= 1
+
+    # Introspection
+    @property
+    def depth(self) -> int:
+        return sum(len(shard.queue) for shard in self._shards)
+
+    def stats(self) -> Dict[str, Any]:
+        return dict(self.counters, depth=self.depth, max_lag=self.max_lag, avg_lag=self.avg_lag,
+                    workers=len(self._shards), maxsize=self.maxsize, overflow=self.overflow)
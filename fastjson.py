@@ -0,0 +1,45 @@
+import json
+import re
+from typing import Any, Optional, Tuple, Union
+
+try:
+    import orjson
+except ImportError:  # Optional dependency, the stdlib decoder is used without it
+    orjson = None
+
+JSON_BACKEND = 'orjson' if orjson is not None else 'json'
+JSONDecodeError = json.JSONDecodeError  # orjson.JSONDecodeError subclasses it
+
+OPCODE_RE = re.compile(r'\s*\[\s*(\d+)\s*,')
+# The LCU serialises event payloads as {"data": ..., "eventType": ..., "uri": ...}, so the top-level uri
+# is anchored at the end of the frame. The leading form covers serialisers that put it first.
+TRAILING_URI_RE = re.compile(r'"uri"\s*:\s*"([^"\\]*)"\s*}\s*]\s*$')
+LEADING_URI_RE = re.compile(r'\s*\[\s*\d+\s*,\s*"[^"\\]*"\s*,\s*{\s*"uri"\s*:\s*"([^"\\]*)"')
+
+
+def loads(data: Union[str, bytes]) -> Any:
+    if orjson is not None:
+        return orjson.loads(data)
+    return json.loads(data)
+
+
+def dumps(value: Any) -> bytes:
+    """Compact UTF-8 JSON, the inverse of loads."""
+    if orjson is not None:
+        return orjson.dumps(value, option=orjson.OPT_NON_STR_KEYS)  # Same key coercion as json.dumps
+    return json.dumps(value, separators=(',', ':'), ensure_ascii=False).encode('utf-8')
+
+
+def peek_event(frame: str) -> Tuple[Optional[int], Optional[str]]:
+    """
+    Read the WAMP opcode and event uri of a raw frame without decoding the payload.
+    Either value is None when it cannot be determined cheaply; callers must then decode the frame.
+    """
+    match = OPCODE_RE.match(frame)
+    if match is None:
+        return None, None
+    opcode = int(match.group(1))
+    uri = TRAILING_URI_RE.search(frame, max(0, len(frame) - 512))  # Only the tail has to be scanned
+    if uri is None:
+        uri = LEADING_URI_RE.match(frame)
+    return opcode, uri.group(1) if uri else None
@@ -0,0 +1,271 @@
+import asyncio
+import heapq
+import itertools
+import logging
+import time
+from typing import Any, Awaitable, Callable, Dict, Iterable, List, NamedTuple, Optional, Tuple, Type
+
+logger = logging.getLogger(__name__)
+
+MAX_CONCURRENCY = 4  # Sources fetching at once, the rest wait in priority order
+# Sources fetching at once until the first one finished. Its request sets up the pooled connection the
+# others reuse, instead of all of them opening connections and competing with the most important fetch.
+SLOW_START = 1
+DEFAULT_TIMEOUT = 10.0  # Seconds per attempt
+DEFAULT_RETRIES = 1  # Attempts after the first one
+DEFAULT_BACKOFF = 0.5  # Seconds before the first retry, doubled for every further one
+
+PENDING, WAITING, RUNNING, DONE, FAILED, SKIPPED = 'pending', 'waiting', 'running', 'done', 'failed', 'skipped'
+
+
+class Source(NamedTuple):
+    """One data set loaded into the cache under `name`."""
+    name: str
+    fetch: Callable[[], Awaitable[Any]]
+    requires: Tuple[str, ...] = ()  # Sources that must be stored before this one can be fetched
+    priority: int = 10  # Lower runs first when more sources are ready than there are slots
+    timeout: float = DEFAULT_TIMEOUT
+    retries: int = DEFAULT_RETRIES
+    backoff: float = DEFAULT_BACKOFF
+    retry_on: Tuple[Type[BaseException], ...] = (Exception,)
+    lazy: bool = False  # Only loaded through load(), e.g. when the panel showing it is opened
+
+
+class _State:
+    __slots__ = ('status', 'attempts', 'error', 'task', 'event', 'queued_at', 'started_at', 'finished_at')
+
+    def __init__(self):
+        self.status = PENDING
+        self.attempts = 0
+        self.error: Optional[BaseException] = None
+        self.task: Optional[asyncio.Task] = None
+        self.event = asyncio.Event()  # Set once the source is finished, whatever the outcome
+        self.queued_at = self.started_at = self.finished_at = None
+
+
+class PrioritySlots:
+    """
+    Counting semaphore handing free slots to the waiter with the lowest priority value, FIFO among equals.
+    It starts with `initial` slots and opens all `size` once the first holder released its slot.
+    """
+
+    def __init__(self, size: int, initial: Optional[int] = None):
+        self.size = size if initial is None else min(initial, size)
+        self._full_size = size
+        self._active = 0
+        self._waiters: List[Tuple[int, int, asyncio.Future]] = []
+        self._counter = itertools.count()
+
+    async def acquire(self, priority: int) -> None:
+        if self._active < self.size and not self._waiters:
+            self._active += 1
+            return
+        future = asyncio.get_running_loop().create_future()
+        heapq.heappush(self._waiters, (priority, next(self._counter), future))
+        try:
+            await future  # release() already counted this slot as ours
+        except asyncio.CancelledError:
+            if future.done() and not future.cancelled():
+                self.release()  # Granted and cancelled in the same iteration, pass the slot on
+            raise
+
+    def release(self) -> None:
+        if self.size < self._full_size:
+            self.size = self._full_size
+            for _ in range(self._full_size - self._active):  # Slots opening up now, beside the released one
+                if not self._grant():
+                    break
+                self._active += 1
+        if not self._grant():
+            self._active -= 1
+
+    def _grant(self) -> bool:
+        """Hand one slot to the best waiter, returns False when nobody was waiting."""
+        while self._waiters:
+            _, _, future = heapq.heappop(self._waiters)
+            if not future.done():
+                future.set_result(None)
+                return True
+        return False
+
+
+class FetchScheduler:
+    """
+    Loads data sources concurrently, each one as soon as the sources it requires are stored, so the time
+    to a usable UI is that of the slowest dependency chain rather than of every fetch. Results are
+    stored through `store` and reported to `on_ready` one by one as they land. An attempt that fails or
+    exceeds the source's timeout is retried with exponential backoff. A source that still fails marks
+    its dependents as skipped, without holding up unrelated sources.
+    """
+
+    def __init__(self, sources: Iterable[Source], store: Callable[[str, Any], Any],
+                 max_concurrency: int = MAX_CONCURRENCY, slow_start: Optional[int] = SLOW_START):
+        """
+        Args:
+            sources (Iterable[Source]): The data sets, dependencies must be among them and acyclic.
+            store (Callable): Called with (name, data) for every fetched source, e.g. Cache.set.
+            max_concurrency (int): Sources fetching at the same time.
+            slow_start (int): Sources fetching at the same time until the first one finished, None to
+                start with max_concurrency.
+        """
+        self.sources: Dict[str, Source] = {source.name: source for source in sources}
+        self.store = store
+        self.on_ready: Optional[Callable[[str], Any]] = None
+        self.startup = None
+        self.max_concurrency = max_concurrency
+        self.slow_start = slow_start
+        self._slots = PrioritySlots(max_concurrency, slow_start)
+        self._states: Dict[str, _State] = {}
+        self._check_dependencies()
+
+    def _check_dependencies(self) -> None:
+        visiting, checked = set(), set()
+
+        def visit(name: str, path: Tuple[str, ...]) -> None:
+            if name in checked:
+                return
+            if name in visiting:
+                raise ValueError(f"Dependency cycle: {' -> '.join(path + (name,))}")
+            visiting.add(name)
+            for dependency in self.sources[name].requires:
+                if dependency not in self.sources:
+                    raise ValueError(f"{name} requires unknown source {dependency}")
+                visit(dependency, path + (name,))
+            visiting.discard(name)
+            checked.add(name)
+
+        for name in self.sources:
+            visit(name, ())
+
+    def _state(self, name: str) -> _State:
+        if name not in self.sources:
+            raise KeyError(f"Unknown source {name}")
+        state = self._states.get(name)
+        if state is None:
+            state = self._states[name] = _State()
+        return state
+
+    # Public API
+    async def run(self, on_ready: Optional[Callable[[str], Any]] = None, startup=None) -> Dict[str, str]:
+        """
+        (Re)load every source that is not lazy and wait for all of them. Lazy sources loaded before are
+        reloaded on their next load(). Returns name -> final status.
+
+        Args:
+            on_ready (Callable): Called with the name of every source once its data is stored, also for
+                lazy sources loaded later.
+            startup (StartupReport): If given, every source is recorded as a `fetch:<name>` phase.
+        """
+        self.on_ready = on_ready
+        self.startup = startup
+        previous, self._states = self._states, {}
+        for state in previous.values():
+            if state.task is not None and not state.task.done():
+                state.task.cancel()
+            state.event.set()  # Wakes wait() callers, they move on to the new state
+        self._slots = PrioritySlots(self.max_concurrency, self.slow_start)  # Connections may be new as well
+        tasks = [self.start(name) for name, source in self.sources.items() if not source.lazy]
+        await asyncio.gather(*tasks, return_exceptions=True)
+        return {name: self._state(name).status for name in self.sources if not self.sources[name].lazy}
+
+    def start(self, name: str) -> asyncio.Task:
+        """
+        Schedule `name` (and, through it, what it requires) unless it is already loading or loaded. Raises
+        KeyError for a name that is not among the sources, as load() and wait() do.
+        """
+        state = self._state(name)
+        if state.task is None:
+            state.task = asyncio.ensure_future(self._load(self.sources[name], state))
+        return state.task
+
+    async def load(self, name: str) -> bool:
+        """Load `name` on demand, typically a lazy source; returns whether its data is stored."""
+        await asyncio.shield(self.start(name))
+        return self._state(name).status == DONE
+
+    async def wait(self, name: str) -> bool:
+        """Wait until `name` finished without starting it; returns whether its data is stored."""
+        while True:
+            state = self._state(name)
+            await state.event.wait()
+            if self._states.get(name) is state:
+                return state.status == DONE
+
+    def status(self) -> Dict[str, Dict[str, Any]]:
+        """Per source: status, attempts, last error, and time spent waiting (dependencies, slot) and fetching."""
+        report = {}
+        for name, state in self._states.items():
+            entry = {'status': state.status, 'attempts': state.attempts}
+            if state.error is not None:
+                entry['error'] = repr(state.error)
+            if state.started_at is not None:
+                entry['waited_ms'] = round((state.started_at - state.queued_at) * 1000, 1)
+            if state.finished_at is not None and state.started_at is not None:
+                entry['fetch_ms'] = round((state.finished_at - state.started_at) * 1000, 1)
+            report[name] = entry
+        return report
+
+    # Internals
+    async def _load(self, source: Source, state: _State) -> None:
+        state.status = WAITING
+        state.queued_at = time.perf_counter()
+        try:
+            for dependency in source.requires:
+                self.start(dependency)  # All of them in parallel, not one after the other
+            for dependency in source.requires:
+                if not await self._load_dependency(dependency):
+                    state.status = SKIPPED
+                    logger.warning(f"Skipping {source.name}, required source {dependency} is unavailable")
+                    return
+            await self._fetch(source, state)
+        except Exception as e:  # Not in the source's retry_on
+            state.status = FAILED
+            state.error = e
+            logger.error(f"Error while loading {source.name}: {e!r}", exc_info=True)
+        finally:
+            state.finished_at = time.perf_counter()
+            state.event.set()
+
+    async def _load_dependency(self, name: str) -> bool:
+        await asyncio.shield(self.start(name))  # One dependent being cancelled must not cancel the shared fetch
+        return self._state(name).status == DONE
+
+    async def _fetch(self, source: Source, state: _State) -> None:
+        phase_start = self.startup.elapsed() if self.startup is not None else None
+        while True:
+            state.attempts += 1
+            await self._slots.acquire(source.priority)
+            state.status = RUNNING
+            if state.started_at is None:
+                state.started_at = time.perf_counter()
+            try:
+                data = await asyncio.wait_for(source.fetch(), source.timeout)
+            except source.retry_on as e:
+                state.error = e
+            else:
+                break
+            finally:
+                self._slots.release()
+            if state.attempts > source.retries:
+                state.status = FAILED
+                self._record(source, phase_start)
+                logger.error(f"Error while loading {source.name} after {state.attempts} attempts: {state.error!r}")
+                return
+            delay = source.backoff * 2 ** (state.attempts - 1)
+            logger.warning(f"Loading {source.name} failed ({state.error!r}), retrying in {delay:.1f}s")
+            state.status = WAITING
+            await asyncio.sleep(delay)
+
+        self._record(source, phase_start)
+        self.store(source.name, data)
+        state.error = None
+        state.status = DONE
+        if self.on_ready is not None:
+            try:
+                self.on_ready(source.name)
+            except Exception as e:
+                logger.error(f"on_ready failed for {source.name}: {e}", exc_info=True)
+
+    def _record(self, source: Source, phase_start: Optional[float]) -> None:
+        if self.startup is not None:
+            self.startup.record(f"fetch:{source.name}", phase_start)
@@ -0,0 +1,221 @@
+import asyncio
+import logging
+from bisect import bisect_left, insort
+from typing import Any, Callable, Dict, Iterable, List, Optional, Tuple
+
+from routing import route
+
+logger = logging.getLogger(__name__)
+
+FRIENDS_URI = "/lol-chat/v1/friends"
+CREATED, UPDATED, DELETED = 'created', 'updated', 'deleted'
+# Lower sorts first in the online view; unknown availabilities go after mobile, offline last
+AVAILABILITY_RANK = {'chat': 0, 'online': 0, 'away': 1, 'dnd': 2, 'mobile': 3, 'offline': 5}
+IN_GAME_STATUSES = frozenset(('inGame', 'championSelect', 'inQueue', 'hosting_ranked'))
+CACHE_REFRESH_DELAY = 0.5  # Seconds of event churn batched into one rebuild of the summoner_friends list
+
+
+def friend_key(friend: Dict[str, Any]) -> Optional[str]:
+    """Stable identity of a friend: puuid, else summonerId, else the chat id."""
+    for field in ('puuid', 'summonerId', 'id'):
+        value = friend.get(field)
+        if value:
+            return str(value)
+    return None
+
+
+def _name(friend: Dict[str, Any]) -> str:
+    return (friend.get('gameName') or friend.get('name') or '').casefold()
+
+
+def _game_status(friend: Dict[str, Any]) -> str:
+    lol = friend.get('lol')
+    return lol.get('gameStatus', '') if isinstance(lol, dict) else ''
+
+
+def online_first(friend: Dict[str, Any]) -> Tuple:
+    return AVAILABILITY_RANK.get(friend.get('availability'), 4), _name(friend)
+
+
+def by_name(friend: Dict[str, Any]) -> Tuple:
+    return (_name(friend),)
+
+
+def is_in_game(friend: Dict[str, Any]) -> bool:
+    return _game_status(friend) in IN_GAME_STATUSES
+
+
+class SortedView:
+    """
+    Friend keys kept in order by `sort_key` (ties broken by key) and optionally filtered by `include`.
+    Every change is a bisect plus one list insert/delete, the view is never re-sorted.
+    """
+
+    def __init__(self, sort_key: Callable[[Dict[str, Any]], Tuple],
+                 include: Optional[Callable[[Dict[str, Any]], bool]] = None):
+        self.sort_key = sort_key
+        self.include = include
+        self._order: List[Tuple] = []  # (*sort key, friend key), sorted
+        self._entries: Dict[str, Tuple] = {}  # friend key -> its entry in _order
+
+    def __len__(self) -> int:
+        return len(self._order)
+
+    def keys(self) -> List[str]:
+        return [entry[-1] for entry in self._order]
+
+    def position(self, key: str) -> Optional[int]:
+        entry = self._entries.get(key)
+        return None if entry is None else bisect_left(self._order, entry)
+
+    def remove(self, key: str) -> Optional[int]:
+        entry = self._entries.pop(key, None)
+        if entry is None:
+            return None
+        index = bisect_left(self._order, entry)
+        del self._order[index]
+        return index
+
+    def upsert(self, key: str, friend: Dict[str, Any]) -> Tuple[Optional[int], Optional[int]]:
+        """Place or move `key`, returns its (old, new) position, None where it is not in the view."""
+        entry = None
+        if self.include is None or self.include(friend):
+            entry = self.sort_key(friend) + (key,)
+        previous = self._entries.get(key)
+        if previous == entry:
+            index = None if entry is None else bisect_left(self._order, entry)
+            return index, index
+        old = self.remove(key) if previous is not None else None
+        if entry is None:
+            return old, None
+        insort(self._order, entry)
+        self._entries[key] = entry
+        return old, bisect_left(self._order, entry)
+
+    def clear(self) -> None:
+        self._order.clear()
+        self._entries.clear()
+
+
+class FriendsStore:
+    """
+    Friends keyed by puuid (see friend_key), fed by the full friends list and by the per-friend
+    /lol-chat/v1/friends/<id> events. Each effective change notifies `update_friend` observers with the
+    operation, the friend, the changed top-level fields and the friend's (old, new) position in every
+    view, so list widgets can move a single row instead of rebuilding. The `summoner_friends` cache
+    key is kept as the online-first list, rebuilt at most once per CACHE_REFRESH_DELAY under churn.
+    """
+
+    def __init__(self, cache, observer_manager):
+        self.cache = cache
+        self.observer_manager = observer_manager
+        self._friends: Dict[str, Dict[str, Any]] = {}
+        self._aliases: Dict[str, str] = {}  # Chat id / pid / summonerId -> friend key
+        self.views: Dict[str, SortedView] = {
+            'online': SortedView(online_first),
+            'in_game': SortedView(by_name, include=is_in_game),
+        }
+        self.loaded = False
+        self._refresh_scheduled = False
+
+    def __len__(self) -> int:
+        return len(self._friends)
+
+    def get(self, key_or_id: str) -> Optional[Dict[str, Any]]:
+        return self._friends.get(self._aliases.get(str(key_or_id), str(key_or_id)))
+
+    def view(self, name: str = 'online') -> List[Dict[str, Any]]:
+        return [self._friends[key] for key in self.views[name].keys()]
+
+    # Full list
+    def replace_all(self, friends: Iterable[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        """
+        Reconcile with a full friends list (initial load or resync). Only the differences are applied;
+        they notify observers unless this is the first load. Returns the online-first view.
+        """
+        notify = self.loaded
+        incoming = {}
+        for friend in friends:
+            key = friend_key(friend)
+            if key is not None:
+                incoming[key] = friend
+        for key in [key for key in self._friends if key not in incoming]:
+            self._delete(key, notify)
+        for key, friend in incoming.items():
+            self._upsert(key, friend, notify)
+        self.loaded = True
+        friends_view = self.view()
+        self.cache.set('summoner_friends', friends_view)
+        return friends_view
+
+    # Incremental events
+    @route(FRIENDS_URI, prefix=True)
+    def handle_friend_event(self, event_data: Dict[str, Any]) -> None:
+        try:
+            uri = event_data.get('uri', '')
+            data = event_data.get('data')
+            if uri.rstrip('/') == FRIENDS_URI:
+                if isinstance(data, list):
+                    self.replace_all(data)
+                return
+            friend_id = uri[len(FRIENDS_URI) + 1:].split('/', 1)[0]
+            if not friend_id:
+                return
+            if event_data.get('eventType') == 'Delete' or not isinstance(data, dict):
+                key = self._aliases.get(friend_id, friend_id)
+                changed = self._delete(key, notify=True)
+            else:
+                key = friend_key(data) or friend_id
+                changed = self._upsert(key, data, notify=True)
+                self._aliases[friend_id] = key
+            if changed:
+                self._schedule_cache_refresh()
+        except Exception as e:
+            logger.error(f"Unexpected error in handle_friend_event: {e}", exc_info=True)
+
+    # Internals
+    def _schedule_cache_refresh(self) -> None:
+        if self._refresh_scheduled:
+            return
+        try:
+            loop = asyncio.get_running_loop()
+        except RuntimeError:
+            self._refresh_cache()  # No loop to defer on, refresh now
+            return
+        self._refresh_scheduled = True
+        loop.call_later(CACHE_REFRESH_DELAY, self._refresh_cache)
+
+    def _refresh_cache(self) -> None:
+        self._refresh_scheduled = False
+        self.cache.set('summoner_friends', self.view())
+
+    def _upsert(self, key: str, friend: Dict[str, Any], notify: bool) -> bool:
+        previous = self._friends.get(key)
+        if previous is None:
+            fields = list(friend)
+        else:
+            fields = [field for field in friend.keys() | previous.keys() if friend.get(field) != previous.get(field)]
+            if not fields:
+                return False
+        self._friends[key] = friend
+        for field in ('id', 'pid', 'summonerId'):
+            alias = friend.get(field)
+            if alias:
+                self._aliases[str(alias)] = key
+        positions = {name: view.upsert(key, friend) for name, view in self.views.items()}
+        if notify:
+            self.observer_manager.notify('update_friend', op=CREATED if previous is None else UPDATED, friend_id=key,
+                                         friend=friend, fields=fields, positions=positions)
+        return True
+
+    def _delete(self, key: str, notify: bool) -> bool:
+        friend = self._friends.pop(key, None)
+        if friend is None:
+            return False
+        for alias in [alias for alias, target in self._aliases.items() if target == key]:
+            del self._aliases[alias]
+        positions = {name: (view.remove(key), None) for name, view in self.views.items()}
+        if notify:
+            self.observer_manager.notify('update_friend', op=DELETED, friend_id=key, friend=friend, fields=[],
+                                         positions=positions)
+        return True
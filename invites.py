@@ -0,0 +1,123 @@
+import asyncio
+import logging
+import time
+from typing import Any, Awaitable, Callable, Dict, List, Optional
+
+logger = logging.getLogger(__name__)
+
+DEBOUNCE_WINDOW = 0.15  # Seconds clicks are collected before a batch is sent
+MAX_BATCH = 10  # Recipients per POST
+RATE = 2.0  # Sustained batches per second
+BURST = 2  # Batches allowed back to back before RATE applies
+RESEND_AFTER = 5.0  # Seconds a successful invite suppresses repeated clicks for the same friend
+
+SENT = {"message": "Invitation sent successfully", "status": "success"}
+ALREADY_SENT = {"message": "Invitation already sent", "status": "success"}
+REJECTED = {"message": "Failed to invite: SETUP A LOBBY FIRST", "status": "error"}
+FAILED = {"message": "An error occurred", "status": "error"}
+
+
+class RateLimiter:
+    """Token bucket: `burst` acquisitions at once, refilled at `rate` per second."""
+
+    def __init__(self, rate: float = RATE, burst: int = BURST, clock: Callable[[], float] = time.monotonic):
+        self.rate = rate
+        self.burst = burst
+        self._clock = clock
+        self._tokens = float(burst)
+        self._updated = clock()
+
+    async def acquire(self) -> None:
+        while True:
+            now = self._clock()
+            self._tokens = min(self.burst, self._tokens + (now - self._updated) * self.rate)
+            self._updated = now
+            if self._tokens >= 1:
+                self._tokens -= 1
+                return
+            await asyncio.sleep((1 - self._tokens) / self.rate)
+
+
+class InviteScheduler:
+    """
+    Collects lobby invitations for DEBOUNCE_WINDOW and sends them as one batched POST per MAX_BATCH
+    recipients, rate limited. Repeated clicks for a friend that is queued, in flight or was just invited
+    are merged, and every UI index that asked for a friend receives that friend's result.
+    """
+
+    def __init__(self, send: Callable[..., Awaitable[Dict[int, bool]]],
+                 on_result: Callable[[Dict[str, Any]], Any], debounce: float = DEBOUNCE_WINDOW,
+                 max_batch: int = MAX_BATCH, limiter: Optional[RateLimiter] = None,
+                 resend_after: float = RESEND_AFTER, clock: Callable[[], float] = time.monotonic):
+        """
+        Args:
+            send (Callable): Coroutine function called as send(summoner_ids=[...]) to POST one batch,
+                returning summoner id -> whether the client accepted that invitation
+                (LCUDataRetriever.invite_friends).
+            on_result (Callable): Receives one result dict per requesting index, with `index` set.
+            debounce (float): Seconds to wait for more clicks before sending.
+            max_batch (int): Maximum recipients per request.
+            limiter (RateLimiter): Limits the number of requests, RATE/BURST by default.
+            resend_after (float): Seconds during which a friend invited successfully is not invited again.
+        """
+        self.send = send
+        self.on_result = on_result
+        self.debounce = debounce
+        self.max_batch = max_batch
+        self.limiter = limiter or RateLimiter(clock=clock)
+        self.resend_after = resend_after
+        self._clock = clock
+        self._queued: Dict[int, List[Optional[int]]] = {}  # Summoner id -> UI indexes, in click order
+        self._in_flight: Dict[int, List[Optional[int]]] = {}
+        self._sent_at: Dict[int, float] = {}
+        self._task: Optional[asyncio.Task] = None
+
+    def submit(self, summoner_id: Any, index: Optional[int] = None) -> None:
+        """Queue an invitation, must be called from the event loop."""
+        summoner_id = int(summoner_id)
+        waiters = self._queued.get(summoner_id) or self._in_flight.get(summoner_id)
+        if waiters is not None:
+            waiters.append(index)
+            return
+        sent_at = self._sent_at.get(summoner_id)
+        if sent_at is not None and self._clock() - sent_at < self.resend_after:
+            self._deliver(index, ALREADY_SENT)
+            return
+        self._queued[summoner_id] = [index]
+        if self._task is None or self._task.done():
+            self._task = asyncio.ensure_future(self._run())
+
+    async def flush(self) -> None:
+        """Wait until everything queued so far has been sent and reported."""
+        if self._task is not None:
+            await asyncio.shield(self._task)
+
+    async def _run(self) -> None:
+        await asyncio.sleep(self.debounce)
+        while self._queued:
+            batch = list(self._queued)[:self.max_batch]
+            for summoner_id in batch:
+                self._in_flight[summoner_id] = self._queued.pop(summoner_id)
+            await self.limiter.acquire()
+            try:
+                accepted = await self.send(summoner_ids=batch)
+            except Exception as e:
+                logger.error(f"Failed to send {len(batch)} lobby invitations: {e}")
+                accepted = None
+            now = self._clock()
+            for summoner_id in batch:
+                if accepted is None:
+                    result = FAILED
+                elif accepted.get(summoner_id, False):
+                    result = SENT
+                    self._sent_at[summoner_id] = now
+                else:
+                    result = REJECTED
+                for index in self._in_flight.pop(summoner_id):
+                    self._deliver(index, result)
+
+    def _deliver(self, index: Optional[int], result: Dict[str, str]) -> None:
+        try:
+            self.on_result(dict(result, index=index))
+        except Exception as e:
+            logger.error(f"Invite result handler failed: {e}", exc_info=True)
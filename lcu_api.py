@@ -1,296 +1,331 @@
 import asyncio
 import aiohttp
 import logging
-from decotools import session_manager
-from typing import Dict, List, Any
+from ddragon import DOWNLOAD_TIMEOUT, DataDragonStore
+from friends_store import FriendsStore
+from decotools import pooled_session
+from fetch_scheduler import FetchScheduler, Source
+from match_history import MatchHistorySync
+from match_stats import MatchStats
+from match_transform import transform_matches
+from metrics import request_trace_config
+from request_cache import ResponseCache
+from queues import QUEUE_MAPPING, get_game_mode_from_queue  # noqa: F401, re-exported
+from typing import Callable, Dict, List, Any, Optional, Tuple
 
 logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
 
-QUEUE_MAPPING = {
-    0: "Custom",
-    2: "Normal",
-    4: "Ranked Solo",
-    6: "Ranked Duo",
-    7: "Historical",
-    8: "Normal 3v3",
-    9: "Ranked Flex",
-    14: "Normal Draft",
-    16: "Dominion",
-    17: "ARAM",
-    25: "ARAM Co-op vs AI",
-    31: "Co-op vs AI",
-    32: "Co-op vs AI Intro",
-    33: "Co-op vs AI Beginner",
-    52: "Twisted Treeline Co-op vs AI",
-    61: "Team Builder",
-    65: "ARAM Ultra Rapid Fire",
-    67: "Doom Bots Rank 1",
-    70: "One for All",
-    72: "Snowdown Showdown 1v1",
-    73: "Snowdown Showdown 2v2",
-    75: "Hexakill",
-    76: "URF",
-    78: "One for All (Mirror)",
-    83: "Ultra Rapid Fire Co-op vs AI",
-    91: "Doom Bots Rank 2",
-    92: "Doom Bots Rank 5",
-    93: "Ascension",
-    96: "Hexakill Twisted Treeline",
-    98: "6v6 Hexakill",
-    100: "ARAM Butcher's Bridge",
-    300: "Legend of the Poro King",
-    310: "Nemesis",
-    313: "Black Market Brawlers",
-    315: "Nexus Siege",
-    317: "Definitely Not Dominion",
-    318: "All Random URF",
-    325: "All Random Summoner's Rift",
-    400: "Draft Pick",
-    420: "Ranked",
-    430: "Blind Pick",
-    440: "Flex",
-    450: "ARAM",
-    460: "Dark Star Singularity",
-    470: "Ranked Flex 3v3",
-    600: "Blood Hunt Assassin",
-    610: "Dark Star: Singularity",
-    700: "Clash",
-    800: "Co-op vs. AI Intermediate",
-    810: "Co-op vs. AI Intro",
-    820: "Co-op vs. AI Beginner",
-    830: "Co-op vs. AI Intro Bot",
-    840: "Co-op vs. AI Beginner Bot",
-    850: "Co-op vs. AI Intermediate Bot",
-    900: "URF",
-    910: "Ascension",
-    920: "Legend of the Poro King",
-    940: "Nexus Siege",
-    950: "Doom Bots Voting",
-    960: "Doom Bots Standard",
-    980: "Star Guardian Invasion: Normal",
-    990: "Star Guardian Invasion: Onslaught",
-    1000: "PROJECT: Hunters",
-    1010: "Snow ARURF",
-    1020: "One for All",
-    1030: "Odyssey Extraction: Intro",
-    1040: "Odyssey Extraction: Cadet",
-    1050: "Odyssey Extraction: Crewmember",
-    1060: "Odyssey Extraction: Captain",
-    1070: "Odyssey Extraction: Onslaught",
-    1090: "Teamfight Tactics",
-    1100: "Ranked Teamfight Tactics",
-    1110: "Teamfight Tactics Tutorial",
-    1111: "Teamfight Tactics Test",
-    1200: "Nexus Blitz",
-}
-
-
-def get_game_mode_from_queue(queue_id: int) -> str:
-    return QUEUE_MAPPING.get(queue_id, "Unknown")
-
 
 def _transform_match_data(match_data: List[Dict[str, Any]], summoner_id: str) -> List[Dict[str, Any]]:
-    transformed_data = []
-    for data in match_data:
-        queue_id = data.get('queueId', None)
-        if queue_id is not None:
-            data['gameMode'] = get_game_mode_from_queue(queue_id)
-
-        participant_info = next((identity for identity in data['participantIdentities']
-                                 if identity['player']['summonerId'] == summoner_id), None)
-        participant_id = participant_info['participantId'] if participant_info else None
-
-        if participant_id:
-            participant_team = next((participant['teamId'] for participant in data['participants']
-                                     if participant['participantId'] == participant_id), None)
-            if participant_team:
-                team_win = next((team['win'] for team in data['teams'] if team['teamId'] == participant_team), 'Fail')
-                data['winLoss'] = 'Victory' if team_win == 'Win' else 'Defeat'
-        transformed_data.append(data)
-    return transformed_data
+    return transform_matches(match_data, summoner_id)
 
 
 logger = logging.getLogger(__name__)
 
+LCU_CONNECTIONS_PER_HOST = 6  # The LCU serves everything from a single host, cap parallel sockets to it
+KEEPALIVE_TIMEOUT = 60  # Seconds an idle keep-alive connection is kept in the pool
+MATCH_STATS_WINDOW = 5000  # Stored games loaded into the columnar stats engine
+MATCH_WINDOW = 100  # Games of the lazily loaded summoner_match_window, for the full match history panel
+MATCH_SYNC_TIMEOUT = 30  # Seconds, a sync fetches up to MAX_PAGES new and BACKFILL_PAGES older pages
+# Cache keys fed by LCU state that can change while the WebSocket is down; champs_data is static per patch
+RESYNC_KEYS = ('summoner_mastery', 'current_ranked_stats', 'summoner_match_data', 'summoner_friends')
+
 
 class LCUDataRetriever:
-    def __init__(self, ssl, cache):
+    def __init__(self, ssl, cache, ddragon: Optional[DataDragonStore] = None,
+                 match_sync: Optional[MatchHistorySync] = None, response_cache: Optional[ResponseCache] = None,
+                 friends: Optional[FriendsStore] = None):
         self.ssl = ssl
         self.cache = cache
-
-    async def get_client_data(self):
+        self.response_cache = response_cache or ResponseCache()
+        self.ddragon = ddragon or DataDragonStore()
+        self.match_sync = match_sync or MatchHistorySync()
+        self.match_sync.add_listener(self._on_new_games)
+        self.match_stats: Dict[str, MatchStats] = {}
+        self.friends = friends
+        self.scheduler = FetchScheduler(self._client_data_sources(), store=self.cache.set,
+                                        max_concurrency=LCU_CONNECTIONS_PER_HOST)
+        self._lcu_session: Optional[aiohttp.ClientSession] = None
+        self._lcu_session_key: Optional[Tuple[str, str]] = None
+        self._web_session: Optional[aiohttp.ClientSession] = None
+        self._session_lock = asyncio.Lock()
+
+    # Session lifecycle
+    async def lcu_session(self) -> aiohttp.ClientSession:
+        """Return the pooled LCU session, recreating it when the client credentials changed."""
         credentials = self.cache.get_client_credentials()
-        self.cache.set('current_summoner',
-                       await self.current_summoner(port=credentials.get('port'), password=credentials.get('password')))
-
-        tasks = {
-            'summoner_mastery': self.get_summoner_mastery(port=credentials.get('port'),
-                                                          password=credentials.get('password')),
-            'current_ranked_stats': self.get_summoner_rank_stats(port=credentials.get('port'),
-                                                                 password=credentials.get('password')),
-            'summoner_match_data': self.get_summoner_match_data(port=credentials.get('port'),
-                                                                password=credentials.get('password')),
-            'champs_data': self.get_champs_data(),
-
-            'summoner_friends': self.get_friends_data(port=credentials.get('port'),
-                                                      password=credentials.get('password'))
-
+        key = (str(credentials.get('port')), str(credentials.get('password')))
+        async with self._session_lock:
+            if self._lcu_session is None or self._lcu_session.closed or self._lcu_session_key != key:
+                if self._lcu_session is not None and not self._lcu_session.closed:
+                    logger.info("Client credentials changed, recreating LCU session.")
+                    await self._lcu_session.close()
+                if self._lcu_session_key != key:
+                    # Responses of the previous client instance, also after close() dropped its session
+                    self.response_cache.clear()
+                port, password = key
+                connector = aiohttp.TCPConnector(ssl=self.ssl, limit_per_host=LCU_CONNECTIONS_PER_HOST,
+                                                 keepalive_timeout=KEEPALIVE_TIMEOUT)
+                self._lcu_session = aiohttp.ClientSession(base_url=f"https://127.0.0.1:{port}",
+                                                          connector=connector,
+                                                          auth=aiohttp.BasicAuth('riot', password=password),
+                                                          trace_configs=[request_trace_config()])
+                self._lcu_session_key = key
+            return self._lcu_session
+
+    async def web_session(self) -> aiohttp.ClientSession:
+        """Return the pooled session used for public endpoints such as ddragon (no LCU auth attached)."""
+        async with self._session_lock:
+            if self._web_session is None or self._web_session.closed:
+                connector = aiohttp.TCPConnector(keepalive_timeout=KEEPALIVE_TIMEOUT)
+                self._web_session = aiohttp.ClientSession(connector=connector, trace_configs=[request_trace_config()])
+            return self._web_session
+
+    async def close(self) -> None:
+        """Close the pooled sessions, should be awaited on shutdown."""
+        async with self._session_lock:
+            for session in (self._lcu_session, self._web_session):
+                if session is not None and not session.closed:
+                    await session.close()
+            self._lcu_session = None
+            self._lcu_session_key = None
+            self._web_session = None
+
+    async def _get_json(self, session: aiohttp.ClientSession, path: str) -> Any:
+        """GET an LCU endpoint through the response cache, identical concurrent requests share one call."""
+        async def fetch():
+            async with session.get(path) as response:
+                if response.status != 200:
+                    raise ValueError(f"Unexpected response status: {response.status}")
+                return await response.json(content_type=None)
+
+        return await self.response_cache.get(path, fetch)
+
+    def _client_data_sources(self) -> List[Source]:
+        # Priorities put the summoner header first and static Data Dragon data last. Only mastery and match
+        # history are looked up by the summoner's ids, everything else starts right away.
+        return [
+            Source('current_summoner', self.current_summoner, priority=0, retries=3),
+            Source('current_ranked_stats', self.get_summoner_rank_stats, priority=1),
+            Source('summoner_mastery', self.get_summoner_mastery, requires=('current_summoner',), priority=1),
+            Source('summoner_match_data', self.get_summoner_match_data, requires=('current_summoner',),
+                   priority=2, timeout=MATCH_SYNC_TIMEOUT),
+            Source('summoner_friends', self.get_friends_data, priority=2),
+            Source('champs_data', self.get_champs_data, priority=3, timeout=DOWNLOAD_TIMEOUT),
+            Source('summoner_match_window', lambda: self.get_match_window(MATCH_WINDOW),
+                   requires=('summoner_match_data',), priority=5, lazy=True),
+        ]
+
+    async def get_client_data(self, on_ready: Optional[Callable[[str], Any]] = None, startup=None) -> Dict[str, str]:
+        """
+        Fetch the startup data sets into the cache through the scheduler (see _client_data_sources). Each
+        one is stored as soon as it lands and reported through `on_ready(key)`; failures are retried and
+        only hold up the data sets that depend on them. Returns key -> final status.
+
+        Args:
+            on_ready (Callable): Called with the cache key of every data set once it is stored.
+            startup (StartupReport): If given, each fetch is recorded as a `fetch:<key>` phase.
+        """
+        await self.ddragon.load()  # Last known patch version for icon URLs, no network involved
+        self.cache.set('ddragon_version', self.ddragon.version)
+        statuses = await self.scheduler.run(on_ready=on_ready, startup=startup)
+        logger.info(f"Client data loaded: {statuses}")
+        return statuses
+
+    async def load(self, name: str) -> bool:
+        """Load a lazy data set such as summoner_match_window, e.g. when its panel is opened."""
+        return await self.scheduler.load(name)
+
+    async def wait_ready(self, name: str) -> bool:
+        """Wait until get_client_data finished the data set `name`, returns whether it was stored."""
+        return await self.scheduler.wait(name)
+
+    async def resync(self, keys=RESYNC_KEYS) -> None:
+        """
+        Refresh only the given cache keys after a reconnect instead of a full get_client_data. Updates go
+        through Cache.update, so keys whose data did not change while disconnected notify nothing.
+        """
+        self.response_cache.clear()  # Events invalidating these were missed while disconnected
+        fetchers = {
+            'summoner_mastery': self.get_summoner_mastery,
+            'current_ranked_stats': self.get_summoner_rank_stats,
+            'summoner_match_data': self.get_summoner_match_data,
+            'summoner_friends': self.get_friends_data,
         }
-
-        results = await asyncio.gather(*tasks.values())
-
-        for name, data in zip(tasks.keys(), results):
+        try:
+            # Mastery and match history are looked up by the ids of the (possibly different) summoner
+            self.cache.update('current_summoner', await self.current_summoner())
+        except Exception as e:
+            logger.error(f"Resync of current_summoner failed: {e}")
+            return
+        keys = [key for key in keys if key in fetchers]
+        results = await asyncio.gather(*(fetchers[key]() for key in keys), return_exceptions=True)
+        for key, data in zip(keys, results):
             if isinstance(data, Exception):
-                logging.error(f"Error while executing task {name}: {data}")
-            else:
-                self.cache.set(name, data)
-
-    @session_manager
-    async def current_summoner(self, session: aiohttp.ClientSession, port: str, password: str) -> Dict[str, Any]:
-        url = f"https://127.0.0.1:{port}/lol-summoner/v1/current-summoner"
-        async with session.get(url, ssl=self.ssl, auth=aiohttp.BasicAuth('riot', password=password)) as response:
-            if response.status == 200:
-                user_data = await response.json()
-                profile_icon_url = f"https://ddragon.leagueoflegends.com/cdn/14.8.1/img/profileicon/{user_data.get('profileIconId', '')}.png"
-                return {
-                    "accountId": user_data.get("accountId", ""),
-                    "displayName": user_data.get("displayName", ""),
-                    "profileIconUrl": profile_icon_url,
-                    "puuid": user_data.get("puuid", ""),
-                    "summonerId": user_data.get("summonerId", ""),
-                    "summonerLevel": user_data.get("summonerLevel", "")
-                }
+                logger.error(f"Resync of {key} failed: {data}")
             else:
-                raise ValueError(f"Unexpected response status: {response.status}")
+                self.cache.update(key, data)
+        logger.info(f"Resynced {len(keys)} cache keys after reconnect.")
+
+    @pooled_session('lcu_session')
+    async def current_summoner(self, session: aiohttp.ClientSession) -> Dict[str, Any]:
+        user_data = await self._get_json(session, "/lol-summoner/v1/current-summoner")
+        profile_icon_url = self.ddragon.cdn_url(f"img/profileicon/{user_data.get('profileIconId', '')}.png")
+        return {
+            "accountId": user_data.get("accountId", ""),
+            "displayName": user_data.get("displayName", ""),
+            "profileIconUrl": profile_icon_url,
+            "puuid": user_data.get("puuid", ""),
+            "summonerId": user_data.get("summonerId", ""),
+            "summonerLevel": user_data.get("summonerLevel", "")
+        }
 
-    @session_manager
-    async def get_summoner_mastery(self, session: aiohttp.ClientSession, port: str, password: str) -> List[
-        Dict[str, Any]]:
+    @pooled_session('lcu_session')
+    async def get_summoner_mastery(self, session: aiohttp.ClientSession) -> List[Dict[str, Any]]:
         summoner_id = self.cache.get_nested('current_summoner', 'summonerId')
-        url = f"https://127.0.0.1:{port}/lol-collections/v1/inventories/{summoner_id}/champion-mastery"
-        async with session.get(url=url, ssl=self.ssl, auth=aiohttp.BasicAuth('riot', password=password)) as response:
-            if response.status != 200:
-                raise ValueError(f"Unexpected response status: {response.status}")
-            mastery_log = await response.json()
-            if not isinstance(mastery_log, list) or any(not isinstance(entry, dict) for entry in mastery_log):
-                raise TypeError("Unexpected response content")
+        mastery_log = await self._get_json(session, f"/lol-collections/v1/inventories/{summoner_id}/champion-mastery")
+        if not isinstance(mastery_log, list) or any(not isinstance(entry, dict) for entry in mastery_log):
+            raise TypeError("Unexpected response content")
         return mastery_log[:3]  # Return the top 3 mastery entries
 
-    @session_manager
-    async def get_summoner_rank_stats(self, session: aiohttp.ClientSession, port: str, password: str) -> Dict[str, Any]:
-        url = f"https://127.0.0.1:{port}/lol-ranked/v1/current-ranked-stats"
-        async with session.get(url, ssl=self.ssl, auth=aiohttp.BasicAuth('riot', password=password)) as response:
-            if response.status != 200:
-                raise ValueError("Unexpected response status: {response.status}")
-            rank_stats = await response.json(content_type=None)
-            if not isinstance(rank_stats, dict):
-                raise TypeError("Unexpected response content")
-
-            try:
-                highest_ranked_entry = rank_stats['highestRankedEntry']
-                seasons = rank_stats['seasons']
-                ranked_solo = seasons['RANKED_SOLO_5x5']
-
-                data_log = {
-                    "highestTier": highest_ranked_entry['highestTier'].title(),
-                    "queueType": highest_ranked_entry['queueType'],
-                    "division": highest_ranked_entry['division'],
-                    "losses": highest_ranked_entry['losses'],
-                    "wins": highest_ranked_entry['wins'],
-                    "leaguePoints": highest_ranked_entry['leaguePoints'],
-                    "miniSeriesProgress": highest_ranked_entry.get('miniSeriesProgress', ''),
-                    "provisionalGamesRemaining": highest_ranked_entry.get('provisionalGamesRemaining', 0),
-                    "highestCurrentSeasonTier": rank_stats.get('highestCurrentSeasonReachedTierSR', 'Unknown'),
-                    "highestPreviousSeasonTier": rank_stats.get('highestPreviousSeasonEndTier', 'Unknown'),
-                    "highestPreviousSeasonDivision": rank_stats.get('highestPreviousSeasonEndDivision', 'Unknown'),
-                    "win-rate": None,  # Calculated below
-                    "rank-logo": highest_ranked_entry['highestTier'].title(),
-                    "current-season": ranked_solo['currentSeasonId']
-                }
-
-                total_games = highest_ranked_entry.get("wins", 0) + highest_ranked_entry.get("losses", 0)
-                data_log['win-rate'] = round((highest_ranked_entry.get("wins", 0) / total_games) * 100,
-                                             2) if total_games > 0 else 0.00
-            except KeyError as e:
-                raise KeyError(f"Expected key not found in response: {str(e)}")
+    @pooled_session('lcu_session')
+    async def get_summoner_rank_stats(self, session: aiohttp.ClientSession) -> Dict[str, Any]:
+        rank_stats = await self._get_json(session, "/lol-ranked/v1/current-ranked-stats")
+        if not isinstance(rank_stats, dict):
+            raise TypeError("Unexpected response content")
+
+        try:
+            highest_ranked_entry = rank_stats['highestRankedEntry']
+            seasons = rank_stats['seasons']
+            ranked_solo = seasons['RANKED_SOLO_5x5']
+
+            data_log = {
+                "highestTier": highest_ranked_entry['highestTier'].title(),
+                "queueType": highest_ranked_entry['queueType'],
+                "division": highest_ranked_entry['division'],
+                "losses": highest_ranked_entry['losses'],
+                "wins": highest_ranked_entry['wins'],
+                "leaguePoints": highest_ranked_entry['leaguePoints'],
+                "miniSeriesProgress": highest_ranked_entry.get('miniSeriesProgress', ''),
+                "provisionalGamesRemaining": highest_ranked_entry.get('provisionalGamesRemaining', 0),
+                "highestCurrentSeasonTier": rank_stats.get('highestCurrentSeasonReachedTierSR', 'Unknown'),
+                "highestPreviousSeasonTier": rank_stats.get('highestPreviousSeasonEndTier', 'Unknown'),
+                "highestPreviousSeasonDivision": rank_stats.get('highestPreviousSeasonEndDivision', 'Unknown'),
+                "win-rate": None,  # Calculated below
+                "rank-logo": highest_ranked_entry['highestTier'].title(),
+                "current-season": ranked_solo['currentSeasonId']
+            }
+
+            total_games = highest_ranked_entry.get("wins", 0) + highest_ranked_entry.get("losses", 0)
+            data_log['win-rate'] = round((highest_ranked_entry.get("wins", 0) / total_games) * 100,
+                                         2) if total_games > 0 else 0.00
+        except KeyError as e:
+            raise KeyError(f"Expected key not found in response: {str(e)}")
 
         return data_log
 
-    @session_manager
-    async def get_summoner_match_data(self, session: aiohttp.ClientSession, port: str, password: str) -> List[Dict[str, Any]]:
+    @pooled_session('lcu_session')
+    async def get_summoner_match_data(self, session: aiohttp.ClientSession) -> List[Dict[str, Any]]:
         puuid = self.cache.get_nested('current_summoner', 'puuid')
         summoner_id = self.cache.get_nested('current_summoner', 'summonerId')
-        url = f"https://127.0.0.1:{port}/lol-match-history/v1/products/lol/{puuid}/matches"
-        async with session.get(url, ssl=self.ssl, auth=aiohttp.BasicAuth('riot', password)) as response:
-            if response.status != 200:
-                raise ValueError("Unexpected response status: {response.status}")
-            match_data = await response.json()
-            return _transform_match_data(match_data['games']['games'][:10],
-                                         summoner_id=summoner_id)  # Latest 10 matches
+        try:
+            await self.match_sync.sync(session, puuid)
+        except Exception as e:
+            logger.warning(f"Match history sync failed, serving stored games: {e}")
+        return _transform_match_data(await self.match_sync.recent(puuid, 10),
+                                     summoner_id=summoner_id)  # Latest 10 matches
 
-    @session_manager
+    async def get_match_window(self, limit: int = 100, since_ms: Optional[int] = None) -> List[Dict[str, Any]]:
+        """Stored games of the current summoner: the latest `limit`, optionally only those since `since_ms`."""
+        puuid = self.cache.get_nested('current_summoner', 'puuid')
+        summoner_id = self.cache.get_nested('current_summoner', 'summonerId')
+        if since_ms is not None:
+            games = await self.match_sync.since(puuid, since_ms, limit)
+        else:
+            games = await self.match_sync.recent(puuid, limit)
+        return _transform_match_data(games, summoner_id=summoner_id)
+
+    async def get_match_stats(self, limit: int = MATCH_STATS_WINDOW) -> MatchStats:
+        """Columnar stats over the latest `limit` stored games, built once and extended by later syncs."""
+        puuid = self.cache.get_nested('current_summoner', 'puuid')
+        stats = self.match_stats.get(puuid)
+        if stats is None:
+            stats = MatchStats(puuid=puuid, summoner_id=self.cache.get_nested('current_summoner', 'summonerId'))
+            stats.extend(await self.match_sync.recent(puuid, limit))
+            self.match_stats[puuid] = stats
+        return stats
+
+    def _on_new_games(self, puuid: str, games: List[Dict[str, Any]]) -> None:
+        stats = self.match_stats.get(puuid)
+        if stats is not None:
+            stats.extend(games)
+
+    @pooled_session('web_session')
     async def get_champs_data(self, session: aiohttp.ClientSession) -> Dict[str, Any]:
-        url = "https://ddragon.leagueoflegends.com/cdn/14.8.1/data/en_US/champion.json"
-        async with session.get(url) as response:
-            if response.status == 200:
-                data = await response.json(content_type=None)
-                if not isinstance(data, dict):
-                    raise TypeError("Unexpected response content")
-                return data['data']
-            else:
-                raise ValueError(f"Unexpected response status: {response.status}")
-
-    @session_manager
-    async def get_friends_data(self, session: aiohttp.ClientSession, port: str, password: str) -> List[Dict[str, Any]]:
-        url = f"https://127.0.0.1:{port}/lol-chat/v1/friends"
-        async with session.get(url, ssl=self.ssl, auth=aiohttp.BasicAuth('riot', password)) as response:
-            if response.status != 200:
-                raise ValueError(f"Unexpected response status: {response.status}")
-            return await response.json()
-
-    @session_manager
+        # Served from the local Data Dragon store, a newer patch is picked up in the background
+        data = await self.ddragon.get_json(session, "data/en_US/champion.json",
+                                           on_update=self._on_champs_data_update)
+        if not isinstance(data, dict):
+            raise TypeError("Unexpected response content")
+        return data['data']
+
+    def _on_champs_data_update(self, data: Dict[str, Any]) -> None:
+        if isinstance(data, dict) and 'data' in data:
+            self.cache.set('ddragon_version', self.ddragon.version)
+            self.cache.update('champs_data', data['data'])
+
+    @pooled_session('lcu_session')
+    async def get_friends_data(self, session: aiohttp.ClientSession) -> List[Dict[str, Any]]:
+        friends = await self._get_json(session, "/lol-chat/v1/friends")
+        if self.friends is None or not isinstance(friends, list):
+            return friends
+        return self.friends.replace_all(friends)  # Online-first order, later kept current by friend events
+
+    @pooled_session('lcu_session')
     async def set_lobby_match(self, session: aiohttp.ClientSession, lobby_id: int) -> None:
         payload = {"queueId": lobby_id}
-        url = f"https://127.0.0.1:{self.cache.client_credentials.get('port')}/lol-lobby/v2/lobby"
-        async with session.post(url, ssl=self.ssl,
-                                auth=aiohttp.BasicAuth('riot', self.cache.client_credentials.get('password')),
-                                json=payload) as response:
+        async with session.post("/lol-lobby/v2/lobby", json=payload) as response:
             if response.status != 200:
                 response_text = await response.text()
                 logger.error(f"Failed to set lobby match: {response.status} - {response_text}")
 
-    @session_manager
+    @pooled_session('lcu_session')
     async def search_lobby(self, session: aiohttp.ClientSession) -> None:
-        url = f"https://127.0.0.1:{self.cache.client_credentials.get('port')}/lol-lobby/matchmaking/search"
-        async with session.post(url, ssl=self.ssl, auth=aiohttp.BasicAuth('riot', self.cache.client_credentials.get(
-                'password'))) as response:
+        async with session.post("/lol-lobby/matchmaking/search") as response:
             if response.status != 200:
                 response_text = await response.text()
                 logger.error(f"Failed to set lobby match: {response.status} - {response_text}")
 
-    @session_manager
+    @pooled_session('lcu_session')
     async def accept_match(self, session: aiohttp.ClientSession) -> None:
-        url = f"https://127.0.0.1:{self.cache.client_credentials.get('port')}/lol-matchmaking/v1/ready-check/accept"
-        async with session.post(url, ssl=self.ssl, auth=aiohttp.BasicAuth('riot', self.cache.client_credentials.get(
-                'password'))) as response:
+        async with session.post("/lol-matchmaking/v1/ready-check/accept") as response:
             if response.status != 200:
                 response_text = await response.text()
                 logger.error(f"Failed to accept match: {response.status} - {response_text}")
 
-    @session_manager
-    async def invite_friend(self, session: aiohttp.ClientSession, friend_id: int, index: int) -> Dict[str, Any]:
+    @pooled_session('lcu_session')
+    async def invite_friends(self, session: aiohttp.ClientSession, summoner_ids: List[int]) -> Dict[int, bool]:
+        """
+        Invite several summoners with one POST, returns summoner id -> whether the client accepted the
+        invitation. Used in batches by invites.InviteScheduler.
+        """
+        payload = [{"toSummonerId": summoner_id} for summoner_id in summoner_ids]
+        async with session.post("/lol-lobby/v2/lobby/invitations", json=payload) as response:
+            if response.status != 200:
+                response_text = await response.text()
+                logger.error(f"Failed to invite friends: {response.status} - {response_text}")
+                return {summoner_id: False for summoner_id in summoner_ids}
+            invitations = await response.json(content_type=None)
+        # The client echoes one invitation per recipient, state Error marks the ones it refused
+        states = {invitation.get('toSummonerId'): invitation.get('state')
+                  for invitation in invitations if isinstance(invitation, dict)} if isinstance(invitations, list) else {}
+        return {summoner_id: states.get(summoner_id) != 'Error' for summoner_id in summoner_ids}
+
+    async def invite_friend(self, friend_id: int, index: int) -> Dict[str, Any]:
         try:
-            payload = [{"toSummonerId": friend_id}]
-            url = f"https://127.0.0.1:{self.cache.client_credentials.get('port')}/lol-lobby/v2/lobby/invitations"
-            async with session.post(url, ssl=self.ssl,
-                                    auth=aiohttp.BasicAuth('riot', self.cache.client_credentials.get('password')),
-                                    json=payload) as response:
-                if response.status == 200:
-                    return {"message": "Invitation sent successfully", "index": index, "status": "success"}
-                else:
-                    response_text = await response.text()
-                    logger.error(f"Failed to invite friend: {response.status} - {response_text}")
-                    return {"message": "Failed to invite: SETUP A LOBBY FIRST", "index": index, "status": "error"}
+            if (await self.invite_friends(summoner_ids=[friend_id])).get(friend_id):
+                return {"message": "Invitation sent successfully", "index": index, "status": "success"}
+            return {"message": "Failed to invite: SETUP A LOBBY FIRST", "index": index, "status": "error"}
         except Exception as e:
             logger.error(f"An error occurred while trying to invite friend: {str(e)}")
             return {"message": "An error occurred", "index": index, "status": "error"}
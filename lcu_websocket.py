@@ -1,30 +1,133 @@
-from websockets import connect
+from websockets import connect, exceptions
+from typing import Awaitable, Callable, Optional
+from event_pipeline import EventPipeline
+from recording import FrameRecorder
+import asyncio
 import logging
+import random
 import base64
 import json
+import time
 
 logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
 
 MAX_SIZE = 1024 * 1024 * 10  # 10 MB
+PING_INTERVAL = 15  # Seconds between keep-alive pings
+PING_TIMEOUT = 10  # Seconds without a pong before the connection is considered dead
+BACKOFF_BASE = 0.5  # Seconds, doubled on every consecutive failed attempt
+BACKOFF_CAP = 30.0
+STABLE_CONNECTION = 10.0  # Seconds a connection must stay up before the backoff resets
+MAX_OFFLINE_ATTEMPTS = 10  # Consecutive attempts without a running client before giving up
+
+
+def backoff_delay(attempt: int) -> float:
+    """Full-jitter exponential backoff: uniform in [0, min(cap, base * 2^attempt)]."""
+    return random.uniform(0, min(BACKOFF_CAP, BACKOFF_BASE * 2 ** attempt))
 
 
 class WebSocketManager:
-    def __init__(self, cache, lcu_calls, ssl, observer_manager, message_handler):
+    def __init__(self, cache, lcu_calls, ssl, observer_manager, message_handler,
+                 pipeline: Optional[EventPipeline] = None, recorder: Optional[FrameRecorder] = None):
         self.cache = cache
         self.ssl = ssl
         self.lcu_calls = lcu_calls
         self.observer_manager = observer_manager
         self.message_handler = message_handler
+        # Decouples socket reads from handler work, see EventPipeline.stats() for depth, drops and lag
+        self.pipeline = pipeline or EventPipeline(handler=message_handler.handle_message)
+        self.recorder = recorder  # Raw frames for offline replay, see recording.replay
+        self.websocket = None
+        self._subscribed = set()
 
-    async def start_websocket(self):
-        while True:
-            credentials = self.cache.get_client_credentials()
-            uri = f"wss://127.0.0.1:{credentials['port']}"
-            headers = [("Authorization",
-                        'Basic ' + base64.b64encode(('riot:' + credentials['password']).encode()).decode())]
-            async with connect(uri, extra_headers=headers, ssl=self.ssl,
-                               max_size=MAX_SIZE) as websocket:
-                logging.info("WebSocket connection established.")
-                await websocket.send(json.dumps([5, "OnJsonApiEvent"]))
+    async def sync_subscriptions(self) -> None:
+        """Subscribe to the events of every registered route and unsubscribe from the ones no longer routed."""
+        if self.websocket is None:
+            return
+        wanted = set(self.message_handler.subscriptions())
+        for event in sorted(wanted - self._subscribed):
+            await self.websocket.send(json.dumps([5, event]))
+        for event in sorted(self._subscribed - wanted):
+            await self.websocket.send(json.dumps([6, event]))
+        self._subscribed = wanted
+        logging.info(f"Subscribed to {len(wanted)} LCU events.")
+
+    async def _run_connection(self, on_subscribed: Optional[Callable[[], Awaitable[None]]] = None) -> None:
+        """
+        Connect with the cached credentials and dispatch frames until the connection closes. `on_subscribed`
+        runs as a task once the subscriptions are in place and is cancelled if the connection drops first.
+        """
+        credentials = self.cache.get_client_credentials()
+        uri = f"wss://127.0.0.1:{credentials['port']}"
+        headers = [("Authorization",
+                    'Basic ' + base64.b64encode(('riot:' + credentials['password']).encode()).decode())]
+        async with connect(uri, extra_headers=headers, ssl=self.ssl, max_size=MAX_SIZE,
+                           ping_interval=PING_INTERVAL, ping_timeout=PING_TIMEOUT) as websocket:
+            logging.info("WebSocket connection established.")
+            self.websocket = websocket
+            self._subscribed = set()
+            task = None
+            try:
+                await self.sync_subscriptions()
+                if on_subscribed is not None:
+                    task = asyncio.ensure_future(on_subscribed())
                 async for message in websocket:
-                    await self.message_handler.handle_message(message)
+                    if self.recorder is not None:
+                        self.recorder.record(message)
+                    self.pipeline.put(message)
+            finally:
+                self.websocket = None
+                if task is not None and not task.done():
+                    task.cancel()
+
+    async def start_websocket(self, rediscover: Optional[Callable[[], Awaitable[bool]]] = None) -> None:
+        """
+        Supervise the WebSocket connection: reconnect with jittered exponential backoff, rediscover the
+        client credentials before every reconnect and resync the event-driven cache keys afterwards.
+        Returns once the client could not be found for MAX_OFFLINE_ATTEMPTS consecutive attempts.
+
+        Args:
+            rediscover (Callable): Coroutine function refreshing the cached credentials, returning False
+                when no client is running (LCUManager.fetch_credentials).
+        """
+        self.pipeline.start()
+        try:
+            await self._supervise(rediscover)
+        finally:
+            await self.pipeline.stop()
+            if self.recorder is not None:
+                await self.recorder.flush()
+
+    async def _supervise(self, rediscover: Optional[Callable[[], Awaitable[bool]]]) -> None:
+        attempt = 0
+        offline_attempts = 0
+        reconnecting = False
+        while True:
+            if reconnecting:
+                previous = dict(self.cache.get_client_credentials())
+                if rediscover is not None and not await rediscover():
+                    offline_attempts += 1
+                    if offline_attempts >= MAX_OFFLINE_ATTEMPTS:
+                        logging.error("League client not found, stopping WebSocket supervisor.")
+                        return
+                    attempt += 1
+                    await asyncio.sleep(backoff_delay(attempt))
+                    continue
+                offline_attempts = 0
+                if previous != self.cache.get_client_credentials():
+                    logging.info("League client restarted with new credentials.")
+
+            # Events missed while disconnected are recovered once the new connection is subscribed
+            started_at = time.monotonic()
+            try:
+                await self._run_connection(on_subscribed=self.lcu_calls.resync if reconnecting else None)
+                logging.warning("WebSocket connection closed by the client.")
+            except (exceptions.WebSocketException, OSError, asyncio.TimeoutError) as e:
+                logging.warning(f"WebSocket connection failed: {e}")
+
+            if time.monotonic() - started_at >= STABLE_CONNECTION:
+                attempt = 0
+            attempt += 1
+            reconnecting = True
+            delay = backoff_delay(attempt)
+            logging.info(f"Reconnecting WebSocket in {delay:.1f}s (attempt {attempt}).")
+            await asyncio.sleep(delay)
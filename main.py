@@ -1,31 +1,105 @@
+from startup import STARTUP  # First, so the report covers every import below
+import os
 import ssl
-from actionControl import ActionController
+from concurrent.futures import Future
+from functools import cached_property
 from cache import Cache
-from client_manager import ClientManager
-from lcu_api import LCUDataRetriever
-from lcu_websocket import WebSocketManager
+from friends_store import FriendsStore
 from message_handler import MessageHandler
+from metrics import MetricsExporter
 from observer import ObserverManager
+from recording import FrameRecorder
+from request_cache import ResponseCache
+from runtime import get_runtime
+from snapshot import CacheSnapshotter
+
+STARTUP.record('import:core', 0.0)
 
 
 class App:
-    def __init__(self):
+    """
+    The cheap, UI-facing parts are built right away. Components pulling in aiohttp, websockets or
+    psutil are imported and built on first use, which start() does on the runtime loop thread so the
+    window can be shown first. The startup report (self.startup) breaks down imports, discovery and
+    each fetch, with the first_paint milestone marking the summoner header.
+    """
 
+    def __init__(self, staged: bool = True, image_decoder=None):
+        """
+        Args:
+            staged (bool): Show the main menu as soon as the summoner landed, see ClientManager.
+            image_decoder (Callable): Decoder of the asset service, assets.qt_image_decoder() for the Qt UI.
+        """
+        self.startup = STARTUP
+        self.staged = staged
+        self.image_decoder = image_decoder
         self.cert_path = "riotgames.pem"
-        self.ssl_context = ssl.SSLContext(ssl.PROTOCOL_TLS_CLIENT)
 
         self.observer = ObserverManager()
         self.cache = Cache(observer_manager=self.observer)
-        self.message_handler = MessageHandler(observer_manager=self.observer, cache=self.cache)
-        self.lcu_calls = LCUDataRetriever(cache=self.cache, ssl=self.ssl_context)
-        self.lcu = WebSocketManager(cache=self.cache, ssl=self.ssl_context, lcu_calls=self.lcu_calls,
-                                    observer_manager=self.observer, message_handler=self.message_handler)
-        self.action_controller = ActionController(observer_manager=self.observer, api_client_calls=self.lcu_calls)
-        self.client_manager = ClientManager(observer_manager=self.observer, cache=self.cache, lcu_calls=self.lcu_calls,
-                                            websocket_manager=self.lcu)
-    pass
+        self.response_cache = ResponseCache()
+        self.friends = FriendsStore(cache=self.cache, observer_manager=self.observer)
+        self.message_handler = MessageHandler(observer_manager=self.observer, cache=self.cache,
+                                              response_cache=self.response_cache, friends=self.friends)
+        self.snapshots = CacheSnapshotter(cache=self.cache, observer_manager=self.observer)  # Read by check_client_status
+        self.runtime = get_runtime()
+        self.startup.mark('app_ready')
+
+    @cached_property
+    def ssl_context(self) -> ssl.SSLContext:
+        return ssl.SSLContext(ssl.PROTOCOL_TLS_CLIENT)
+
+    @cached_property
+    def lcu_calls(self):
+        lcu_api = self.startup.lazy_import('lcu_api')
+        return lcu_api.LCUDataRetriever(cache=self.cache, ssl=self.ssl_context, response_cache=self.response_cache,
+                                        friends=self.friends)
+
+    @cached_property
+    def lcu(self):
+        lcu_websocket = self.startup.lazy_import('lcu_websocket')
+        # Set INTEL_PANEL_RECORD to a file path to record the raw WebSocket traffic for replay
+        record_path = os.environ.get('INTEL_PANEL_RECORD')
+        return lcu_websocket.WebSocketManager(cache=self.cache, ssl=self.ssl_context, lcu_calls=self.lcu_calls,
+                                              observer_manager=self.observer, message_handler=self.message_handler,
+                                              recorder=FrameRecorder(record_path) if record_path else None)
+
+    @cached_property
+    def action_controller(self):
+        action_control = self.startup.lazy_import('actionControl')
+        return action_control.ActionController(observer_manager=self.observer, api_client_calls=self.lcu_calls,
+                                               runtime=self.runtime)
+
+    @cached_property
+    def assets(self):
+        assets = self.startup.lazy_import('assets')
+        decoder = self.image_decoder or assets.raw_decoder
+        return assets.AssetService(cache=self.cache, observer_manager=self.observer, ddragon=self.lcu_calls.ddragon,
+                                   session=self.lcu_calls.web_session, decoder=decoder, loop=self.runtime.loop)
+
+    @cached_property
+    def client_manager(self):
+        client_manager = self.startup.lazy_import('client_manager')
+        # INTEL_PANEL_METRICS_FILE / INTEL_PANEL_METRICS_PORT export the metrics registry, see metrics.py
+        return client_manager.ClientManager(observer_manager=self.observer, cache=self.cache, lcu_calls=self.lcu_calls,
+                                            websocket_manager=self.lcu, metrics_exporter=MetricsExporter.from_env(),
+                                            startup=self.startup, staged=self.staged, snapshots=self.snapshots)
+
+    def start(self) -> Future:
+        """Run the back end on the runtime loop thread, safe to call from the GUI thread."""
+        return self.runtime.submit(self._start())
 
+    async def _start(self) -> None:
+        client_manager = self.client_manager  # Heavy imports happen here, off the GUI thread
+        action_controller = self.action_controller  # Built before the UI forwards its first click
+        assets = self.assets  # Observes data_ready, so it must exist before the data arrives
+        try:
+            await client_manager.watch_client()  # Until stop(), following client restarts
+        finally:
+            await assets.close()  # Writes the disk index of the images downloaded this session
 
+    def stop(self) -> None:
+        self.runtime.stop()
 
 
 if __name__ == '__main__':
@@ -0,0 +1,211 @@
+import asyncio
+import json
+import logging
+import os
+import sqlite3
+from threading import Lock
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+import aiohttp
+from paths import APP_DATA_DIR
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_DB_PATH = os.path.join(APP_DATA_DIR, "match_history.sqlite3")
+PAGE_SIZE = 20
+MAX_PAGES = 5  # Per sync, for the games played since the last one
+BACKFILL_PAGES = 5  # Per sync, for older games not stored yet; the backfill resumes there on the next sync
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS matches (
+    puuid TEXT NOT NULL,
+    game_id INTEGER NOT NULL,
+    game_creation INTEGER NOT NULL,
+    queue_id INTEGER,
+    payload TEXT NOT NULL,
+    PRIMARY KEY (puuid, game_id)
+);
+CREATE INDEX IF NOT EXISTS matches_by_creation ON matches (puuid, game_creation DESC);
+CREATE TABLE IF NOT EXISTS backfill (
+    puuid TEXT PRIMARY KEY,
+    next_index INTEGER NOT NULL,
+    complete INTEGER NOT NULL
+);
+"""
+
+
+class MatchStore:
+    """SQLite store of raw match-history games per puuid. Blocking, use it through MatchHistorySync."""
+
+    def __init__(self, path: str = DEFAULT_DB_PATH):
+        self.path = path
+        self._connection: Optional[sqlite3.Connection] = None
+        self._lock = Lock()
+
+    def _connect(self) -> sqlite3.Connection:
+        if self._connection is None:
+            if self.path != ':memory:':
+                os.makedirs(os.path.dirname(self.path) or '.', exist_ok=True)
+            self._connection = sqlite3.connect(self.path, check_same_thread=False)
+            self._connection.execute("PRAGMA journal_mode=WAL")
+            self._connection.executescript(SCHEMA)
+        return self._connection
+
+    def newest(self, puuid: str) -> Optional[Tuple[int, int]]:
+        """(game_id, game_creation) of the newest stored game, None for an empty history."""
+        with self._lock:
+            row = self._connect().execute(
+                "SELECT game_id, game_creation FROM matches WHERE puuid = ? ORDER BY game_creation DESC LIMIT 1",
+                (puuid,)).fetchone()
+        return tuple(row) if row else None
+
+    def backfill(self, puuid: str) -> Optional[Tuple[int, bool]]:
+        """
+        (next_index, complete) of the backfill: the games at LCU indexes below next_index, as of the last
+        sync, are all stored, and complete once the end of the history was reached. None before any sync.
+        """
+        with self._lock:
+            row = self._connect().execute("SELECT next_index, complete FROM backfill WHERE puuid = ?",
+                                          (puuid,)).fetchone()
+        return (row[0], bool(row[1])) if row else None
+
+    def add(self, puuid: str, games: List[Dict[str, Any]],
+            backfill: Optional[Tuple[int, bool]] = None) -> List[Dict[str, Any]]:
+        """
+        Store `games`, returns those that were not stored yet.
+
+        Args:
+            backfill (Tuple[int, bool]): (next_index, complete) saved in the same transaction, so the
+                cursor never runs ahead of the stored games.
+        """
+        added = []
+        with self._lock:
+            connection = self._connect()
+            with connection:
+                for game in games:
+                    cursor = connection.execute(
+                        "INSERT OR IGNORE INTO matches VALUES (?, ?, ?, ?, ?)",
+                        (puuid, game['gameId'], game.get('gameCreation', 0), game.get('queueId'), json.dumps(game)))
+                    if cursor.rowcount:
+                        added.append(game)
+                if backfill is not None:
+                    next_index, complete = backfill
+                    connection.execute("INSERT OR REPLACE INTO backfill VALUES (?, ?, ?)",
+                                       (puuid, next_index, int(complete)))
+        return added
+
+    def recent(self, puuid: str, limit: int) -> List[Dict[str, Any]]:
+        return self._select("WHERE puuid = ? ORDER BY game_creation DESC LIMIT ?", (puuid, limit))
+
+    def since(self, puuid: str, timestamp_ms: int, limit: int = -1) -> List[Dict[str, Any]]:
+        return self._select("WHERE puuid = ? AND game_creation >= ? ORDER BY game_creation DESC LIMIT ?",
+                            (puuid, timestamp_ms, limit))
+
+    def count(self, puuid: str) -> int:
+        with self._lock:
+            return self._connect().execute("SELECT COUNT(*) FROM matches WHERE puuid = ?", (puuid,)).fetchone()[0]
+
+    def _select(self, clause: str, params: Tuple) -> List[Dict[str, Any]]:
+        with self._lock:
+            rows = self._connect().execute(f"SELECT payload FROM matches {clause}", params).fetchall()
+        return [json.loads(payload) for payload, in rows]
+
+    def close(self) -> None:
+        with self._lock:
+            if self._connection is not None:
+                self._connection.close()
+                self._connection = None
+
+
+class MatchHistorySync:
+    """
+    Incremental match-history sync: pages the LCU history newest first and stops at the newest game
+    already in the store, so a refresh costs one page per PAGE_SIZE new games. Older games are backfilled
+    a few pages per sync from a cursor kept in the store, until the end of the history is reached.
+    """
+
+    def __init__(self, store: Optional[MatchStore] = None, page_size: int = PAGE_SIZE, max_pages: int = MAX_PAGES,
+                 backfill_pages: int = BACKFILL_PAGES):
+        self.store = store or MatchStore()
+        self.page_size = page_size
+        self.max_pages = max_pages
+        self.backfill_pages = backfill_pages
+        self._listeners: List[Callable[[str, List[Dict[str, Any]]], None]] = []
+
+    def add_listener(self, listener: Callable[[str, List[Dict[str, Any]]], None]) -> None:
+        """Call `listener(puuid, games)` with the newly stored games after every sync that found some."""
+        self._listeners.append(listener)
+
+    async def _run(self, func: Callable, *args: Any) -> Any:
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(None, func, *args)
+
+    async def _fetch_page(self, session: aiohttp.ClientSession, puuid: str, begin: int) -> List[Dict[str, Any]]:
+        url = f"/lol-match-history/v1/products/lol/{puuid}/matches"
+        params = {"begIndex": begin, "endIndex": begin + self.page_size}
+        async with session.get(url, params=params) as response:
+            if response.status != 200:
+                raise ValueError(f"Unexpected response status: {response.status}")
+            match_data = await response.json()
+        games = match_data['games']['games']
+        return sorted(games, key=lambda game: game.get('gameCreation', 0), reverse=True)
+
+    async def sync(self, session: aiohttp.ClientSession, puuid: str) -> int:
+        """
+        Fetch and store the games played since the last sync, then continue the backfill of older ones.
+        Returns how many games were new.
+        """
+        newest = await self._run(self.store.newest, puuid)
+        backfill = await self._run(self.store.backfill, puuid)
+        new_games: List[Dict[str, Any]] = []
+        begin = 0
+        reached_stored = end_of_history = False
+        for _ in range(self.max_pages):
+            page = await self._fetch_page(session, puuid, begin)
+            for game in page:
+                if newest and (game['gameId'] == newest[0] or game.get('gameCreation', 0) < newest[1]):
+                    reached_stored = True
+                    break
+                new_games.append(game)
+            if reached_stored or len(page) < self.page_size:
+                end_of_history = not reached_stored
+                break
+            begin += len(page)
+
+        if reached_stored:
+            # The new games pushed the backfill position down. Without a cursor (a store synced before
+            # there was one) the backfill starts at the newest stored game and re-reads the rest once.
+            next_index, complete = backfill or (0, False)
+            backfill = (next_index + len(new_games), complete)
+        else:
+            # A first sync, or more new games than max_pages hold: backfill below them, over the gap
+            backfill = (len(new_games), end_of_history)
+        added = await self._run(self.store.add, puuid, new_games, backfill)
+        try:
+            added += await self._backfill(session, puuid, *backfill)
+        except Exception as e:
+            logger.warning(f"Match history backfill stopped, it resumes on the next sync: {e}")
+
+        logger.info(f"Match history sync stored {len(added)} new games.")
+        if added:
+            for listener in self._listeners:
+                listener(puuid, added)
+        return len(added)
+
+    async def _backfill(self, session: aiohttp.ClientSession, puuid: str, next_index: int,
+                        complete: bool) -> List[Dict[str, Any]]:
+        added: List[Dict[str, Any]] = []
+        for _ in range(self.backfill_pages):
+            if complete:
+                break
+            page = await self._fetch_page(session, puuid, next_index)
+            next_index += len(page)
+            complete = len(page) < self.page_size
+            added += await self._run(self.store.add, puuid, page, (next_index, complete))
+        return added
+
+    async def recent(self, puuid: str, limit: int) -> List[Dict[str, Any]]:
+        return await self._run(self.store.recent, puuid, limit)
+
+    async def since(self, puuid: str, timestamp_ms: int, limit: int = -1) -> List[Dict[str, Any]]:
+        return await self._run(self.store.since, puuid, timestamp_ms, limit)
@@ -0,0 +1,182 @@
+import logging
+from array import array
+from typing import Any, Dict, Iterable, List, NamedTuple, Optional, Tuple
+
+from queues import get_game_mode_from_queue
+
+try:
+    import numpy
+except ImportError:  # Optional, grouped aggregates fall back to a single pure-Python pass
+    numpy = None
+
+logger = logging.getLogger(__name__)
+
+# Column name -> array typecode
+COLUMNS = {
+    'game_id': 'q',
+    'timestamp': 'q',  # gameCreation, ms since epoch
+    'duration': 'l',  # Seconds
+    'queue_id': 'l',
+    'champion_id': 'l',
+    'opponent_id': 'l',  # Lane opponent champion, 0 when the lane could not be matched
+    'win': 'b',
+    'kills': 'l',
+    'deaths': 'l',
+    'assists': 'l',
+    'cs': 'l',
+}
+
+
+class Aggregate(NamedTuple):
+    games: int
+    wins: int
+    takedowns: int  # Kills + assists
+    deaths: int
+
+    @property
+    def kda(self) -> float:
+        return round(self.takedowns / max(self.deaths, 1), 2)
+
+    @property
+    def winrate(self) -> float:
+        return round(self.wins / self.games * 100, 2) if self.games else 0.00
+
+
+class MatchStats:
+    """
+    Per-match stats of one player kept in typed columns (array.array), one row per game. Aggregates are
+    single passes over the columns, with numpy used for the grouping when it is installed.
+    """
+
+    def __init__(self, puuid: Optional[str] = None, summoner_id: Optional[int] = None):
+        self.puuid = puuid
+        self.summoner_id = summoner_id
+        self.columns: Dict[str, array] = {name: array(typecode) for name, typecode in COLUMNS.items()}
+        self._game_ids = set()
+
+    def __len__(self) -> int:
+        return len(self.columns['game_id'])
+
+    def _find_participant(self, game: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+        participant_id = None
+        for identity in game.get('participantIdentities', ()):
+            player = identity.get('player', {})
+            if (self.puuid and player.get('puuid') == self.puuid) or \
+                    (self.summoner_id and player.get('summonerId') == self.summoner_id):
+                participant_id = identity['participantId']
+                break
+        if participant_id is None:
+            return None
+        return next((p for p in game.get('participants', ()) if p.get('participantId') == participant_id), None)
+
+    @staticmethod
+    def _lane_opponent(game: Dict[str, Any], participant: Dict[str, Any]) -> int:
+        timeline = participant.get('timeline', {})
+        position = (timeline.get('lane'), timeline.get('role'))
+        for other in game.get('participants', ()):
+            other_timeline = other.get('timeline', {})
+            if other.get('teamId') != participant.get('teamId') and \
+                    (other_timeline.get('lane'), other_timeline.get('role')) == position:
+                return other.get('championId', 0)
+        return 0
+
+    def add_game(self, game: Dict[str, Any]) -> bool:
+        """Append one raw match-history game, False if it is known already or the player is not in it."""
+        game_id = game.get('gameId')
+        if game_id is None or game_id in self._game_ids:
+            return False
+        participant = self._find_participant(game)
+        if participant is None:
+            return False
+        stats = participant.get('stats', {})
+        row = {
+            'game_id': game_id,
+            'timestamp': game.get('gameCreation', 0),
+            'duration': game.get('gameDuration', 0),
+            'queue_id': game.get('queueId', -1),
+            'champion_id': participant.get('championId', 0),
+            'opponent_id': self._lane_opponent(game, participant),
+            'win': 1 if stats.get('win') else 0,
+            'kills': stats.get('kills', 0),
+            'deaths': stats.get('deaths', 0),
+            'assists': stats.get('assists', 0),
+            'cs': stats.get('totalMinionsKilled', 0) + stats.get('neutralMinionsKilled', 0),
+        }
+        for name, column in self.columns.items():
+            column.append(row[name])
+        self._game_ids.add(game_id)
+        return True
+
+    def extend(self, games: Iterable[Dict[str, Any]]) -> int:
+        return sum(1 for game in games if self.add_game(game))
+
+    # Aggregates
+    def _group(self, key: str) -> Dict[int, Aggregate]:
+        keys, wins = self.columns[key], self.columns['win']
+        kills, deaths, assists = self.columns['kills'], self.columns['deaths'], self.columns['assists']
+        if numpy is not None and len(keys):
+            key_values = numpy.frombuffer(keys, dtype=keys.typecode)
+            unique, inverse = numpy.unique(key_values, return_inverse=True)
+            games = numpy.bincount(inverse)
+            won = numpy.bincount(inverse, weights=numpy.frombuffer(wins, dtype='b'))
+            takedowns = numpy.bincount(inverse, weights=numpy.frombuffer(kills, dtype=kills.typecode)) + \
+                numpy.bincount(inverse, weights=numpy.frombuffer(assists, dtype=assists.typecode))
+            died = numpy.bincount(inverse, weights=numpy.frombuffer(deaths, dtype=deaths.typecode))
+            return {int(k): Aggregate(int(g), int(w), int(t), int(d))
+                    for k, g, w, t, d in zip(unique, games, won, takedowns, died)}
+
+        totals: Dict[int, List[int]] = {}
+        for k, w, kl, d, a in zip(keys, wins, kills, deaths, assists):
+            total = totals.get(k)
+            if total is None:
+                total = totals[k] = [0, 0, 0, 0]
+            total[0] += 1
+            total[1] += w
+            total[2] += kl + a
+            total[3] += d
+        return {k: Aggregate(*total) for k, total in totals.items()}
+
+    def winrate_by_queue(self) -> Dict[str, Aggregate]:
+        """Aggregates keyed by queue name; queues sharing a name in QUEUE_MAPPING are merged."""
+        merged: Dict[str, Aggregate] = {}
+        for queue_id, aggregate in self._group('queue_id').items():
+            name = get_game_mode_from_queue(queue_id)
+            previous = merged.get(name)
+            if previous:
+                aggregate = Aggregate(*(a + b for a, b in zip(previous, aggregate)))
+            merged[name] = aggregate
+        return merged
+
+    def winrate_by_champion(self) -> Dict[int, Aggregate]:
+        return self._group('champion_id')
+
+    def rolling_form(self, window: int = 10) -> List[float]:
+        """Win rate (percent) over the last `window` games at every game, oldest first."""
+        order = sorted(range(len(self)), key=self.columns['timestamp'].__getitem__)
+        wins = self.columns['win']
+        form, running = [], 0
+        for position, index in enumerate(order):
+            running += wins[index]
+            if position >= window:
+                running -= wins[order[position - window]]
+            form.append(round(running / min(position + 1, window) * 100, 2))
+        return form
+
+    def matchups(self, min_games: int = 3, limit: int = 5) -> Tuple[List[Tuple[int, Aggregate]], List[Tuple[int, Aggregate]]]:
+        """(best, worst) lane opponents by win rate, each a list of (opponent champion id, Aggregate)."""
+        grouped = [(opponent, aggregate) for opponent, aggregate in self._group('opponent_id').items()
+                   if opponent and aggregate.games >= min_games]
+        grouped.sort(key=lambda item: (item[1].winrate, item[1].games), reverse=True)
+        return grouped[:limit], list(reversed(grouped[-limit:]))
+
+    def averages(self) -> Dict[str, float]:
+        games = len(self)
+        if not games:
+            return {}
+        minutes = max(sum(self.columns['duration']) / 60, 1)
+        return {
+            'winrate': round(sum(self.columns['win']) / games * 100, 2),
+            'kda': round((sum(self.columns['kills']) + sum(self.columns['assists'])) /
+                         max(sum(self.columns['deaths']), 1), 2),
+            'cs_per_minute': round(sum(self.columns['cs']) / minutes, 2),
+        }
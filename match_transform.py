@@ -0,0 +1,48 @@
+from typing import Any, Dict, Iterable, Iterator, List, Optional
+
+from queues import get_game_mode_from_queue
+
+
+def _find_participant(game: Dict[str, Any], summoner_id: Any) -> Optional[Dict[str, Any]]:
+    # One early-exit pass over identities and one over participants, no intermediate structures
+    for identity in game.get('participantIdentities', ()):
+        if identity['player']['summonerId'] == summoner_id:
+            participant_id = identity['participantId']
+            break
+    else:
+        return None
+    for participant in game.get('participants', ()):
+        if participant['participantId'] == participant_id:
+            return participant
+    return None
+
+
+def _win_loss(game: Dict[str, Any], participant: Optional[Dict[str, Any]]) -> Optional[str]:
+    team_id = participant.get('teamId') if participant else None
+    if team_id is None:
+        return None
+    for team in game.get('teams', ()):
+        if team['teamId'] == team_id:
+            return 'Victory' if team.get('win') == 'Win' else 'Defeat'
+    return 'Defeat'
+
+
+def annotate_matches(games: Iterable[Dict[str, Any]], summoner_id: Any) -> Iterator[Dict[str, Any]]:
+    """
+    Stream the games with `gameMode` and `winLoss` added, the shape the UI renders. Every game is a shallow
+    copy: the raw game is left untouched and its participants, teams and stats are shared, not copied.
+    """
+    for game in games:
+        game = dict(game)
+        queue_id = game.get('queueId', None)
+        if queue_id is not None:
+            game['gameMode'] = get_game_mode_from_queue(queue_id)
+        win_loss = _win_loss(game, _find_participant(game, summoner_id))
+        if win_loss is not None:
+            game['winLoss'] = win_loss
+        yield game
+
+
+def transform_matches(games: Iterable[Dict[str, Any]], summoner_id: Any) -> List[Dict[str, Any]]:
+    """Batch form of annotate_matches."""
+    return list(annotate_matches(games, summoner_id))
@@ -1,43 +1,96 @@
 import logging
-import json
-from typing import Any, Dict, Optional
+import asyncio
+import inspect
+import time
+from functools import partial
+from typing import Any, Callable, Dict, List, Optional
+from ddragon import build_profile_icon_url
+from fastjson import JSONDecodeError, loads, peek_event
+from metrics import EVENT_HANDLING_SECONDS, endpoint_label
+from routing import RouteTable, collect_routes, route
 
 logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
 
+EVENT_OPCODE = 8
+DECODE_OFFLOAD_SIZE = 256 * 1024  # Frames at least this large are decoded in the default executor
+
 
 class MessageHandler:
-    def __init__(self, cache, observer_manager):
+    def __init__(self, cache, observer_manager, response_cache=None, friends=None):
         self.cache = cache
         self.observer_manager = observer_manager
+        self.routes = RouteTable()
+        # Stores with @route handlers of their own (friends_store.FriendsStore) are routed like local ones
+        for owner in (self, friends):
+            if owner is None:
+                continue
+            for uri, prefix, handler in collect_routes(owner):
+                self.routes.add(uri, handler, prefix=prefix)
+        # Events under a cached endpoint invalidate its cached GET responses, whether or not a route handles them
+        self.invalidations = RouteTable()
+        if response_cache is not None:
+            for prefix in response_cache.prefixes():
+                self.invalidations.add(prefix, partial(response_cache.invalidate, prefix), prefix=True)
+
+    def register_route(self, uri: str, handler: Callable, prefix: bool = False) -> None:
+        """Register an extra handler at runtime, call WebSocketManager.sync_subscriptions afterwards."""
+        self.routes.add(uri, handler, prefix=prefix)
+
+    def unregister_route(self, uri: str, prefix: bool = False) -> None:
+        self.routes.remove(uri, prefix=prefix)
+
+    def subscriptions(self) -> List[str]:
+        return sorted(set(self.routes.events()) | set(self.invalidations.events()))
+
+    def wants_frame(self, message: str) -> bool:
+        """Cheap pre-filter on the raw frame, False only when it is certain no route handles it."""
+        opcode, uri = peek_event(message)
+        if opcode is not None and opcode != EVENT_OPCODE:
+            return False
+        return uri is None or self.routes.match(uri) is not None or self.invalidations.match(uri) is not None
 
     async def handle_message(self, message: str) -> Optional[None]:
         if not message:
             logging.warning("Received an empty message.")
             return None
 
+        if isinstance(message, str) and not self.wants_frame(message):
+            return None
+
+        started = time.perf_counter()
+        uri = None
         try:
-            data = json.loads(message)
+            if len(message) >= DECODE_OFFLOAD_SIZE:
+                data = await asyncio.get_running_loop().run_in_executor(None, loads, message)
+            else:
+                data = loads(message)
             opcode = data[0]
             event_data = data[2] if len(data) > 2 else None
 
-            if opcode == 8 and event_data:  # Event message
+            if opcode == EVENT_OPCODE and event_data:  # Event message
                 uri = event_data.get("uri", "")
-                if uri == "/lol-summoner/v1/current-summoner":
-                    self.handle_summoner_update(event_data)
-                elif uri == "/lol-ranked/v1/current-ranked-stats":
-                    self.handle_ranked_stats(event_data)
-                elif uri.startswith("/lol-collections/v1/inventories/local-player/champion-mastery-score"):
-                    self.handle_champion_mastery(event_data)
-
-        except json.JSONDecodeError as e:
+                invalidate = self.invalidations.match(uri)
+                if invalidate is not None:
+                    invalidate(event_data)
+                handler = self.routes.match(uri)
+                if handler is not None:
+                    result = handler(event_data)
+                    if inspect.isawaitable(result):
+                        await result
+
+        except JSONDecodeError as e:
             logging.error(f"Failed to decode JSON from message: {message}. Error: {e}")
         except Exception as e:
             logging.error(f"Unexpected error in handle_message: {e}", exc_info=True)
+        finally:
+            EVENT_HANDLING_SECONDS.observe(time.perf_counter() - started, endpoint_label(uri) if uri else 'unknown')
 
+    @route("/lol-summoner/v1/current-summoner")
     def handle_summoner_update(self, event_data: Dict[str, Any]) -> None:
         try:
             summoner_info = event_data['data']
-            profile_icon_url = f"https://ddragon.leagueoflegends.com/cdn/14.8.1/img/profileicon/{summoner_info.get('profileIconId', '')}.png"
+            profile_icon_url = build_profile_icon_url(summoner_info.get('profileIconId', ''),
+                                                      version=self.cache.get('ddragon_version'))
 
             summoner_data = {
                 "accountId": summoner_info.get("accountId", ""),
@@ -54,6 +107,7 @@ class MessageHandler:
         except Exception as e:
             logging.error(f"Unexpected error in handle_summoner_update: {e}", exc_info=True)
 
+    @route("/lol-ranked/v1/current-ranked-stats")
     def handle_ranked_stats(self, event_data: Dict[str, Any]) -> None:
         try:
             self.cache.update("current_ranked_stats", event_data)
@@ -61,6 +115,7 @@ class MessageHandler:
         except Exception as e:
             logging.error(f"Unexpected error in handle_ranked_stats: {e}", exc_info=True)
 
+    @route("/lol-collections/v1/inventories/local-player/champion-mastery-score", prefix=True)
     def handle_champion_mastery(self, event_data: Dict[str, Any]) -> None:
         try:
             self.cache.update("summoner_mastery", event_data[:3])  # Limit to first 3 entries
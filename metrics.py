@@ -0,0 +1,373 @@
+import asyncio
+import logging
+import os
+import re
+import threading
+import time
+from abc import ABC, abstractmethod
+from bisect import bisect_left
+from functools import lru_cache
+from typing import TYPE_CHECKING, Any, Dict, Iterable, List, Optional, Sequence, Tuple
+
+if TYPE_CHECKING:
+    import aiohttp  # Imported on use: Cache and the handlers import this module at startup
+    from aiohttp import web
+
+logger = logging.getLogger(__name__)
+
+# Upper bounds in seconds, roughly x2.5 apart from 10us to 10s
+LATENCY_BUCKETS = (0.00001, 0.000025, 0.00005, 0.0001, 0.00025, 0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025,
+                   0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+EXPORT_INTERVAL = 15.0  # Seconds between Prometheus text file rewrites
+ID_SEGMENT_RE = re.compile(r'^(?!v\d+$).*\d')  # Path segments carrying ids, versions or puuids (but not v1)
+
+_enabled = True
+
+
+def set_enabled(enabled: bool) -> None:
+    """Turn recording on or off process-wide, recorded values are kept."""
+    global _enabled
+    _enabled = enabled
+
+
+def is_enabled() -> bool:
+    return _enabled
+
+
+@lru_cache(maxsize=4096)
+def endpoint_label(path: str) -> str:
+    """Collapse id-like path segments so per-endpoint series stay bounded, e.g. /x/v1/123/y -> /x/v1/{id}/y."""
+    return '/'.join('{id}' if ID_SEGMENT_RE.match(segment) else segment for segment in path.split('/'))
+
+
+class Histogram:
+    __slots__ = ('buckets', 'counts', 'count', 'sum', '_lock')
+
+    def __init__(self, buckets: Sequence[float]):
+        self.buckets = buckets
+        self.counts = [0] * (len(buckets) + 1)  # The last slot is +Inf
+        self.count = 0
+        self.sum = 0.0
+        self._lock = threading.Lock()
+
+    def observe(self, value: float) -> None:
+        index = bisect_left(self.buckets, value)
+        with self._lock:
+            self.counts[index] += 1
+            self.count += 1
+            self.sum += value
+
+    def observe_serialized(self, value: float) -> None:
+        """observe() for callers that already serialize all updates of this histogram with a lock of their own."""
+        self.counts[bisect_left(self.buckets, value)] += 1
+        self.count += 1
+        self.sum += value
+
+    def quantile(self, q: float) -> float:
+        """Upper bound of the bucket holding the q-quantile, the last finite bound for the +Inf bucket."""
+        rank = q * self.count
+        seen = 0
+        for bound, count in zip(self.buckets, self.counts):
+            seen += count
+            if seen >= rank and seen:
+                return bound
+        return self.buckets[-1]
+
+    def summary(self) -> Dict[str, float]:
+        return {'count': self.count, 'sum': self.sum, 'mean': self.sum / self.count if self.count else 0.0,
+                'p50': self.quantile(0.5), 'p95': self.quantile(0.95), 'p99': self.quantile(0.99)}
+
+
+class _Family(ABC):
+    kind = ''
+
+    def __init__(self, name: str, documentation: str, label_names: Sequence[str] = ()):
+        self.name = name
+        self.documentation = documentation
+        self.label_names = tuple(label_names)
+        self._children: Dict[Tuple[str, ...], Any] = {}
+        self._lock = threading.Lock()
+
+    def _child(self, labels: Tuple[str, ...]):
+        child = self._children.get(labels)
+        if child is None:
+            with self._lock:
+                child = self._children.get(labels)
+                if child is None:
+                    child = self._children[labels] = self._new_child()
+        return child
+
+    @abstractmethod
+    def _new_child(self) -> Any:
+        """The per-label-set value, created on first use of a label set."""
+
+    def _label_text(self, labels: Tuple[str, ...], extra: str = '') -> str:
+        pairs = [f'{name}="{_escape(value)}"' for name, value in zip(self.label_names, labels)]
+        if extra:
+            pairs.append(extra)
+        return '{' + ','.join(pairs) + '}' if pairs else ''
+
+    def items(self) -> List[Tuple[Tuple[str, ...], Any]]:
+        with self._lock:
+            return list(self._children.items())
+
+
+class HistogramFamily(_Family):
+    kind = 'histogram'
+
+    def __init__(self, name: str, documentation: str, label_names: Sequence[str] = (),
+                 buckets: Sequence[float] = LATENCY_BUCKETS):
+        super().__init__(name, documentation, label_names)
+        self.buckets = tuple(buckets)
+
+    def _new_child(self) -> Histogram:
+        return Histogram(self.buckets)
+
+    def labels(self, *labels: str) -> Histogram:
+        return self._child(labels)
+
+    def observe(self, value: float, *labels: str) -> None:
+        if _enabled:
+            self._child(labels).observe(value)
+
+    def snapshot(self) -> Dict[str, Dict[str, float]]:
+        return {'/'.join(labels): child.summary() for labels, child in self.items()}
+
+    def render(self) -> List[str]:
+        lines = []
+        for labels, child in self.items():
+            cumulative = 0
+            for bound, count in zip(child.buckets + (float('inf'),), child.counts):
+                cumulative += count
+                le = 'le="+Inf"' if bound == float('inf') else f'le="{bound!r}"'
+                lines.append(f'{self.name}_bucket{self._label_text(labels, le)} {cumulative}')
+            lines.append(f'{self.name}_sum{self._label_text(labels)} {child.sum!r}')
+            lines.append(f'{self.name}_count{self._label_text(labels)} {child.count}')
+        return lines
+
+
+class CounterFamily(_Family):
+    kind = 'counter'
+
+    def _new_child(self) -> List[float]:
+        return [0]
+
+    def inc(self, *labels: str, amount: float = 1) -> None:
+        if _enabled:
+            child = self._child(labels)
+            with self._lock:
+                child[0] += amount
+
+    def snapshot(self) -> Dict[str, float]:
+        return {'/'.join(labels): child[0] for labels, child in self.items()}
+
+    def render(self) -> List[str]:
+        return [f'{self.name}{self._label_text(labels)} {child[0]}' for labels, child in self.items()]
+
+
+def _escape(value: str) -> str:
+    return str(value).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+
+
+class MetricsRegistry:
+    def __init__(self):
+        self._families: Dict[str, _Family] = {}
+
+    def histogram(self, name: str, documentation: str, label_names: Sequence[str] = (),
+                  buckets: Sequence[float] = LATENCY_BUCKETS) -> HistogramFamily:
+        return self._register(HistogramFamily(name, documentation, label_names, buckets))
+
+    def counter(self, name: str, documentation: str, label_names: Sequence[str] = ()) -> CounterFamily:
+        return self._register(CounterFamily(name, documentation, label_names))
+
+    def _register(self, family):
+        existing = self._families.get(family.name)
+        if existing is not None:
+            return existing
+        self._families[family.name] = family
+        return family
+
+    def families(self) -> Iterable[_Family]:
+        return self._families.values()
+
+    def snapshot(self) -> Dict[str, Any]:
+        """Current values: histograms as count/sum/mean/p50/p95/p99 per label set, counters as totals."""
+        return {family.name: family.snapshot() for family in self._families.values()}
+
+    def render_prometheus(self) -> str:
+        lines = []
+        for family in self._families.values():
+            lines.append(f'# HELP {family.name} {family.documentation}')
+            lines.append(f'# TYPE {family.name} {family.kind}')
+            lines.extend(family.render())
+        return '\n'.join(lines) + '\n'
+
+    def write_prometheus(self, path: str) -> None:
+        """Write the text format atomically, for node_exporter's textfile collector or manual inspection."""
+        temp_path = f"{path}.tmp"
+        with open(temp_path, 'w', encoding='utf-8') as file:
+            file.write(self.render_prometheus())
+        os.replace(temp_path, path)
+
+
+REGISTRY = MetricsRegistry()
+
+LCU_REQUEST_SECONDS = REGISTRY.histogram(
+    'lcu_request_seconds', 'HTTP request latency by method and endpoint.', ('method', 'endpoint'))
+LCU_RESPONSES = REGISTRY.counter(
+    'lcu_responses_total', 'HTTP responses by method, endpoint and status (error for failed requests).',
+    ('method', 'endpoint', 'status'))
+EVENT_HANDLING_SECONDS = REGISTRY.histogram(
+    'ws_event_handling_seconds', 'MessageHandler time per WebSocket event by URI.', ('uri',))
+OBSERVER_DISPATCH_SECONDS = REGISTRY.histogram(
+    'observer_dispatch_seconds', 'ObserverManager delivery time per notification key.', ('key',))
+OBSERVER_DELIVERIES = REGISTRY.counter(
+    'observer_deliveries_total', 'Observer callbacks invoked per notification key.', ('key',))
+CACHE_LOCK_WAIT_SECONDS = REGISTRY.histogram(
+    'cache_lock_wait_seconds', 'Time Cache writers waited for a shard lock.', ('shard',))
+CACHE_LOCK_HOLD_SECONDS = REGISTRY.histogram(
+    'cache_lock_hold_seconds', 'Time a Cache shard lock was held, outermost acquisition only.', ('shard',))
+ASSET_LOADS = REGISTRY.counter(
+    'asset_loads_total', 'Image asset loads by where they were served from (memory, disk, network, failed).',
+    ('source',))
+
+
+class TimedLock:
+    """Wraps a (re-entrant) lock, recording how long acquisitions waited and how long it was held."""
+
+    def __init__(self, lock, wait: HistogramFamily = CACHE_LOCK_WAIT_SECONDS,
+                 hold: HistogramFamily = CACHE_LOCK_HOLD_SECONDS, labels: Sequence[str] = ()):
+        self._lock = lock
+        self._wait = wait.labels(*labels)
+        self._hold = hold.labels(*labels)
+        self._depth = 0  # Only touched while holding the lock
+        self._acquired_at = 0.0
+
+    def acquire(self) -> bool:
+        begin = time.perf_counter()
+        self._lock.acquire()
+        self._depth += 1
+        if self._depth == 1:
+            self._acquired_at = time.perf_counter()
+            if _enabled:
+                # Both histograms are only updated while holding the lock, so they need no lock of their own
+                self._wait.observe_serialized(self._acquired_at - begin)
+        return True
+
+    def release(self) -> None:
+        self._depth -= 1
+        if self._depth == 0 and _enabled:
+            self._hold.observe_serialized(time.perf_counter() - self._acquired_at)
+        self._lock.release()
+
+    __enter__ = acquire
+
+    def __exit__(self, *exc_info: Any) -> None:
+        self.release()
+
+
+def request_trace_config() -> 'aiohttp.TraceConfig':
+    """aiohttp trace hooks recording latency and status of every request made through a session."""
+    import aiohttp
+    trace_config = aiohttp.TraceConfig()
+
+    async def on_request_start(session, context, params):
+        context.started = time.perf_counter()
+
+    async def on_request_end(session, context, params):
+        _record_request(context, params.method, params.url.path, str(params.response.status))
+
+    async def on_request_exception(session, context, params):
+        _record_request(context, params.method, params.url.path, 'error')
+
+    trace_config.on_request_start.append(on_request_start)
+    trace_config.on_request_end.append(on_request_end)
+    trace_config.on_request_exception.append(on_request_exception)
+    return trace_config
+
+
+def _record_request(context, method: str, path: str, status: str) -> None:
+    started = getattr(context, 'started', None)
+    if started is None or not _enabled:
+        return
+    endpoint = endpoint_label(path)
+    LCU_REQUEST_SECONDS.observe(time.perf_counter() - started, method, endpoint)
+    LCU_RESPONSES.inc(method, endpoint, status)
+
+
+class MetricsExporter:
+    """
+    Optional export of a registry: a Prometheus text file rewritten periodically and/or a localhost HTTP
+    endpoint serving /metrics (text format) and /metrics.json (snapshot).
+    """
+
+    def __init__(self, registry: MetricsRegistry = REGISTRY, path: Optional[str] = None,
+                 port: Optional[int] = None, interval: float = EXPORT_INTERVAL):
+        self.registry = registry
+        self.path = path
+        self.port = port
+        self.interval = interval
+        self._task: Optional[asyncio.Task] = None
+        self._runner: Optional['web.AppRunner'] = None
+
+    @classmethod
+    def from_env(cls) -> Optional['MetricsExporter']:
+        """Exporter configured by INTEL_PANEL_METRICS_FILE and/or INTEL_PANEL_METRICS_PORT, None if neither."""
+        path = os.environ.get('INTEL_PANEL_METRICS_FILE')
+        port = os.environ.get('INTEL_PANEL_METRICS_PORT')
+        if not path and not port:
+            return None
+        try:
+            port = int(port) if port else None
+        except ValueError:
+            logger.error(f"Ignoring INTEL_PANEL_METRICS_PORT={port!r}, not a port number")
+            port = None
+        return cls(path=path or None, port=port)
+
+    async def start(self) -> None:
+        """Start the exports, a port that cannot be bound is logged and only disables the endpoint."""
+        if self.path and self._task is None:
+            self._task = asyncio.ensure_future(self._write_periodically())
+        if self.port and self._runner is None:
+            from aiohttp import web
+            app = web.Application()
+            app.add_routes([web.get('/metrics', self._serve_text), web.get('/metrics.json', self._serve_json)])
+            self._runner = web.AppRunner(app)
+            await self._runner.setup()
+            try:
+                await web.TCPSite(self._runner, '127.0.0.1', self.port).start()
+            except (OSError, OverflowError) as e:  # Port in use, or out of range
+                logger.error(f"Metrics endpoint disabled, cannot listen on port {self.port}: {e}")
+                await self._runner.cleanup()
+                self._runner = None
+                return
+            logger.info(f"Serving metrics on http://127.0.0.1:{self.port}/metrics")
+
+    async def stop(self) -> None:
+        if self._task is not None:
+            self._task.cancel()
+            await asyncio.gather(self._task, return_exceptions=True)
+            self._task = None
+            await self._write()
+        if self._runner is not None:
+            await self._runner.cleanup()
+            self._runner = None
+
+    async def _write(self) -> None:
+        try:
+            await asyncio.get_running_loop().run_in_executor(None, self.registry.write_prometheus, self.path)
+        except OSError as e:
+            logger.error(f"Failed to write metrics to {self.path}: {e}")
+
+    async def _write_periodically(self) -> None:
+        while True:
+            await self._write()
+            await asyncio.sleep(self.interval)
+
+    async def _serve_text(self, request: 'web.Request') -> 'web.Response':
+        from aiohttp import web
+        return web.Response(text=self.registry.render_prometheus(), content_type='text/plain', charset='utf-8')
+
+    async def _serve_json(self, request: 'web.Request') -> 'web.Response':
+        from aiohttp import web
+        return web.json_response(self.registry.snapshot())
@@ -1,27 +1,115 @@
 import asyncio
+import logging
+import time
+from threading import Lock
+from typing import Any, Callable, Dict, Iterable, List, NamedTuple, Optional, Tuple
+
+from metrics import OBSERVER_DELIVERIES, OBSERVER_DISPATCH_SECONDS
+
+logger = logging.getLogger(__name__)
+
+FRAME_WINDOW = 1 / 60  # One UI frame at 60 Hz
+
+
+class _Subscriber(NamedTuple):
+    observer: Any
+    method: Callable
+    is_async: bool
 
 
 class ObserverManager:
-    def __init__(self):
+    def __init__(self, coalesce_window: Optional[float] = None, coalesce_keys: Iterable[str] = ('update_ui',)):
+        """
+        Args:
+            coalesce_window (float): If set, notifications for `coalesce_keys` are batched for this many
+                seconds and only the latest value per (key, function, index) is delivered.
+            coalesce_keys (Iterable[str]): Notification keys eligible for coalescing.
+        """
         self._observers = []
+        self._dispatch: Dict[str, List[_Subscriber]] = {}  # key -> bound methods, resolved once per key
+        self.coalesce_window = coalesce_window
+        self.coalesce_keys = frozenset(coalesce_keys)
+        self._pending: Dict[Tuple, Tuple[str, Dict[str, Any]]] = {}
+        self._pending_lock = Lock()
+        self._flush_scheduled = False
 
     def add_observer(self, observer):
         if observer not in self._observers:
             self._observers.append(observer)
+            for key, subscribers in self._dispatch.items():
+                subscriber = self._resolve(observer, key)
+                if subscriber:
+                    subscribers.append(subscriber)
 
     def remove_observer(self, observer):
         try:
             self._observers.remove(observer)
         except ValueError:
-            pass
+            return
+        for key, subscribers in self._dispatch.items():
+            self._dispatch[key] = [subscriber for subscriber in subscribers if subscriber.observer is not observer]
+
+    @staticmethod
+    def _resolve(observer, key) -> Optional[_Subscriber]:
+        method = getattr(observer, key, None)
+        if callable(method):
+            return _Subscriber(observer, method, asyncio.iscoroutinefunction(method))
+        return None
+
+    def _subscribers(self, key) -> List[_Subscriber]:
+        subscribers = self._dispatch.get(key)
+        if subscribers is None:
+            subscribers = [s for s in (self._resolve(observer, key) for observer in self._observers) if s]
+            self._dispatch[key] = subscribers
+        return subscribers
+
+    def set_coalescing(self, window: Optional[float]) -> None:
+        """Enable (window in seconds) or disable (None) coalescing; disabling delivers anything pending."""
+        self.coalesce_window = window
+        if window is None:
+            self.flush()
 
     def notify(self, key, **kwargs):
-        print(f"Notifying observers with key: {key}")
-        for observer in self._observers:
-            method = getattr(observer, key, None)
-            if callable(method):
-                if asyncio.iscoroutinefunction(method):
-                    asyncio.create_task(method(**kwargs))
+        logger.debug(f"Notifying observers with key: {key}")
+        if self.coalesce_window is not None and key in self.coalesce_keys and self._defer(key, kwargs):
+            return
+        self._deliver(key, kwargs)
 
+    def _deliver(self, key, kwargs):
+        # Async observers only count their scheduling, their own run time shows up in the event loop
+        started = time.perf_counter()
+        subscribers = self._subscribers(key)
+        try:
+            for subscriber in subscribers:
+                if subscriber.is_async:
+                    asyncio.create_task(subscriber.method(**kwargs))
                 else:
-                    method(**kwargs)
+                    subscriber.method(**kwargs)
+        finally:
+            OBSERVER_DISPATCH_SECONDS.observe(time.perf_counter() - started, key)
+            OBSERVER_DELIVERIES.inc(key, amount=len(subscribers))
+
+    def _defer(self, key, kwargs) -> bool:
+        try:
+            loop = asyncio.get_running_loop()
+        except RuntimeError:
+            return False  # No loop in this thread to flush from, deliver immediately
+        with self._pending_lock:
+            # Later values replace earlier ones but keep their position in the batch
+            self._pending[(key, kwargs.get('function'), kwargs.get('index'))] = (key, kwargs)
+            if self._flush_scheduled:
+                return True
+            self._flush_scheduled = True
+        loop.call_later(self.coalesce_window, self.flush)
+        return True
+
+    def flush(self) -> None:
+        """Deliver every pending coalesced notification now."""
+        with self._pending_lock:
+            pending, self._pending = self._pending, {}
+            self._flush_scheduled = False
+        for key, kwargs in pending.values():
+            try:
+                self._deliver(key, kwargs)
+            except Exception as e:
+                logger.error(f"Observer failed while handling {key}: {e}", exc_info=True)
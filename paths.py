@@ -0,0 +1,3 @@
+import os
+
+APP_DATA_DIR = os.environ.get('INTEL_PANEL_DATA_DIR') or os.path.join(os.path.expanduser("~"), ".intel-panel")
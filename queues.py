@@ -0,0 +1,81 @@
+QUEUE_MAPPING = {
+    0: "Custom",
+    2: "Normal",
+    4: "Ranked Solo",
+    6: "Ranked Duo",
+    7: "Historical",
+    8: "Normal 3v3",
+    9: "Ranked Flex",
+    14: "Normal Draft",
+    16: "Dominion",
+    17: "ARAM",
+    25: "ARAM Co-op vs AI",
+    31: "Co-op vs AI",
+    32: "Co-op vs AI Intro",
+    33: "Co-op vs AI Beginner",
+    52: "Twisted Treeline Co-op vs AI",
+    61: "Team Builder",
+    65: "ARAM Ultra Rapid Fire",
+    67: "Doom Bots Rank 1",
+    70: "One for All",
+    72: "Snowdown Showdown 1v1",
+    73: "Snowdown Showdown 2v2",
+    75: "Hexakill",
+    76: "URF",
+    78: "One for All (Mirror)",
+    83: "Ultra Rapid Fire Co-op vs AI",
+    91: "Doom Bots Rank 2",
+    92: "Doom Bots Rank 5",
+    93: "Ascension",
+    96: "Hexakill Twisted Treeline",
+    98: "6v6 Hexakill",
+    100: "ARAM Butcher's Bridge",
+    300: "Legend of the Poro King",
+    310: "Nemesis",
+    313: "Black Market Brawlers",
+    315: "Nexus Siege",
+    317: "Definitely Not Dominion",
+    318: "All Random URF",
+    325: "All Random Summoner's Rift",
+    400: "Draft Pick",
+    420: "Ranked",
+    430: "Blind Pick",
+    440: "Flex",
+    450: "ARAM",
+    460: "Dark Star Singularity",
+    470: "Ranked Flex 3v3",
+    600: "Blood Hunt Assassin",
+    610: "Dark Star: Singularity",
+    700: "Clash",
+    800: "Co-op vs. AI Intermediate",
+    810: "Co-op vs. AI Intro",
+    820: "Co-op vs. AI Beginner",
+    830: "Co-op vs. AI Intro Bot",
+    840: "Co-op vs. AI Beginner Bot",
+    850: "Co-op vs. AI Intermediate Bot",
+    900: "URF",
+    910: "Ascension",
+    920: "Legend of the Poro King",
+    940: "Nexus Siege",
+    950: "Doom Bots Voting",
+    960: "Doom Bots Standard",
+    980: "Star Guardian Invasion: Normal",
+    990: "Star Guardian Invasion: Onslaught",
+    1000: "PROJECT: Hunters",
+    1010: "Snow ARURF",
+    1020: "One for All",
+    1030: "Odyssey Extraction: Intro",
+    1040: "Odyssey Extraction: Cadet",
+    1050: "Odyssey Extraction: Crewmember",
+    1060: "Odyssey Extraction: Captain",
+    1070: "Odyssey Extraction: Onslaught",
+    1090: "Teamfight Tactics",
+    1100: "Ranked Teamfight Tactics",
+    1110: "Teamfight Tactics Tutorial",
+    1111: "Teamfight Tactics Test",
+    1200: "Nexus Blitz",
+}
+
+
+def get_game_mode_from_queue(queue_id: int) -> str:
+    return QUEUE_MAPPING.get(queue_id, "Unknown")
@@ -0,0 +1,168 @@
+import asyncio
+import gzip
+import logging
+import struct
+import time
+import zlib
+from typing import Any, Awaitable, Callable, Dict, Iterator, List, Optional, Tuple, Union
+
+from fastjson import peek_event
+
+logger = logging.getLogger(__name__)
+
+# Record layout inside the gzip stream: monotonic timestamp, payload length, payload kind, payload
+RECORD = struct.Struct('<dIB')
+TEXT, BINARY = 0, 1
+FLUSH_SIZE = 64 * 1024  # Buffered payload bytes that trigger a background flush
+FLUSH_INTERVAL = 5.0  # Seconds after which a non-empty buffer is flushed on the next frame
+MAX_REPLAY_GAP = 5.0  # Longest real-time pause on replay, also bridges sessions appended to one file
+NO_URI = '<none>'
+
+Frame = Union[str, bytes]
+
+
+class FrameRecorder:
+    """
+    Append-only recorder of raw WebSocket frames. Frames are buffered in memory and written in the default
+    executor, every flush appending one complete gzip member, so a crash loses at most the unflushed
+    buffer and recordings of several sessions can share a file.
+    """
+
+    def __init__(self, path: str, flush_size: int = FLUSH_SIZE, flush_interval: float = FLUSH_INTERVAL,
+                 compresslevel: int = 6):
+        self.path = path
+        self.flush_size = flush_size
+        self.flush_interval = flush_interval
+        self.compresslevel = compresslevel
+        self._buffer: List[bytes] = []
+        self._buffered = 0
+        self._last_flush = time.monotonic()
+        self._pending: Optional[asyncio.Future] = None
+        self.frames = 0
+
+    def record(self, frame: Frame) -> None:
+        """Buffer one frame with the current monotonic time, never blocks on disk I/O."""
+        now = time.monotonic()
+        if isinstance(frame, str):
+            payload, kind = frame.encode('utf-8'), TEXT
+        else:
+            payload, kind = bytes(frame), BINARY
+        self._buffer.append(RECORD.pack(now, len(payload), kind))
+        self._buffer.append(payload)
+        self._buffered += len(payload)
+        self.frames += 1
+        due = self._buffered >= self.flush_size or now - self._last_flush >= self.flush_interval
+        if due and (self._pending is None or self._pending.done()):  # One write in flight keeps members in order
+            self._schedule_flush()
+
+    def _take_buffer(self) -> bytes:
+        data = b''.join(self._buffer)
+        self._buffer.clear()
+        self._buffered = 0
+        self._last_flush = time.monotonic()
+        return data
+
+    def _schedule_flush(self) -> None:
+        data = self._take_buffer()
+        try:
+            loop = asyncio.get_running_loop()
+        except RuntimeError:
+            self._write(data)
+            return
+        self._pending = loop.run_in_executor(None, self._write, data)
+
+    def _write(self, data: bytes) -> None:
+        if not data:
+            return
+        try:
+            with open(self.path, 'ab') as file:
+                file.write(gzip.compress(data, compresslevel=self.compresslevel))
+        except OSError as e:
+            logger.error(f"Failed to write WebSocket recording {self.path}: {e}")
+
+    async def flush(self) -> None:
+        """Write everything buffered and wait for earlier background writes."""
+        if self._pending is not None:
+            await self._pending
+            self._pending = None
+        data = self._take_buffer()
+        await asyncio.get_running_loop().run_in_executor(None, self._write, data)
+
+
+def read_frames(path: str) -> Iterator[Tuple[float, Frame]]:
+    """Yield (monotonic timestamp, frame) from a recording, stopping quietly at a truncated tail."""
+    with gzip.open(path, 'rb') as file:
+        while True:
+            try:
+                header = file.read(RECORD.size)
+                if len(header) < RECORD.size:
+                    return
+                timestamp, length, kind = RECORD.unpack(header)
+                payload = file.read(length)
+            except (EOFError, zlib.error, gzip.BadGzipFile) as e:
+                logger.warning(f"Recording {path} ends in a truncated member: {e}")
+                return
+            if len(payload) < length:
+                return
+            yield timestamp, payload.decode('utf-8') if kind == TEXT else payload
+
+
+class UriCost:
+    __slots__ = ('count', 'total', 'max', 'bytes')
+
+    def __init__(self):
+        self.count = 0
+        self.total = 0.0
+        self.max = 0.0
+        self.bytes = 0
+
+    def as_dict(self) -> Dict[str, Any]:
+        return {'count': self.count, 'total_ms': self.total * 1000, 'mean_us': self.total / self.count * 1e6,
+                'max_us': self.max * 1e6, 'bytes': self.bytes}
+
+
+async def replay(path: str, handler: Callable[[Frame], Awaitable[Any]], speed: Optional[float] = None,
+                 max_gap: float = MAX_REPLAY_GAP) -> Dict[str, Any]:
+    """
+    Feed a recording through `handler` (MessageHandler.handle_message) and time every call.
+
+    Args:
+        path (str): Recording written by FrameRecorder.
+        handler (Callable): Coroutine function handling one raw frame.
+        speed (float): None replays as fast as possible, 1.0 at recorded pace, 2.0 twice as fast.
+        max_gap (float): Recorded pauses longer than this many seconds are shortened to it.
+
+    Returns:
+        Dict with the frame count, wall time and per-URI cost sorted by total handling time.
+    """
+    costs: Dict[str, UriCost] = {}
+    loop = asyncio.get_running_loop()
+    started = time.perf_counter()
+    previous = None
+    schedule = loop.time()
+    frames = 0
+    for timestamp, frame in read_frames(path):
+        if speed and previous is not None:
+            schedule += min(max(timestamp - previous, 0.0), max_gap) / speed
+            delay = schedule - loop.time()
+            if delay > 0:
+                await asyncio.sleep(delay)
+        previous = timestamp
+
+        uri = (peek_event(frame)[1] if isinstance(frame, str) else None) or NO_URI
+        begin = time.perf_counter()
+        await handler(frame)
+        elapsed = time.perf_counter() - begin
+
+        cost = costs.get(uri)
+        if cost is None:
+            cost = costs[uri] = UriCost()
+        cost.count += 1
+        cost.total += elapsed
+        cost.max = max(cost.max, elapsed)
+        cost.bytes += len(frame)
+        frames += 1
+
+    ranked = sorted(costs.items(), key=lambda item: item[1].total, reverse=True)
+    return {'frames': frames, 'wall_s': time.perf_counter() - started,
+            'uris': {uri: cost.as_dict() for uri, cost in ranked}}
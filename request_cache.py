@@ -0,0 +1,110 @@
+import asyncio
+import logging
+import time
+from typing import Any, Awaitable, Callable, Dict, Iterable, Optional, Set, Tuple
+
+from routing import RouteTable
+
+logger = logging.getLogger(__name__)
+
+# Endpoint prefix -> seconds a successful GET stays fresh. WebSocket events under the same prefix
+# invalidate earlier, so these only bound how stale data can get when an event is missed.
+DEFAULT_TTLS = {
+    "/lol-summoner/v1/current-summoner": 60.0,
+    "/lol-ranked/v1/current-ranked-stats": 60.0,
+    "/lol-collections/v1/inventories": 120.0,
+    "/lol-chat/v1/friends": 10.0,
+}
+
+
+class ResponseCache:
+    """
+    Request layer for LCU GETs: concurrent identical requests share one in-flight fetch (single-flight),
+    results are kept for a per-endpoint TTL, and invalidate(prefix) drops everything under an endpoint.
+    """
+
+    def __init__(self, ttls: Optional[Dict[str, float]] = None, default_ttl: float = 0.0,
+                 clock: Callable[[], float] = time.monotonic):
+        """
+        Args:
+            ttls (Dict[str, float]): Endpoint prefix -> TTL in seconds, the longest matching prefix wins.
+            default_ttl (float): TTL of endpoints matching no prefix, 0 only de-duplicates in-flight requests.
+            clock (Callable): Monotonic time source, replaceable for tests and replays.
+        """
+        self.ttls = dict(DEFAULT_TTLS if ttls is None else ttls)
+        self.default_ttl = default_ttl
+        self._clock = clock
+        self._rules = RouteTable()
+        for prefix, ttl in self.ttls.items():
+            self._rules.add(prefix, ttl, prefix=True)
+        self._entries: Dict[str, Tuple[float, Any]] = {}  # key -> (expires at, value)
+        self._inflight: Dict[str, asyncio.Future] = {}
+        self._waiters: Dict[asyncio.Future, int] = {}  # In-flight fetch -> callers awaiting it
+        self._stale: Set[str] = set()  # In-flight keys invalidated before their response arrived
+
+    def prefixes(self) -> Iterable[str]:
+        return self.ttls.keys()
+
+    def ttl_for(self, path: str) -> float:
+        ttl = self._rules.match(path)
+        return self.default_ttl if ttl is None else ttl
+
+    async def get(self, key: str, fetch: Callable[[], Awaitable[Any]]) -> Any:
+        """
+        Return the fresh cached value for `key` (a request path), else the result of `fetch()`, sharing one
+        call between concurrent callers. Cached values are shared, callers must not mutate them.
+
+        A cancelled caller, such as an attempt that timed out, detaches the in-flight fetch from `key`, so a
+        retry sends a new request instead of joining the one that hangs. The detached fetch is cancelled
+        once nobody awaits it any more.
+        """
+        entry = self._entries.get(key)
+        if entry is not None and entry[0] > self._clock():
+            return entry[1]
+        future = self._inflight.get(key)
+        if future is None:
+            # A task of its own, so a cancelled caller does not cancel the fetch the others wait on
+            future = self._inflight[key] = asyncio.ensure_future(self._fetch(key, fetch))
+        self._waiters[future] = self._waiters.get(future, 0) + 1
+        try:
+            return await asyncio.shield(future)
+        except asyncio.CancelledError:
+            self.forget(key, future)
+            raise
+        finally:
+            waiters = self._waiters.pop(future) - 1
+            if waiters:
+                self._waiters[future] = waiters
+            elif not future.done():
+                future.cancel()
+
+    async def _fetch(self, key: str, fetch: Callable[[], Awaitable[Any]]) -> Any:
+        task = asyncio.current_task()
+        try:
+            value = await fetch()
+            ttl = self.ttl_for(key)
+            if ttl > 0 and self._inflight.get(key) is task and key not in self._stale:
+                self._entries[key] = (self._clock() + ttl, value)
+            return value
+        finally:
+            self.forget(key, task)
+
+    def forget(self, key: str, future: Optional[asyncio.Future] = None) -> None:
+        """
+        Detach the in-flight fetch of `key` (only if it is `future`, when given): later get() calls send a new
+        request and its response is not cached.
+        """
+        if key in self._inflight and (future is None or self._inflight[key] is future):
+            del self._inflight[key]
+            self._stale.discard(key)
+
+    def invalidate(self, prefix: str, *_: Any) -> None:
+        """Drop cached entries under `prefix`; responses already in flight for them are not cached."""
+        for key in [key for key in self._entries if key.startswith(prefix)]:
+            del self._entries[key]
+        self._stale.update(key for key in self._inflight if key.startswith(prefix))
+        logger.debug(f"Invalidated cached responses under {prefix}")
+
+    def clear(self) -> None:
+        self._entries.clear()
+        self._stale.update(self._inflight)
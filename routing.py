@@ -0,0 +1,105 @@
+from typing import Any, Callable, Dict, Iterator, List, Optional, Tuple
+
+EVENT_PREFIX = "OnJsonApiEvent"
+
+
+def event_name(uri: str) -> str:
+    """WAMP event carrying updates for `uri` and its sub-paths, e.g. OnJsonApiEvent_lol-chat_v1_friends."""
+    return EVENT_PREFIX + uri.rstrip('/').replace('/', '_')
+
+
+def route(uri: str, prefix: bool = False) -> Callable:
+    """
+    Decorator to declare the LCU URI (or URI prefix) a handler method handles. Routes are collected
+    with collect_routes when the owning object is created.
+
+    Args:
+        uri (str): The event URI, e.g. "/lol-summoner/v1/current-summoner".
+        prefix (bool): If True the handler also receives events for every sub-path of `uri`.
+    """
+
+    def decorator(func: Callable) -> Callable:
+        routes = getattr(func, '_lcu_routes', [])
+        func._lcu_routes = routes + [(uri, prefix)]
+        return func
+
+    return decorator
+
+
+def collect_routes(owner: Any) -> List[Tuple[str, bool, Callable]]:
+    """Return (uri, prefix, bound handler) for every @route decorated method of `owner`."""
+    collected = []
+    for name in dir(type(owner)):
+        for uri, prefix in getattr(getattr(type(owner), name, None), '_lcu_routes', ()):
+            collected.append((uri, prefix, getattr(owner, name)))
+    return collected
+
+
+def _segments(uri: str) -> List[str]:
+    return [segment for segment in uri.split('/') if segment]
+
+
+class _Node:
+    __slots__ = ('children', 'handler')
+
+    def __init__(self):
+        self.children: Dict[str, '_Node'] = {}
+        self.handler: Optional[Callable] = None
+
+
+class RouteTable:
+    """URI -> handler lookup: exact routes in a dict, prefix routes in a trie keyed by path segment."""
+
+    def __init__(self):
+        self._exact: Dict[str, Callable] = {}
+        self._root = _Node()
+        self._prefixes: Dict[str, Callable] = {}
+
+    def add(self, uri: str, handler: Callable, prefix: bool = False) -> None:
+        if not prefix:
+            self._exact[uri] = handler
+            return
+        node = self._root
+        for segment in _segments(uri):
+            node = node.children.setdefault(segment, _Node())
+        node.handler = handler
+        self._prefixes[uri] = handler
+
+    def remove(self, uri: str, prefix: bool = False) -> None:
+        if not prefix:
+            self._exact.pop(uri, None)
+            return
+        if self._prefixes.pop(uri, None) is None:
+            return
+        path = [self._root]
+        for segment in _segments(uri):
+            path.append(path[-1].children[segment])
+        path[-1].handler = None
+        # Drop nodes that no longer lead to a handler
+        for parent, segment, node in zip(reversed(path[:-1]), reversed(_segments(uri)), reversed(path[1:])):
+            if node.handler is None and not node.children:
+                del parent.children[segment]
+
+    def match(self, uri: str) -> Optional[Callable]:
+        """Return the exact handler for `uri`, else the handler of its longest registered prefix."""
+        handler = self._exact.get(uri)
+        if handler is not None:
+            return handler
+        node, found = self._root, None
+        for segment in _segments(uri):
+            node = node.children.get(segment)
+            if node is None:
+                break
+            if node.handler is not None:
+                found = node.handler
+        return found
+
+    def __iter__(self) -> Iterator[Tuple[str, bool]]:
+        for uri in self._exact:
+            yield uri, False
+        for uri in self._prefixes:
+            yield uri, True
+
+    def events(self) -> List[str]:
+        """WAMP events to subscribe to so that only registered routes are delivered."""
+        return sorted({event_name(uri) for uri, _ in self})
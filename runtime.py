@@ -0,0 +1,164 @@
+import asyncio
+import concurrent.futures
+import logging
+import os
+import threading
+from typing import Any, Callable, Coroutine, Optional
+
+logger = logging.getLogger(__name__)
+
+MAX_WORKERS = min(8, (os.cpu_count() or 1) + 2)  # Blocking work is I/O bound: psutil, disk, sqlite
+STOP_TIMEOUT = 5.0
+
+Dispatcher = Callable[[Callable[[], Any]], Any]
+
+
+def _call_directly(callback: Callable[[], Any]) -> None:
+    callback()
+
+
+def qt_dispatcher() -> Dispatcher:
+    """
+    Dispatcher running callbacks on the Qt GUI thread through a queued signal. Must be created on the GUI
+    thread after the QApplication, e.g. Runtime(dispatcher=qt_dispatcher()).
+    """
+    from PyQt5.QtCore import QObject, pyqtSignal  # Imported lazily, the back end runs without Qt
+
+    class _Relay(QObject):
+        call = pyqtSignal(object)
+
+    relay = _Relay()
+    relay.call.connect(lambda callback: callback())
+    dispatcher = relay.call.emit
+    dispatcher.relay = relay  # Keeps the QObject alive as long as the dispatcher
+    return dispatcher
+
+
+class Runtime:
+    """
+    The back end's single long-lived event loop, running on its own thread, plus the bounded thread
+    pool for blocking work. The pool is the loop's default executor, so every run_in_executor(None, ...)
+    in the code base shares the same MAX_WORKERS threads.
+    """
+
+    def __init__(self, max_workers: int = MAX_WORKERS, dispatcher: Optional[Dispatcher] = None):
+        """
+        Args:
+            max_workers (int): Threads of the blocking-work pool.
+            dispatcher (Callable): Runs completion callbacks of submit(), by default on the loop thread.
+                Pass qt_dispatcher() so callbacks may touch widgets.
+        """
+        self.max_workers = max_workers
+        self.executor: Optional[concurrent.futures.ThreadPoolExecutor] = None
+        self.dispatcher = dispatcher or _call_directly
+        self.loop: Optional[asyncio.AbstractEventLoop] = None
+        self._thread: Optional[threading.Thread] = None
+        self._started = threading.Event()
+        self._lock = threading.Lock()
+
+    # Lifecycle
+    def start(self) -> 'Runtime':
+        with self._lock:
+            if self._thread is None:
+                self.executor = concurrent.futures.ThreadPoolExecutor(max_workers=self.max_workers,
+                                                                      thread_name_prefix='intel-panel-worker')
+                self._thread = threading.Thread(target=self._run, name='intel-panel-loop', daemon=True)
+                self._thread.start()
+        self._started.wait()
+        return self
+
+    def _run(self) -> None:
+        self.loop = asyncio.new_event_loop()
+        asyncio.set_event_loop(self.loop)
+        self.loop.set_default_executor(self.executor)
+        self._started.set()
+        try:
+            self.loop.run_forever()
+        finally:
+            self.loop.run_until_complete(self.loop.shutdown_asyncgens())
+            self.loop.close()
+
+    @property
+    def running(self) -> bool:
+        return self._thread is not None and self._thread.is_alive()
+
+    def in_loop_thread(self) -> bool:
+        return threading.current_thread() is self._thread
+
+    def stop(self, timeout: float = STOP_TIMEOUT) -> None:
+        """Cancel the remaining tasks, stop the loop and wait for the pool, from any thread but the loop's."""
+        if not self.running:
+            return
+        asyncio.run_coroutine_threadsafe(self._cancel_tasks(), self.loop).result(timeout)
+        self.loop.call_soon_threadsafe(self.loop.stop)
+        self._thread.join(timeout)
+        self.executor.shutdown(wait=True)
+        self.executor = None
+        self._thread = None
+        self._started.clear()
+
+    @staticmethod
+    async def _cancel_tasks() -> None:
+        tasks = [task for task in asyncio.all_tasks() if task is not asyncio.current_task()]
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+
+    # Bridges
+    def submit(self, coro: Coroutine, on_done: Optional[Callable[[concurrent.futures.Future], Any]] = None
+               ) -> concurrent.futures.Future:
+        """
+        Schedule `coro` on the loop from any thread. `on_done(future)` runs through the dispatcher when the
+        coroutine finished, failed or was cancelled; failures are logged either way.
+        """
+        if not self.running:
+            self.start()
+        future = asyncio.run_coroutine_threadsafe(coro, self.loop)
+        future.add_done_callback(self._completion(on_done, getattr(coro, '__qualname__', repr(coro))))
+        return future
+
+    def run_blocking(self, func: Callable, *args: Any,
+                     on_done: Optional[Callable[[concurrent.futures.Future], Any]] = None,
+                     **kwargs: Any) -> concurrent.futures.Future:
+        """Run a blocking `func(*args, **kwargs)` on the pool from any thread, with the same completion handling."""
+        if not self.running:
+            self.start()
+        future = self.executor.submit(func, *args, **kwargs)
+        future.add_done_callback(self._completion(on_done, getattr(func, '__qualname__', repr(func))))
+        return future
+
+    def _completion(self, on_done, name: str) -> Callable[[concurrent.futures.Future], None]:
+        def done(future: concurrent.futures.Future) -> None:
+            if not future.cancelled() and future.exception() is not None:
+                logger.error(f"An error occurred in {name}: {future.exception()}",
+                             exc_info=future.exception())
+            if on_done is not None:
+                self.dispatcher(lambda: on_done(future))
+
+        return done
+
+
+_runtime: Optional[Runtime] = None
+_runtime_lock = threading.Lock()
+
+
+def get_runtime() -> Runtime:
+    """The process-wide Runtime, started on first use."""
+    global _runtime
+    with _runtime_lock:
+        if _runtime is None:
+            _runtime = Runtime()
+    return _runtime.start()
+
+
+def set_runtime(runtime: Runtime) -> Runtime:
+    """Install a configured Runtime (e.g. with qt_dispatcher()) before anything calls get_runtime()."""
+    global _runtime
+    with _runtime_lock:
+        _runtime = runtime
+    return runtime
+
+
+def submit(coro: Coroutine, on_done: Optional[Callable[[concurrent.futures.Future], Any]] = None
+           ) -> concurrent.futures.Future:
+    return get_runtime().submit(coro, on_done)
@@ -0,0 +1,220 @@
+import asyncio
+import logging
+import os
+import struct
+import time
+import zlib
+from typing import Any, Dict, Iterable, List, NamedTuple, Optional, Tuple
+
+from fastjson import dumps, loads
+from paths import APP_DATA_DIR
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_SNAPSHOT_PATH = os.path.join(APP_DATA_DIR, "cache.snapshot")
+# The data sets the UI can draw from before the client answered; everything else is cheap or volatile
+SNAPSHOT_KEYS = ('current_summoner', 'current_ranked_stats', 'summoner_mastery', 'summoner_match_data')
+SNAPSHOT_INTERVAL = 60.0  # Seconds between periodic saves, a save is skipped when nothing changed
+COMPRESS_THRESHOLD = 32 * 1024  # Payloads above this many bytes are stored zlib-compressed
+
+# File layout: header, one index entry (fixed part + UTF-8 key) per key, then the payloads back to back.
+# Offsets are absolute, so a key is decoded straight from its slice without touching the others.
+MAGIC = b'IPSNAP'
+FORMAT_VERSION = 1
+HEADER = struct.Struct('<6sHId')  # magic, format version, entry count, saved at (epoch seconds)
+ENTRY = struct.Struct('<HIdQIB')  # key length, cache version, updated at (epoch seconds), offset, length, codec
+JSON, ZLIB_JSON = 0, 1
+
+
+class SnapshotEntry(NamedTuple):
+    version: int
+    updated_at: float
+    offset: int
+    length: int
+    codec: int
+
+
+class SnapshotError(ValueError):
+    pass
+
+
+class Snapshot:
+    """
+    A snapshot file read into memory with only its index parsed. Values are decoded per key on first
+    access, so restoring costs one file read however large the match history section is.
+    """
+
+    def __init__(self, data: bytes):
+        self._data = memoryview(data)
+        if len(data) < HEADER.size:
+            raise SnapshotError("File too short for a snapshot header")
+        magic, format_version, count, self.saved_at = HEADER.unpack_from(data)
+        if magic != MAGIC or format_version != FORMAT_VERSION:
+            raise SnapshotError(f"Not a version {FORMAT_VERSION} cache snapshot")
+        self.entries: Dict[str, SnapshotEntry] = {}
+        position = HEADER.size
+        for _ in range(count):
+            key_length, version, updated_at, offset, length, codec = ENTRY.unpack_from(data, position)
+            position += ENTRY.size
+            key = bytes(self._data[position:position + key_length]).decode('utf-8')
+            position += key_length
+            if offset + length > len(data):
+                raise SnapshotError(f"Payload of {key} runs past the end of the file")
+            self.entries[key] = SnapshotEntry(version, updated_at, offset, length, codec)
+
+    @classmethod
+    def read(cls, path: str) -> Optional['Snapshot']:
+        """Read the snapshot at `path`, None when there is none or it cannot be used."""
+        try:
+            with open(path, 'rb') as file:
+                return cls(file.read())
+        except FileNotFoundError:
+            return None
+        except (OSError, struct.error, UnicodeDecodeError, SnapshotError) as e:
+            logger.warning(f"Ignoring unreadable cache snapshot {path}: {e}")
+            return None
+
+    def keys(self) -> List[str]:
+        return list(self.entries)
+
+    def raw(self, key: str) -> Tuple[SnapshotEntry, memoryview]:
+        entry = self.entries[key]
+        return entry, self._data[entry.offset:entry.offset + entry.length]
+
+    def decode(self, key: str) -> Any:
+        """Decode the value of `key`, raises a ValueError when its payload is corrupt."""
+        entry, payload = self.raw(key)
+        if entry.codec == ZLIB_JSON:
+            try:
+                payload = zlib.decompress(payload)
+            except zlib.error as e:
+                raise SnapshotError(f"Corrupt payload for {key}: {e}") from e
+        return loads(bytes(payload))
+
+
+def encode_value(value: Any) -> Tuple[bytes, int]:
+    payload = dumps(value)
+    if len(payload) > COMPRESS_THRESHOLD:
+        return zlib.compress(payload, 1), ZLIB_JSON  # Level 1, decode speed matters more than size
+    return payload, JSON
+
+
+def write_snapshot(path: str, entries: Iterable[Tuple[str, int, float, bytes, int]]) -> int:
+    """
+    Atomically write `entries` of (key, version, updated_at, payload, codec) to `path`, returns the file size.
+    """
+    entries = [(key.encode('utf-8'), version, updated_at, payload, codec)
+               for key, version, updated_at, payload, codec in entries]
+    offset = HEADER.size + sum(ENTRY.size + len(key) for key, *_ in entries)
+    parts = [HEADER.pack(MAGIC, FORMAT_VERSION, len(entries), time.time())]
+    for key, version, updated_at, payload, codec in entries:
+        parts.append(ENTRY.pack(len(key), version, updated_at, offset, len(payload), codec))
+        parts.append(key)
+        offset += len(payload)
+    parts.extend(payload for _, _, _, payload, _ in entries)
+    os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+    tmp = f"{path}.tmp"
+    with open(tmp, 'wb') as file:
+        file.write(b''.join(parts))
+    os.replace(tmp, path)  # Atomic, a crash during a save keeps the previous snapshot
+    return offset
+
+
+class CacheSnapshotter:
+    """
+    Persists SNAPSHOT_KEYS of the Cache across launches. load() restores them as stale values before the
+    client is queried; run() saves every `interval` seconds while anything changed and stop() saves once
+    more on shutdown. Encoding and disk I/O run in the default executor.
+    """
+
+    def __init__(self, cache, observer_manager, path: str = DEFAULT_SNAPSHOT_PATH,
+                 keys: Iterable[str] = SNAPSHOT_KEYS, interval: float = SNAPSHOT_INTERVAL):
+        self.cache = cache
+        self.observer_manager = observer_manager
+        self.path = path
+        self.keys = tuple(keys)
+        self.interval = interval
+        self.snapshot: Optional[Snapshot] = None
+        self.loaded = False
+        self._saved_versions: Dict[str, int] = {}
+        self._task: Optional[asyncio.Task] = None
+
+    async def load(self) -> List[str]:
+        """Restore the last snapshot into the cache once per process, returns the restored keys."""
+        if self.loaded:
+            return []
+        self.loaded = True
+        self.snapshot = await asyncio.get_running_loop().run_in_executor(None, Snapshot.read, self.path)
+        if self.snapshot is None:
+            return []
+        restored = self.cache.restore(self.snapshot, self.keys)
+        self._saved_versions = {key: self.snapshot.entries[key].version for key in restored}
+        if restored:
+            logger.info(f"Restored {len(restored)} cache keys from the snapshot saved at "
+                        f"{time.strftime('%Y-%m-%d %H:%M:%S', time.localtime(self.snapshot.saved_at))}")
+            self.observer_manager.notify("snapshot_restored", keys=restored, saved_at=self.snapshot.saved_at)
+        return restored
+
+    def reconcile(self) -> None:
+        """
+        Drop the stale values if the live summoner is not the one the snapshot was taken for, call once
+        the live current_summoner is in the cache.
+        """
+        if self.snapshot is None or 'current_summoner' not in self.snapshot.entries:
+            return
+        try:
+            previous = self.snapshot.decode('current_summoner') or {}
+        except ValueError:
+            previous = {}
+        if previous.get('puuid') != self.cache.get_nested('current_summoner', 'puuid'):
+            dropped = self.cache.drop_stale()
+            if dropped:
+                logger.info(f"Snapshot belongs to another summoner, dropped {len(dropped)} stale keys")
+                self.observer_manager.notify("snapshot_dropped", keys=dropped)
+
+    async def save(self, force: bool = False) -> bool:
+        """Write the snapshot unless no key changed since the last save, returns whether it was written."""
+        live, pending = self.cache.export(self.keys)
+        versions = {key: version for key, (_, version, _) in live.items()}
+        versions.update((key, snapshot.entries[key].version) for key, snapshot in pending.items())
+        if not versions or (versions == self._saved_versions and not force):
+            return False
+        loop = asyncio.get_running_loop()
+        try:
+            size = await loop.run_in_executor(None, self._write, live, pending)
+        except (OSError, TypeError, ValueError) as e:
+            logger.error(f"Failed to write cache snapshot {self.path}: {e}")
+            return False
+        self._saved_versions = versions
+        logger.debug(f"Cache snapshot written: {len(versions)} keys, {size} bytes")
+        return True
+
+    def _write(self, live: Dict[str, Tuple[Any, int, float]], pending: Dict[str, Snapshot]) -> int:
+        # Cache values are replaced, never mutated in place (Cache.update diffs old against new), so
+        # encoding them outside the lock is safe
+        entries = []
+        for key in self.keys:
+            if key in live:
+                value, version, updated_at = live[key]
+                entries.append((key, version, updated_at, *encode_value(value)))
+            elif key in pending:
+                entry, payload = pending[key].raw(key)  # Never decoded, carried over as is
+                entries.append((key, entry.version, entry.updated_at, bytes(payload), entry.codec))
+        return write_snapshot(self.path, entries)
+
+    async def run(self) -> None:
+        while True:
+            await asyncio.sleep(self.interval)
+            await self.save()
+
+    def start(self) -> None:
+        if self._task is None or self._task.done():
+            self._task = asyncio.ensure_future(self.run())
+
+    async def stop(self) -> None:
+        """Stop the periodic saves and write a final snapshot."""
+        if self._task is not None:
+            self._task.cancel()
+            await asyncio.gather(self._task, return_exceptions=True)
+            self._task = None
+        await self.save()
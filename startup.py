@@ -0,0 +1,72 @@
+import importlib
+import logging
+import sys
+import time
+from contextlib import contextmanager
+from types import ModuleType
+from typing import Any, Callable, Dict, Iterator, Tuple
+
+logger = logging.getLogger(__name__)
+
+
+class StartupReport:
+    """
+    Timeline of the startup path: named phases (imports, discovery, each fetch) with their offset and
+    duration, and milestones such as first paint, all relative to the report's creation.
+    """
+
+    def __init__(self, clock: Callable[[], float] = time.perf_counter):
+        self._clock = clock
+        self.origin = clock()
+        self.phases: Dict[str, Tuple[float, float]] = {}  # name -> (start, end), seconds since origin
+        self.milestones: Dict[str, float] = {}
+
+    def elapsed(self) -> float:
+        return self._clock() - self.origin
+
+    @contextmanager
+    def phase(self, name: str) -> Iterator[None]:
+        start = self.elapsed()
+        try:
+            yield
+        finally:
+            self.phases[name] = (start, self.elapsed())
+
+    def record(self, name: str, start: float) -> None:
+        """Record a phase that started at `start` (an elapsed() value) and ends now."""
+        self.phases[name] = (start, self.elapsed())
+
+    def mark(self, name: str) -> None:
+        """Record a milestone once, later marks of the same name are ignored."""
+        self.milestones.setdefault(name, self.elapsed())
+
+    def lazy_import(self, module_name: str) -> ModuleType:
+        """Import `module_name` on first use, timing it as the `import:<name>` phase."""
+        module = sys.modules.get(module_name)
+        if module is not None:
+            return module
+        with self.phase(f"import:{module_name}"):
+            return importlib.import_module(module_name)
+
+    def as_dict(self) -> Dict[str, Any]:
+        phases = {name: {'start_ms': round(start * 1000, 1), 'duration_ms': round((end - start) * 1000, 1)}
+                  for name, (start, end) in sorted(self.phases.items(), key=lambda item: item[1][0])}
+        totals = {}
+        for name, (start, end) in self.phases.items():
+            group = name.split(':', 1)[0]
+            totals[group] = totals.get(group, 0.0) + (end - start)
+        return {
+            'phases': phases,
+            'totals_ms': {group: round(total * 1000, 1) for group, total in totals.items()},
+            'milestones_ms': {name: round(at * 1000, 1) for name, at in self.milestones.items()},
+        }
+
+    def log(self) -> None:
+        report = self.as_dict()
+        totals = ', '.join(f"{group} {total} ms" for group, total in report['totals_ms'].items())
+        milestones = ', '.join(f"{name} at {at} ms" for name, at in report['milestones_ms'].items())
+        logger.info(f"Startup: {totals}; {milestones}")
+
+
+# The process-wide report. main imports this module before anything else, so its origin precedes every import.
+STARTUP = StartupReport()